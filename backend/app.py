@@ -3,11 +3,6 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 import os
 import logging
-from routes.presentation_routes import presentation_routes
-from routes.blog_routes import blog_routes
-from routes.memory_routes import memory_routes
-from routes.chat_routes import chat_routes
-from utils.database import db
 
 # Load environment variables
 load_dotenv()
@@ -16,76 +11,122 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-# Initialize Flask app
-app = Flask(__name__)
 
-# Database Configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL")
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Initialize database
-db.init_app(app)
-
-# CORS Configuration
-CORS(
-    app,
-    resources={r"/api/*": {"origins": ["http://localhost:5173"]}},
-    supports_credentials=True,
-    expose_headers=["Content-Type", "Authorization"],
-    allow_headers=["Content-Type", "Authorization"],
-    methods=["GET", "POST", "OPTIONS", "DELETE", "PUT"],
-)
-
-# Register Blueprints
-app.register_blueprint(presentation_routes, url_prefix="/api/v1/presentations")
-app.register_blueprint(blog_routes, url_prefix="/api/v1/blog")
-# app.register_blueprint(memory_routes, url_prefix = "/api/v1/memory")
-app.register_blueprint(chat_routes, url_prefix="/api/v1/chat")
-# app.register_blueprint(reel_routes, url_prefix="/api/v1/reels")
-# app.register_blueprint(image_routes, url_prefix="/api/v1/images")
-# app.register_blueprint(video_routes, url_prefix="/api/v1/videos")
-
-
-@app.before_request
-def handle_preflight():
-    """Handle CORS preflight requests."""
-    if request.method == "OPTIONS":
-        response = jsonify({"message": "Preflight OK"})
-        response.headers["Access-Control-Allow-Origin"] = "http://localhost:5173"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        return response, 200
-
-
-@app.errorhandler(404)
-def not_found_error(error):
-    """Handle 404 errors."""
-    return jsonify({"error": "Resource not found"}), 404
-
-
-@app.errorhandler(500)
-def internal_error(error):
-    """Handle 500 errors."""
-    logger.error(f"Internal server error: {error}")
-    return jsonify({"error": "Internal server error"}), 500
-
-
-@app.route("/")
-def index():
-    """Root endpoint."""
-    return jsonify({"message": "Welcome to the Content Generation API!"})
-
-
-# Table creation on application startup
-with app.app_context():
-    try:
-        db.create_all()  # Create all tables if they don't exist
-        logger.info("All database tables are existing now!.")
-    except Exception as e:
-        logger.error(f"Error creating database tables: {e}")
+def create_app():
+    """
+    Builds the Flask app and runs the startup work: creating and migrating
+    tables, starting the presentation job workers and warming up the
+    embedding model.
+
+    Nothing runs on import. Render pool workers are spawned processes that
+    re-import the main module, so `python app.py` must not redo any of this
+    in each of them; servers load the app with `gunicorn "app:create_app()"`.
+    """
+    from routes.presentation_routes import presentation_controller, presentation_routes
+    from routes.blog_routes import blog_routes
+    from routes.memory_routes import memory_routes
+    from routes.chat_routes import chat_controller, chat_routes
+    from utils.database import Session, db
+    from utils.migrations import apply_migrations
+    from utils.metrics import metrics
+    from services.embedding_service import get_embedding_engine
+
+    # Initialize Flask app
+    app = Flask(__name__)
+
+    # Database Configuration
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL")
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Let a fronting server (nginx X-Accel / Apache mod_xsendfile) stream downloads
+    app.config['USE_X_SENDFILE'] = os.getenv("USE_X_SENDFILE", "false").lower() == "true"
+
+    # Initialize database
+    db.init_app(app)
+
+    # CORS Configuration
+    CORS(
+        app,
+        resources={r"/api/*": {"origins": ["http://localhost:5173"]}},
+        supports_credentials=True,
+        expose_headers=["Content-Type", "Authorization", "X-Session-Id"],
+        allow_headers=["Content-Type", "Authorization", "X-Session-Id"],
+        methods=["GET", "POST", "OPTIONS", "DELETE", "PUT"],
+    )
+
+    # Register Blueprints
+    app.register_blueprint(presentation_routes, url_prefix="/api/v1/presentations")
+    app.register_blueprint(blog_routes, url_prefix="/api/v1/blog")
+    # app.register_blueprint(memory_routes, url_prefix = "/api/v1/memory")
+    app.register_blueprint(chat_routes, url_prefix="/api/v1/chat")
+    # app.register_blueprint(reel_routes, url_prefix="/api/v1/reels")
+    # app.register_blueprint(image_routes, url_prefix="/api/v1/images")
+    # app.register_blueprint(video_routes, url_prefix="/api/v1/videos")
+
+    @app.before_request
+    def handle_preflight():
+        """Handle CORS preflight requests."""
+        if request.method == "OPTIONS":
+            response = jsonify({"message": "Preflight OK"})
+            response.headers["Access-Control-Allow-Origin"] = "http://localhost:5173"
+            response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
+            response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Session-Id"
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            return response, 200
+
+    @app.teardown_appcontext
+    def remove_db_session(exception=None):
+        """Return the request's MemoryAgent session and its connection to the pool."""
+        Session.remove()
+
+    @app.errorhandler(404)
+    def not_found_error(error):
+        """Handle 404 errors."""
+        return jsonify({"error": "Resource not found"}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        """Handle 500 errors."""
+        logger.error(f"Internal server error: {error}")
+        return jsonify({"error": "Internal server error"}), 500
+
+    @app.route("/")
+    def index():
+        """Root endpoint."""
+        return jsonify({"message": "Welcome to the Content Generation API!"})
+
+    @app.route("/api/v1/metrics")
+    def get_metrics():
+        """In-process counters, latency observations and gauges."""
+        return jsonify(metrics.snapshot())
+
+    # Table creation on application startup
+    with app.app_context():
+        try:
+            db.create_all()  # Create all tables if they don't exist
+            logger.info("All database tables are existing now!.")
+            apply_migrations(db.engine)
+        except Exception as e:
+            # Serving against a half-migrated schema fails later and less clearly
+            logger.error(f"Error creating or migrating database tables: {e}")
+            raise
+        finally:
+            # Don't let pre-fork workers (gunicorn --preload) inherit the startup connection
+            db.engine.dispose()
+
+    presentation_controller.start_workers()
+    chat_controller.start_workers()
+
+    # Load the shared embedding model once per worker instead of on the first request
+    if os.getenv("EMBEDDING_WARMUP", "true").lower() == "true":
+        try:
+            get_embedding_engine().warm_up()
+        except Exception as e:
+            logger.error(f"Error warming up embedding engine: {e}")
+
+    return app
 
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))  # Use PORT from environment or default to 5000
-    app.run(debug=True, port=port)
+    create_app().run(debug=True, port=port)
@@ -0,0 +1,120 @@
+"""
+Latency, throughput and retrieval quality of embedding backends on stored blogs.
+
+Each variant is backend:model[:quantize[:pooling]]. For every blog the first
+--query-words words become a query and the rest of the text its document;
+retrieval quality is recall@k and MRR of finding the right document among
+all of them by cosine similarity. Latency is one text per call (the /chat
+path); throughput is --batch-size texts per call (the bulk ingestion path).
+
+    python -m benchmarks.embedding_backend_bench                          # stored blogs of user123
+    python -m benchmarks.embedding_backend_bench --corpus blogs.jsonl     # {"text": ...} per line
+    python -m benchmarks.embedding_backend_bench --variants torch:bert-large-uncased,onnx:sentence-transformers/all-MiniLM-L6-v2:int8
+"""
+import argparse
+import time
+import numpy as np
+from services.bulk_ingest import read_jsonl, record_text
+from services.embedding_service import create_backend
+
+DEFAULT_VARIANTS = ",".join([
+    "torch:bert-large-uncased",
+    "torch:bert-large-uncased:int8",
+    "onnx:bert-large-uncased:int8",
+    "torch:sentence-transformers/all-MiniLM-L6-v2",
+    "onnx:sentence-transformers/all-MiniLM-L6-v2:int8",
+])
+
+
+def stored_blogs(user_id, limit):
+    from services.memory_service import content_collection
+
+    cursor = content_collection.find({"user_id": user_id, "content_type": "blog"}, {"content": 1}).limit(limit)
+    return [(doc.get("content") or {}).get("revised_prompt", "") for doc in cursor]
+
+
+def split_pairs(texts, query_words):
+    """(query, document) pairs: the opening words of each blog and the remainder."""
+    pairs = []
+    for text in texts:
+        words = text.split()
+        if len(words) > query_words * 2:
+            pairs.append((" ".join(words[:query_words]), " ".join(words[query_words:])))
+    return pairs
+
+
+def normalize(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def embed_batched(backend, texts, batch_size):
+    return np.concatenate([backend.embed(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
+
+
+def retrieval_quality(queries, documents, k):
+    ranks = []
+    scores = normalize(queries) @ normalize(documents).T
+    for i, row in enumerate(scores):
+        ranks.append(int((row > row[i]).sum()) + 1)
+    ranks = np.asarray(ranks)
+    return float((ranks <= k).mean()), float((1.0 / ranks).mean())
+
+
+def run_variant(spec, pairs, args):
+    backend_name, model_name, *rest = spec.split(":")
+    quantize = rest[0] if rest else "none"
+    pooling = rest[1] if len(rest) > 1 else "mean"
+    backend = create_backend(backend_name, model_name=model_name, quantize=quantize, pooling=pooling,
+                             max_length=args.max_length)
+
+    start = time.perf_counter()
+    backend.embed(["warm up"])
+    load_s = time.perf_counter() - start
+
+    queries = [q for q, _ in pairs]
+    documents = [d for _, d in pairs]
+    latencies = []
+    for query in queries[:args.latency_samples]:
+        start = time.perf_counter()
+        backend.embed([query])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    document_vectors = embed_batched(backend, documents, args.batch_size)
+    throughput = len(documents) / (time.perf_counter() - start)
+    query_vectors = embed_batched(backend, queries, args.batch_size)
+    recall, mrr = retrieval_quality(query_vectors, document_vectors, args.k)
+
+    print(f"{spec:<52} {backend.dimension:>5} {load_s:>7.1f} {np.percentile(latencies, 50):>8.1f} "
+          f"{np.percentile(latencies, 95):>8.1f} {throughput:>8.1f} {recall:>7.3f} {mrr:>6.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", default=DEFAULT_VARIANTS, help="comma-separated backend:model[:quantize[:pooling]]")
+    parser.add_argument("--corpus", help="JSONL file of blogs instead of the stored ones")
+    parser.add_argument("--user-id", default="user123")
+    parser.add_argument("--limit", type=int, default=500, help="blogs to use")
+    parser.add_argument("--query-words", type=int, default=20)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--latency-samples", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.corpus:
+        texts = [record_text(record) for _, record in read_jsonl(args.corpus)][:args.limit]
+    else:
+        texts = stored_blogs(args.user_id, args.limit)
+    pairs = split_pairs(texts, args.query_words)
+    if not pairs:
+        parser.error(f"no blogs longer than {args.query_words * 2} words to benchmark")
+
+    print(f"{len(pairs)} blogs, recall@{args.k} of the blog from its first {args.query_words} words")
+    print(f"{'variant':<52} {'dim':>5} {'load_s':>7} {'p50_ms':>8} {'p95_ms':>8} {'texts/s':>8} {'recall':>7} {'mrr':>6}")
+    for spec in args.variants.split(","):
+        run_variant(spec.strip(), pairs, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Throughput and tail latency of the embedding micro-batcher.
+
+Runs `--requests` single-text embeddings from `--clients` concurrent threads
+through an EmbeddingBatcher for each max batch size (1, 8 and 32 by default)
+and reports requests/second with p50/p99 latency.
+
+    python -m benchmarks.embedding_batcher_bench
+    python -m benchmarks.embedding_batcher_bench --synthetic   # no model download
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+import numpy as np
+from services.embedding_batcher import EmbeddingBatcher
+
+WORDS = ("content generation blog presentation memory vector search model prompt "
+         "slide theme retrieval article summary embedding request latency").split()
+
+
+def make_texts(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 200))) for _ in range(count)]
+
+
+def synthetic_embed(texts, per_call_ms=40.0, per_char_us=2.0):
+    """Stands in for a forward pass: fixed per-call overhead plus cost proportional to padded size."""
+    longest = max(len(t) for t in texts)
+    time.sleep(per_call_ms / 1000.0 + longest * len(texts) * per_char_us / 1e6)
+    return np.zeros((len(texts), 1024), dtype=np.float32)
+
+
+def run(batcher, texts, clients):
+    latencies = []
+    lock = threading.Lock()
+    per_client = [texts[i::clients] for i in range(clients)]
+
+    def client(items):
+        local = []
+        for text in items:
+            start = time.perf_counter()
+            batcher.embed(text)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(items,)) for items in per_client]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "throughput": len(texts) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    parser.add_argument("--synthetic", action="store_true", help="Use a simulated model instead of BERT")
+    args = parser.parse_args()
+
+    embed_fn = synthetic_embed if args.synthetic else None
+    if not args.synthetic:
+        from services.embedding_service import get_embedding_engine
+        get_embedding_engine().warm_up()
+
+    texts = make_texts(args.requests)
+    print(f"{'batch':>6} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for size in (int(s) for s in args.batch_sizes.split(",")):
+        batcher = EmbeddingBatcher(embed_fn=embed_fn, max_batch_size=size, max_wait_ms=args.wait_ms)
+        result = run(batcher, texts, args.clients)
+        print(f"{size:>6} {result['throughput']:>10.1f} {result['p50_ms']:>10.1f} {result['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
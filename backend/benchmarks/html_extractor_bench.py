@@ -0,0 +1,71 @@
+"""
+Speed and output parity of the HTML text extractors.
+
+Times the original BeautifulSoup cleaner against every backend in
+services.html_extractor on the saved pages in benchmarks/html_corpus plus a
+generated deeply nested page, and checks each backend's output matches.
+
+    python -m benchmarks.html_extractor_bench
+"""
+import argparse
+import glob
+import os
+import time
+from bs4 import BeautifulSoup
+from services.html_extractor import EXTRACTORS
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html_corpus")
+
+
+def original_clean_html(html_content):
+    """SearchAgent.clean_html as it was before the streaming extractor."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for script_or_style in soup(['script', 'style']):
+        script_or_style.decompose()
+    for unwanted in soup(['noscript', 'iframe', 'svg', 'form', 'input']):
+        unwanted.decompose()
+    main_content = soup.find('body')
+    if main_content:
+        for tag in main_content.find_all():
+            if not tag.text.strip():
+                tag.decompose()
+    return main_content.get_text(separator=' ', strip=True) if main_content else ''
+
+
+def nested_page(depth=400, paragraphs=200):
+    inner = "".join(f"<p>Paragraph {i} about <b>content</b> generation.</p>" for i in range(paragraphs))
+    return "<html><body>" + "<div>" * depth + inner + "</div>" * depth + "</body></html>"
+
+
+def timed(fn, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(html, max_chars=None) if fn is not original_clean_html else fn(html)
+    return (time.perf_counter() - start) / repeat * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = {os.path.basename(p): open(p, encoding="utf-8").read()
+             for p in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.html")))}
+    pages["generated_nested.html"] = nested_page()
+
+    backends = {"original": original_clean_html, **EXTRACTORS}
+    print(f"{'page':<24}" + "".join(f"{name + ' ms':>14}" for name in backends) + "  matches")
+    for name, html in pages.items():
+        row, outputs = [], {}
+        for backend, fn in backends.items():
+            try:
+                ms, outputs[backend] = timed(fn, html, args.repeat)
+                row.append(f"{ms:>14.2f}")
+            except ImportError:
+                row.append(f"{'n/a':>14}")
+        mismatched = [b for b, out in outputs.items() if out != outputs["original"]]
+        print(f"{name:<24}" + "".join(row) + ("  yes" if not mismatched else f"  NO: {', '.join(mismatched)}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Accuracy of the local intent fast path on a labelled query set.
+
+For every query in benchmarks/intent_corpus/queries.jsonl the classifier's
+local decision (keyword scorer, then centroid scorer on the query embedding)
+is compared with the label; deferring to the LLM counts as "unknown".
+Reports accuracy, recall of off-topic queries (they must not be routed to
+blog or presentation generation) and the fast-path rate for a grid of
+centroid margins and similarity floors, to calibrate
+INTENT_CENTROID_MARGIN and INTENT_CENTROID_MIN_SIMILARITY for a model.
+
+    python -m benchmarks.intent_eval
+"""
+import argparse
+import json
+import os
+from models.generative_model import Intent
+from models.intent_classifier import CentroidIntentScorer, IntentClassifier
+
+QUERIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_corpus", "queries.jsonl")
+
+
+def load_queries(path=QUERIES_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return [(record["query"], Intent(record["intent"])) for record in map(json.loads, f) if record]
+
+
+def evaluate(classifier, queries, embed_fn):
+    """
+    Returns:
+        dict: accuracy, unknown_recall (off-topic queries kept off the fast path)
+            and fast_path_rate (queries answered without the LLM).
+    """
+    correct = unknown_total = unknown_kept = fast = 0
+    for query, expected in queries:
+        predicted, _, _ = classifier.fast_path(query, embed_fn=lambda q=query: embed_fn([q])[0])
+        correct += predicted == expected
+        fast += predicted != Intent.UNKNOWN
+        if expected == Intent.UNKNOWN:
+            unknown_total += 1
+            unknown_kept += predicted == Intent.UNKNOWN
+    return {
+        "accuracy": correct / len(queries),
+        "unknown_recall": unknown_kept / unknown_total if unknown_total else 1.0,
+        "fast_path_rate": fast / len(queries),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--margins", default="0.05,0.1,0.2")
+    parser.add_argument("--floors", default="0.0,0.1,0.2,0.3")
+    args = parser.parse_args()
+
+    from services.embedding_service import get_embedding_engine
+
+    embed_fn = get_embedding_engine().embed
+    queries = load_queries()
+    print(f"{len(queries)} labelled queries")
+    print(f"{'margin':>7} {'floor':>6} {'accuracy':>9} {'unk_recall':>11} {'fast_path':>10}")
+    for margin in map(float, args.margins.split(",")):
+        for floor in map(float, args.floors.split(",")):
+            scorer = CentroidIntentScorer(embed_fn, margin=margin, min_similarity=floor)
+            result = evaluate(IntentClassifier(centroid_scorer=scorer), queries, embed_fn)
+            print(f"{margin:>7.2f} {floor:>6.2f} {result['accuracy']:>9.3f} "
+                  f"{result['unknown_recall']:>11.3f} {result['fast_path_rate']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
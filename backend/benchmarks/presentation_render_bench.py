@@ -0,0 +1,119 @@
+"""
+Slides per second when rendering 20-slide decks under each theme.
+
+Renders a deck cycling through every supported layout with the same
+new_presentation + render_slides calls that
+PresentationService.create_presentation makes (build only, and build plus
+save to memory) and reports the rate for each theme in configs.config.themes.
+
+With --threads N it also renders decks from N concurrent threads, the way
+presentation job workers do, once in-thread and once through the render
+process pool, and reports decks/sec for each.
+
+With --stream-jobs N it compares the two PRESENTATION_STREAM_RENDER modes
+for N concurrent streamed jobs whose slides arrive --slide-delay-ms apart:
+"inline" renders each slide as it arrives, "pool" waits for the whole deck
+and renders it in the process pool. It reports the mean time from the first
+request to the finished deck, and decks/sec.
+
+    python -m benchmarks.presentation_render_bench
+    python -m benchmarks.presentation_render_bench --threads 8 --pool-size 4
+    python -m benchmarks.presentation_render_bench --stream-jobs 4 --slide-delay-ms 150
+"""
+import argparse
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from configs.config import themes
+from services.render_pool import RenderPool
+from services.render_worker import render_pptx_bytes
+from services.slide_renderer import get_theme_style, new_presentation, render_slides
+
+SAMPLE_SLIDES = [
+    {"layout": "title", "title": "Rendering Benchmark", "subtitle": "Twenty slides per deck"},
+    {"layout": "bullet_points", "title": "Agenda",
+     "points": ["Why render speed matters", "How themes are compiled", "Results by theme"]},
+    {"layout": "two_column", "title": "Before vs After",
+     "left_points": ["Per-paragraph color parsing", "Copy-pasted title styling"],
+     "right_points": ["Precompiled theme styles", "Table-driven layouts"]},
+    {"layout": "content_with_image", "title": "Deck Anatomy",
+     "content": "Each slide is rendered from a small JSON object.", "image_path": ""},
+]
+
+
+def make_deck(num_slides):
+    return [dict(SAMPLE_SLIDES[i % len(SAMPLE_SLIDES)]) for i in range(num_slides)]
+
+
+def render(deck, theme_name, save):
+    style = get_theme_style(theme_name)
+    prs = render_slides(new_presentation(style), deck, style)
+    if save:
+        prs.save(io.BytesIO())
+
+
+def stream_deck(deck, delay):
+    """Yields the deck's slides the way a streamed Gemini response does, one every `delay` seconds."""
+    for slide in deck:
+        time.sleep(delay)
+        yield slide
+
+
+def streamed_job(mode, pool, deck, delay):
+    start = time.perf_counter()
+    if mode == "inline":
+        render_pptx_bytes(stream_deck(deck, delay), "default")
+    else:
+        pool.render(list(stream_deck(deck, delay)), "default")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=20)
+    parser.add_argument("--decks", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=0, help="also compare concurrent in-thread vs pooled rendering")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--stream-jobs", type=int, default=0, help="also compare inline vs pooled rendering of streamed decks")
+    parser.add_argument("--slide-delay-ms", type=float, default=150, help="simulated generation time per streamed slide")
+    args = parser.parse_args()
+
+    deck = make_deck(args.slides)
+    print(f"{'theme':<10} {'build slides/s':>16} {'build+save slides/s':>21}")
+    for theme_name in themes:
+        rates = []
+        for save in (False, True):
+            render(deck, theme_name, save)  # warm up
+            start = time.perf_counter()
+            for _ in range(args.decks):
+                render(deck, theme_name, save)
+            rates.append(args.slides * args.decks / (time.perf_counter() - start))
+        print(f"{theme_name:<10} {rates[0]:>16.1f} {rates[1]:>21.1f}")
+
+    if args.threads:
+        print(f"\n{args.decks} decks from {args.threads} threads")
+        for label, pool in (("in-thread", RenderPool(max_workers=0)), (f"pool({args.pool_size})", RenderPool(max_workers=args.pool_size))):
+            pool.render(deck, "default")  # start workers outside the timed region
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as executor:
+                list(executor.map(lambda _: pool.render(deck, "default"), range(args.decks)))
+            print(f"{label:<12} {args.decks / (time.perf_counter() - start):>8.1f} decks/s")
+            pool.shutdown()
+
+    if args.stream_jobs:
+        delay = args.slide_delay_ms / 1000
+        print(f"\n{args.decks} streamed decks, {args.stream_jobs} at a time, one slide every {args.slide_delay_ms:g} ms")
+        print(f"{'mode':<12} {'mean deck s':>12} {'decks/s':>8}")
+        for mode in ("inline", "pool"):
+            pool = RenderPool(max_workers=args.pool_size)
+            pool.render(deck, "default")  # start workers outside the timed region
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.stream_jobs) as executor:
+                latencies = list(executor.map(lambda _: streamed_job(mode, pool, deck, delay), range(args.decks)))
+            elapsed = time.perf_counter() - start
+            print(f"{mode:<12} {sum(latencies) / len(latencies):>12.2f} {args.decks / elapsed:>8.2f}")
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
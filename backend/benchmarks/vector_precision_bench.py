@@ -0,0 +1,79 @@
+"""
+Recall, memory and query latency of reduced-precision embedding storage.
+
+Builds the in-memory index at float32 (the baseline), float16 (what the
+pgvector halfvec column stores) and int8 (scalar-quantized), each with and
+without full-precision re-ranking of the top `k * --rerank-factor`
+candidates, and reports recall@k against exact float32 search, bytes per
+vector and mean query time.
+
+    python -m benchmarks.vector_precision_bench                       # synthetic clustered vectors
+    python -m benchmarks.vector_precision_bench --user-id user123     # stored embeddings
+"""
+import argparse
+import time
+import numpy as np
+from services.vector_index import InMemoryVectorIndex
+
+
+def synthetic_rows(count, dimension, clusters=200, seed=0):
+    """Clustered vectors, so near neighbours are close together the way topical blogs are."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    assignments = rng.integers(0, clusters, size=count)
+    vectors = centers[assignments] + 0.6 * rng.normal(size=(count, dimension)).astype(np.float32)
+    return [(str(i), vectors[i]) for i in range(count)]
+
+
+def stored_rows(user_id, content_type):
+    from services.memory_service import MemoryAgent
+
+    return [(doc_id, np.asarray(embedding, dtype=np.float32))
+            for doc_id, embedding in MemoryAgent._load_partition(user_id, content_type)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000, help="synthetic vectors")
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--user-id", help="benchmark this user's stored embeddings instead of synthetic ones")
+    parser.add_argument("--content-type", default="blog")
+    args = parser.parse_args()
+
+    rows = stored_rows(args.user_id, args.content_type) if args.user_id else synthetic_rows(args.count, args.dimension)
+    full = dict(rows)
+    rng = np.random.default_rng(1)
+    # Queries are perturbed copies of stored vectors: each has a real neighbourhood to find
+    picks = rng.integers(0, len(rows), size=args.queries)
+    queries = [rows[i][1] + 0.3 * rng.normal(size=rows[i][1].shape).astype(np.float32) for i in picks]
+
+    def loader(user_id, content_type):
+        return rows
+
+    def rerank_fn(ids):
+        return {doc_id: full[doc_id] for doc_id in ids}
+
+    baseline = InMemoryVectorIndex(loader)
+    truth = [{r.mongo_doc_id for r in baseline.nearest("u", "c", q, args.k)} for q in queries]
+
+    print(f"{len(rows)} vectors, {args.queries} queries, recall@{args.k}")
+    print(f"{'variant':<18} {'recall':>7} {'bytes/vec':>10} {'ms/query':>9}")
+    for precision in ("float32", "float16", "int8"):
+        for rerank in ((False,) if precision == "float32" else (False, True)):
+            index = InMemoryVectorIndex(loader, precision=precision,
+                                        rerank_fn=rerank_fn if rerank else None, rerank_factor=args.rerank_factor)
+            index.nearest("u", "c", queries[0], args.k)  # load outside the timed loop
+            hits, start = 0, time.perf_counter()
+            for query, expected in zip(queries, truth):
+                hits += len(expected & {r.mongo_doc_id for r in index.nearest("u", "c", query, args.k)})
+            elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+            label = precision + (" + rerank" if rerank else "")
+            print(f"{label:<18} {hits / (len(queries) * args.k):>7.3f} "
+                  f"{index.memory_bytes() / len(rows):>10.0f} {elapsed_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
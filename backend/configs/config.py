@@ -1,3 +1,5 @@
+from enum import Enum
+
 themes = {
     "default": {
         "font": "Arial",
@@ -23,3 +25,5 @@ themes = {
 }
 
 supported_layouts = {"title", "bullet_points", "two_column", "content_with_image"}
+
+SlideLayout = Enum('SlideLayout', {layout.upper(): layout for layout in supported_layouts})
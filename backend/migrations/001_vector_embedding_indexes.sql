@@ -0,0 +1,12 @@
+-- Nearest-neighbour search for MemoryAgent.nearest is pushed into Postgres.
+-- HNSW index on the cosine distance operator (<=>) plus a composite index
+-- for the (user_id, content_type) filter applied alongside it.
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE INDEX IF NOT EXISTS ix_vector_embeddings_embedding_hnsw
+    ON vector_embeddings
+    USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS ix_vector_embeddings_user_content_type
+    ON vector_embeddings (user_id, content_type);
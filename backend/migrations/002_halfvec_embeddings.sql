@@ -0,0 +1,18 @@
+-- Half-precision copy of each embedding (pgvector >= 0.7) with its own HNSW
+-- index: half the index size and per-row transfer of the float32 column,
+-- which is kept for re-ranking the halfvec candidates at full precision.
+-- Only used with EMBEDDING_STORAGE_PRECISION=halfvec. On older pgvector this
+-- is skipped so startup still succeeds; after upgrading, running
+-- `python -m utils.halfvec_backfill` adds the column and fills existing rows.
+DO $$
+BEGIN
+    IF (SELECT string_to_array(extversion, '.')::int[] >= '{0,7}' FROM pg_extension WHERE extname = 'vector') THEN
+        EXECUTE 'ALTER TABLE vector_embeddings ADD COLUMN IF NOT EXISTS embedding_half halfvec(1024)';
+        EXECUTE 'CREATE INDEX IF NOT EXISTS ix_vector_embeddings_embedding_half_hnsw '
+                'ON vector_embeddings USING hnsw (embedding_half halfvec_cosine_ops) '
+                'WITH (m = 16, ef_construction = 64)';
+    ELSE
+        RAISE NOTICE 'pgvector < 0.7 has no halfvec type; skipping embedding_half';
+    END IF;
+END
+$$;
@@ -0,0 +1,17 @@
+-- Versioned embedding spaces: each row records the model/pooling it was
+-- embedded with (EMBEDDING_SPACE) and searches filter on it, so switching
+-- models never compares vectors from different spaces. Existing rows came
+-- from bert-large-uncased with mean pooling. Spaces narrower than 1024 are
+-- zero-padded into the same columns, which leaves cosine distance unchanged.
+ALTER TABLE vector_embeddings
+    ADD COLUMN IF NOT EXISTS embedding_space VARCHAR(255) NOT NULL DEFAULT 'bert-large-uncased/mean';
+
+-- One embedding per document and space, so a new space can be backfilled
+-- (python -m services.reembed) while the old one keeps serving.
+ALTER TABLE vector_embeddings DROP CONSTRAINT IF EXISTS vector_embeddings_mongo_doc_id_key;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_vector_embeddings_mongo_doc_space
+    ON vector_embeddings (mongo_doc_id, embedding_space);
+
+DROP INDEX IF EXISTS ix_vector_embeddings_user_content_type;
+CREATE INDEX IF NOT EXISTS ix_vector_embeddings_space_user_content_type
+    ON vector_embeddings (embedding_space, user_id, content_type);
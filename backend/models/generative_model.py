@@ -1,8 +1,10 @@
 import google.generativeai as genai
 from enum import Enum
+import json
 from dotenv import load_dotenv
 import os
-from configs.config import supported_layouts
+from configs.config import SlideLayout
+from models.response_cache import CachedGenerativeModel, GEMINI_CACHE_ENABLED
 
 load_dotenv()
 # Configure Gemini API
@@ -20,15 +22,15 @@ class Intent(Enum):
     PRESENTATION_GENERATION = "presentation_generation"
     UNKNOWN = "unknown"
 
-SlideLayout = Enum('SlideLayout', {layout.upper(): layout for layout in supported_layouts})
-
 class ModelResponseKeys(Enum):
     """Enum for standard response structure."""
     REVISED_PROMPT = "revised_prompt"
     QUESTIONS = "questions"
 
-# Singleton generative model instance
+# Singleton generative model instance, wrapped so identical prompts are answered from cache
 model = genai.GenerativeModel('gemini-1.5-flash')
+if GEMINI_CACHE_ENABLED:
+    model = CachedGenerativeModel(model)
 
 def get_model():
     """Returns the generative model instance."""
@@ -100,6 +102,24 @@ def extract_revised_prompt_and_questions(response_text):
 
     return revised_prompt, questions
 
+def _slide_prompt_section(slide_num, layout, title=None):
+    """Prompt lines describing one slide of the given layout (a SlideLayout or its value)."""
+    layout = getattr(layout, "value", layout)
+    section = f"\n## Slide {slide_num}: Layout: {layout}\n"
+    section += f"Title: {title}\n" if title else "Title: <Slide Title>\n"
+    if layout == SlideLayout.TITLE.value:
+        section += "Subtitle: <Slide Subtitle>\n"
+    elif layout == SlideLayout.BULLET_POINTS.value:
+        section += "Points: [\"Point 1\", \"Point 2\", \"Point 3\"]\n"
+    elif layout == SlideLayout.TWO_COLUMN.value:
+        section += "Left Points: [\"Left Point 1\", \"Left Point 2\"]\n"
+        section += "Right Points: [\"Right Point 1\", \"Right Point 2\"]\n"
+    elif layout == SlideLayout.CONTENT_WITH_IMAGE.value:
+        section += "Content: [\"Text line 1\", \"Text line 2\"]\n"
+        section += "Image Path: \"<Image Placeholder>\"\n"
+    section += f"Layout: {layout}\n"
+    return section
+
 def generate_slide_prompts(topic, num_slides, layouts):
     """
     Generates prompts for the slides based on the topic, number of slides, and layouts.
@@ -115,22 +135,47 @@ def generate_slide_prompts(topic, num_slides, layouts):
     prompt = f"Generate {num_slides} slides on the topic '{topic}'. Use fixed JSON keys for response: title, subtitle, points, left_points, right_points, content, Layout, and image_path. Each slide must follow the provided layout type."
 
     for i in range(num_slides):
-        slide_num = i + 1
-        layout = layouts[i] # Enum ensures valid layout values
-        prompt += f"\n## Slide {slide_num}: Layout: {layout}\n"
-        prompt += "Title: <Slide Title>\n"
-        if layout == SlideLayout.TITLE:
-            prompt += "Subtitle: <Slide Subtitle>\n"
-        elif layout == SlideLayout.BULLET_POINTS:
-            prompt += "Points: [\"Point 1\", \"Point 2\", \"Point 3\"]\n"
-        elif layout == SlideLayout.TWO_COLUMN:
-            prompt += "Left Points: [\"Left Point 1\", \"Left Point 2\"]\n"
-            prompt += "Right Points: [\"Right Point 1\", \"Right Point 2\"]\n"
-        elif layout == SlideLayout.CONTENT_WITH_IMAGE:
-            prompt += "Content: [\"Text line 1\", \"Text line 2\"]\n"
-            prompt += "Image Path: \"<Image Placeholder>\"\n"
-
-        prompt += f"Layout: {layout}\n"
+        prompt += _slide_prompt_section(i + 1, layouts[i])
+
+    prompt += "\nEnsure all keys are included and the content is concise and relevant."
+    return prompt
+
+def generate_outline_prompt(topic, num_slides, layouts):
+    """
+    Generates a prompt asking only for the slide titles of a deck.
+
+    Returns:
+        str: Prompt whose answer is a JSON array of `num_slides` title strings.
+    """
+    layout_list = ", ".join(getattr(layout, "value", layout) for layout in layouts)
+    return (
+        f"Plan a {num_slides}-slide presentation on the topic '{topic}'. "
+        f"The slide layouts, in order, are: {layout_list}. "
+        f"Respond with only a JSON array of exactly {num_slides} short slide titles, in order, and nothing else."
+    )
+
+def generate_slide_group_prompt(topic, outline, indices, layouts):
+    """
+    Generates a prompt for a subset of a deck whose outline is already known.
+
+    Args:
+        topic (str): The topic for the deck.
+        outline (list[str]): Titles of every slide in the deck, in order.
+        indices (list[int]): Zero-based positions of the slides to generate.
+        layouts (list[SlideLayout]): Layouts of every slide in the deck.
+
+    Returns:
+        str: Prompt whose answer is a JSON array with one object per requested slide.
+    """
+    prompt = (
+        f"You are writing part of a {len(outline)}-slide presentation on the topic '{topic}'. "
+        f"The full outline is: {json.dumps(outline)}. "
+        f"Generate only the {len(indices)} slide(s) below, as a JSON array in the same order. "
+        "Use fixed JSON keys for response: title, subtitle, points, left_points, right_points, content, Layout, and image_path. "
+        "Each slide must follow the provided layout type."
+    )
+    for i in indices:
+        prompt += _slide_prompt_section(i + 1, layouts[i], outline[i])
 
     prompt += "\nEnsure all keys are included and the content is concise and relevant."
     return prompt
@@ -0,0 +1,194 @@
+import logging
+import os
+import re
+import threading
+import numpy as np
+from dotenv import load_dotenv
+from models.generative_model import Intent, get_model, reason_out_intent
+from utils.metrics import metrics
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", 0.6))
+# Cosine-similarity gap between the two closest centroids that counts as full confidence
+INTENT_CENTROID_MARGIN = float(os.getenv("INTENT_CENTROID_MARGIN", 0.1))
+# Queries less similar than this to every intent centroid are UNKNOWN (calibrate with benchmarks.intent_eval)
+INTENT_CENTROID_MIN_SIMILARITY = float(os.getenv("INTENT_CENTROID_MIN_SIMILARITY", 0.2))
+
+KEYWORD_PATTERNS = {
+    Intent.BLOG_GENERATION: [
+        (r"\bblogs?\b", 2.0),
+        (r"\bblog ?posts?\b", 1.0),
+        (r"\barticles?\b", 1.5),
+        (r"\bessays?\b", 1.0),
+        (r"\bwrite[- ]?ups?\b", 1.0),
+        (r"\bnewsletters?\b", 1.0),
+        (r"\bwrite (?:about|on)\b", 1.0),
+    ],
+    Intent.PRESENTATION_GENERATION: [
+        (r"\bpresentations?\b", 2.0),
+        (r"\bslides?\b", 2.0),
+        (r"\bslide ?shows?\b", 1.0),
+        (r"\b(?:pitch )?decks?\b", 1.5),
+        (r"\bpptx?\b", 2.0),
+        (r"\bpower ?point\b", 2.0),
+        (r"\bkeynote\b", 1.0),
+    ],
+}
+
+CENTROID_EXEMPLARS = {
+    Intent.BLOG_GENERATION: [
+        "Write a blog post about the future of remote work",
+        "Draft an article explaining how vaccines work",
+        "I need a blog on healthy eating habits for students",
+        "Create a long-form post about travelling in Japan",
+    ],
+    Intent.PRESENTATION_GENERATION: [
+        "Make a presentation on climate change for my class",
+        "Create slides about our quarterly sales results",
+        "Build a pitch deck for a food delivery startup",
+        "Generate a slideshow introducing machine learning",
+    ],
+    # Off-topic requests; a query closest to these is UNKNOWN and goes to the LLM
+    Intent.UNKNOWN: [
+        "What is the weather going to be like tomorrow",
+        "Tell me a joke about programmers",
+        "How do I reset my account password",
+        "Translate good morning into Spanish",
+        "What is 17 times 24",
+        "Who won the football match last night",
+    ],
+}
+
+
+class KeywordIntentScorer:
+    """Scores intents by weighted keyword matches; confidence is the winner's share of the total."""
+
+    def __init__(self, patterns=KEYWORD_PATTERNS):
+        self.patterns = {
+            intent: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in rules]
+            for intent, rules in patterns.items()
+        }
+
+    def score(self, query):
+        scores = {
+            intent: sum(weight for pattern, weight in rules if pattern.search(query))
+            for intent, rules in self.patterns.items()
+        }
+        total = sum(scores.values())
+        if not total:
+            return Intent.UNKNOWN, 0.0
+        best = max(scores, key=scores.get)
+        return best, scores[best] / total
+
+
+def _unit(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+class CentroidIntentScorer:
+    """
+    Nearest-centroid classifier over the query embedding that retrieval already computes.
+
+    Centroids are the normalized mean embeddings of a few exemplar queries,
+    built lazily on first use with `embed_fn`. Mean-pooled BERT vectors all
+    point roughly the same way, so embeddings are centered on the mean
+    exemplar before comparing; otherwise every query looks similar to every
+    centroid. A query is UNKNOWN when its nearest centroid is the off-topic
+    one or when it is less than `min_similarity` similar to all of them.
+    """
+
+    def __init__(self, embed_fn=None, exemplars=CENTROID_EXEMPLARS, margin=INTENT_CENTROID_MARGIN,
+                 min_similarity=INTENT_CENTROID_MIN_SIMILARITY):
+        self.embed_fn = embed_fn
+        self.exemplars = exemplars
+        self.margin = margin
+        self.min_similarity = min_similarity
+        self._centroids = None
+        self._center = None
+        self._lock = threading.Lock()
+
+    def _embed(self, texts):
+        if self.embed_fn is None:
+            from services.embedding_service import get_embedding_engine
+            self.embed_fn = get_embedding_engine().embed
+        return np.asarray(self.embed_fn(texts), dtype=np.float32)
+
+    def _build(self):
+        with self._lock:
+            if self._centroids is None:
+                embedded = {intent: _unit(self._embed(texts)) for intent, texts in self.exemplars.items()}
+                center = np.concatenate(list(embedded.values())).mean(axis=0)
+                self._centroids = {
+                    intent: _unit(_unit(vectors - center).mean(axis=0)) for intent, vectors in embedded.items()
+                }
+                self._center = center
+        return self._centroids
+
+    def score(self, query_embedding):
+        centroids = self._build()
+        query = _unit(_unit(np.asarray(query_embedding, dtype=np.float32)) - self._center)
+        similarities = sorted(((float(query @ c), intent) for intent, c in centroids.items()), reverse=True)
+        (best_sim, best), (second_sim, _) = similarities[0], similarities[1]
+        if best == Intent.UNKNOWN or best_sim < self.min_similarity:
+            return Intent.UNKNOWN, 0.0
+        return best, min(1.0, (best_sim - second_sim) / self.margin)
+
+
+class IntentClassifier:
+    """
+    Local fast path for intent detection with Gemini as the fallback.
+
+    The keyword scorer runs first; when a query embedding is available the
+    centroid scorer gets a second chance. Only when neither reaches
+    `threshold` does the query go to `reason_out_intent`.
+    """
+
+    def __init__(self, threshold=INTENT_CONFIDENCE_THRESHOLD, keyword_scorer=None, centroid_scorer=None):
+        self.threshold = threshold
+        self.keyword_scorer = keyword_scorer or KeywordIntentScorer()
+        self.centroid_scorer = centroid_scorer or CentroidIntentScorer()
+        metrics.register_gauge("intent.fast_path_rate", lambda: metrics.ratio("intent.fast_path", "intent.requests"))
+
+    def fast_path(self, query, query_embedding=None, embed_fn=None):
+        """
+        The local decision alone: (intent, confidence, source), with Intent.UNKNOWN
+        when neither scorer reaches `threshold` and the query needs the LLM.
+        """
+        intent, confidence = self.keyword_scorer.score(query)
+        source = "keyword"
+        if confidence < self.threshold and (query_embedding is not None or embed_fn is not None):
+            try:
+                if query_embedding is None:
+                    query_embedding = embed_fn()
+                intent, confidence = self.centroid_scorer.score(query_embedding)
+                source = "centroid"
+            except Exception as e:
+                logger.warning(f"Centroid intent scoring failed: {e}")
+        if intent == Intent.UNKNOWN or confidence < self.threshold:
+            return Intent.UNKNOWN, confidence, source
+        return intent, confidence, source
+
+    def classify(self, query, query_embedding=None, embed_fn=None):
+        """
+        Returns {"intent": <Intent value>, "confidence": float, "source": "keyword" | "centroid" | "llm"}.
+
+        `embed_fn` is an optional callable returning the query embedding; it is
+        only invoked when the keyword scorer is not confident enough.
+        """
+        metrics.increment("intent.requests")
+        intent, confidence, source = self.fast_path(query, query_embedding, embed_fn)
+        if intent != Intent.UNKNOWN:
+            metrics.increment("intent.fast_path")
+            metrics.increment(f"intent.fast_path.{source}")
+            return {"intent": intent.value, "confidence": confidence, "source": source}
+
+        metrics.increment("intent.llm_fallback")
+        result = reason_out_intent(get_model(), query)
+        result.update({"confidence": confidence, "source": "llm"})
+        return result
+
+intent_classifier = IntentClassifier()
@@ -0,0 +1,191 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from utils.metrics import metrics
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GEMINI_CACHE_ENABLED = os.getenv("GEMINI_CACHE_ENABLED", "true").lower() == "true"
+GEMINI_CACHE_SIZE = int(os.getenv("GEMINI_CACHE_SIZE", 512))
+GEMINI_CACHE_TTL = float(os.getenv("GEMINI_CACHE_TTL", 24 * 3600))
+GEMINI_CACHE_PATH = os.getenv("GEMINI_CACHE_PATH")  # SQLite file for the on-disk tier; unset disables it
+
+
+def cache_key(model_name, prompt, generation_config=None, **kwargs):
+    """Content hash of everything that determines a generate_content response."""
+    payload = json.dumps(
+        {"model": model_name, "prompt": prompt, "config": generation_config, "kwargs": kwargs},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedResponse:
+    """Stands in for a GenerateContentResponse rebuilt from its cached dict."""
+
+    def __init__(self, data):
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    @property
+    def text(self):
+        return self._data['candidates'][0]['content']['parts'][0]['text']
+
+
+class ResponseCache:
+    """
+    Two-tier TTL cache of response dicts: an LRU in memory in front of an
+    optional SQLite file shared by every worker on the host. Expired rows
+    are purged from the file every PURGE_EVERY writes.
+    """
+
+    PURGE_EVERY = 100
+
+    def __init__(self, max_entries=GEMINI_CACHE_SIZE, ttl=GEMINI_CACHE_TTL, path=GEMINI_CACHE_PATH):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        if path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_expires_at ON responses (expires_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    metrics.increment("gemini_cache.memory_hits")
+                    return value
+                del self._entries[key]
+
+        if self.path:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Error reading response cache: {e}")
+                row = None
+            if row:
+                value = json.loads(row[0])
+                self._remember(key, value, row[1])
+                metrics.increment("gemini_cache.disk_hits")
+                return value
+        return None
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl
+        self._remember(key, value, expires_at)
+        if self.path:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value, default=str), expires_at),
+                    )
+                    self._writes += 1
+                    if self._writes % self.PURGE_EVERY == 0:
+                        purged = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),)).rowcount
+                        metrics.increment("gemini_cache.purged", purged)
+            except sqlite3.Error as e:
+                logger.warning(f"Error writing response cache: {e}")
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            except sqlite3.Error as e:
+                logger.warning(f"Error deleting from response cache: {e}")
+
+
+class CachedGenerativeModel:
+    """
+    Wraps a GenerativeModel so identical generate_content calls are served from cache.
+
+    A streaming call is replayed from cache as a single chunk, and a fresh
+    stream is cached as one assembled response once it has been read to the
+    end. Every other attribute (start_chat, ...) is delegated to the wrapped
+    model.
+    """
+
+    def __init__(self, model, cache=None):
+        self._model = model
+        self.cache = cache or ResponseCache()
+
+    @property
+    def model_name(self):
+        return getattr(self._model, "model_name", type(self._model).__name__)
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        key = cache_key(self.model_name, contents, generation_config, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            metrics.increment("gemini_cache.hits")
+            return iter([CachedResponse(cached)]) if stream else CachedResponse(cached)
+
+        metrics.increment("gemini_cache.misses")
+        if stream:
+            response = self._model.generate_content(contents, generation_config=generation_config, stream=True, **kwargs)
+            return self._cache_stream(key, response)
+        response = self._model.generate_content(contents, generation_config=generation_config, **kwargs)
+        data = response.to_dict()
+        if data.get('candidates') and data['candidates'][0].get('content', {}).get('parts'):
+            # Only cache responses that actually carry text; blocked or empty ones are retried
+            self.cache.set(key, data)
+        return response
+
+    def _cache_stream(self, key, response):
+        """Passes the chunks through and caches their text once the stream has ended."""
+        parts = []
+        for chunk in response:
+            try:
+                parts.append(chunk.text)
+            except ValueError:
+                pass  # Chunk carries no text (e.g. safety metadata only)
+            yield chunk
+        text = "".join(parts)
+        if text:
+            self.cache.set(key, {'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}}]})
+
+    def invalidate(self, contents, generation_config=None, **kwargs):
+        """Drops a cached response, e.g. one the caller could not parse, so the next call regenerates it."""
+        self.cache.discard(cache_key(self.model_name, contents, generation_config, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
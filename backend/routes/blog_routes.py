@@ -1,5 +1,6 @@
 from flask import jsonify, request, Blueprint
 from services.blog_service import BlogService
+from services.session_store import get_session_id
 from models.generative_model import extract_revised_prompt_and_questions, ModelResponseKeys, format_model_response
 import logging
 
@@ -11,6 +12,7 @@ class BlogController:
         self.blueprint = Blueprint("blog_routes", __name__)
         self.blueprint.add_url_rule("/initial", view_func=self.generate_initial_prompt, methods=["GET"])
         self.blueprint.add_url_rule("/refine", view_func=self.refine_prompt, methods=["POST"])
+        self.blueprint.add_url_rule("/stream", view_func=self.stream_blog, methods=["POST"])
         self.blog_service = BlogService()
         
     def generate_initial_prompt(self):
@@ -18,10 +20,7 @@ class BlogController:
         API route to generate the initial prompt for the blog.
         """
         try:
-            response = self.blog_service.session_state["chat"].send_message(self.blog_service.initial_prompt)
-            response_text = self.blog_service.get_response_text(response.to_dict())
-            revised_prompt, questions = extract_revised_prompt_and_questions(response_text)
-            self.blog_service.session_state['revisedPrompt'] = revised_prompt
+            revised_prompt, questions = self.blog_service.start_refinement(get_session_id())
             return jsonify(format_model_response(revised_prompt, questions)), 200
         except Exception as e:
             logger.error(f"Error generating initial prompt: {e}")
@@ -34,7 +33,16 @@ class BlogController:
         data = request.json
         user_query = data.get("query", "").strip()
         # return self.refine_prompt_helper(user_query)
-        return self.blog_service.refine_prompt(user_query)
+        return self.blog_service.refine_prompt(user_query, get_session_id())
+
+    def stream_blog(self):
+        """
+        API route to stream the final blog for the current revised prompt over SSE.
+        """
+        session_id = get_session_id()
+        if not self.blog_service.get_revised_prompt(session_id):
+            return jsonify({"error": "No revised prompt to generate from."}), 400
+        return self.blog_service.stream_final_blog(session_id)
     
     # def refine_prompt_helper(self, user_query):
     #     # user_query = data.get("feedback", "").strip()
@@ -1,29 +1,46 @@
 from flask import Blueprint, request, jsonify
-import torch
-import torch.nn.functional as F
-from transformers import BertTokenizer, BertModel
 # from datetime import datetime
 
 from services.memory_service import MemoryAgent
-from models.generative_model import get_model, reason_out_intent, Intent
+from models.generative_model import Intent
+from models.intent_classifier import intent_classifier
 # from models.generative_model import extract_revised_prompt_and_questions, ModelResponseKeys, format_model_response
 from services.blog_service import BlogService, BlogService2
-import logging
+from services.embedding_cache import get_text_embedding
+from services.session_store import get_session_id
+from services.bulk_ingest import BulkIngestor, Checkpoint
+from services.job_queue import JOB_QUEUE_PATH, JobQueue, WorkerPool
+import json, logging, os, uuid
+
+BULK_INGEST_MAX_REQUEST_DOCS = int(os.getenv("BULK_INGEST_MAX_REQUEST_DOCS", 1000))
+BULK_INGEST_WORKERS = int(os.getenv("BULK_INGEST_WORKERS", 1))
+# Per-job progress, so a job requeued after its worker died resumes instead of storing blogs twice
+BULK_INGEST_CHECKPOINT_DIR = os.getenv(
+    "BULK_INGEST_CHECKPOINT_DIR", os.path.join(os.getenv("STORAGE_PATH") or ".", "bulk_ingest")
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-tokenizer = BertTokenizer.from_pretrained('bert-large-uncased')
-embedding_model = BertModel.from_pretrained('bert-large-uncased')
-
 class ChatController:
     def __init__(self):
         self.blueprint = Blueprint("chat_routes", __name__)
         self.blueprint.add_url_rule("/", view_func=self.chat, methods=["POST"])
         self.blueprint.add_url_rule("/store", view_func=self._store_in_memory, methods=["POST"])
+        self.blueprint.add_url_rule("/store/bulk", view_func=self._store_bulk_in_memory, methods=["POST"])
+        self.blueprint.add_url_rule("/store/bulk/<job_id>", view_func=self.get_bulk_job, methods=["GET"])
         self.blueprint.add_url_rule("/test", view_func=self.testBlog, methods=["POST"])
+        self.blueprint.add_url_rule("/stream", view_func=self.streamBlog, methods=["POST"])
         self.memory_service = MemoryAgent()
         self.blog_service = BlogService()  # Initialize BlogController
+        self.job_queue = JobQueue(JOB_QUEUE_PATH)
+        self.worker_pool = WorkerPool(
+            self.job_queue, {"bulk_ingest": self._run_bulk_ingest}, num_workers=BULK_INGEST_WORKERS
+        )
+
+    def start_workers(self):
+        """Starts the bulk ingestion workers; called once by the serving process, never on import."""
+        self.worker_pool.start()
 
     def chat(self):
         data = request.json
@@ -36,35 +53,31 @@ class ChatController:
 
         try:
             if not intent:
-                intent_result = reason_out_intent(get_model(), user_query)
+                # The embedding is only computed if the keyword scorer is unsure, and is reused for retrieval below
+                intent_result = intent_classifier.classify(
+                    user_query, embed_fn=lambda: self._generate_embedding(user_query)
+                )
                 intent = intent_result.get("intent")
 
             if intent == Intent.BLOG_GENERATION.value:
                 query_embedding = self._generate_embedding(user_query)
 
                 if not user_feedback:
-                    embeddings = self.memory_service.query_embeddings(user_id="user123", content_type="blog")
-
-                    nearest_embeddings = sorted(
-                        embeddings,
-                        key=lambda x: F.cosine_similarity(
-                            torch.tensor(query_embedding, dtype=torch.float32).unsqueeze(0),
-                            torch.tensor(x.embedding, dtype=torch.float32).unsqueeze(0)
-                        ).item(),
-                        reverse=True  # Higher similarity first
-                    )[:5]
-                    results = []
-                    for e in nearest_embeddings:
-                        mongo_doc = self.memory_service.query_content_from_mongo(e.mongo_doc_id)
-                        if mongo_doc:
-                            results.append({"id": e.mongo_doc_id, "content": mongo_doc.get("content")})
+                    nearest_embeddings = self.memory_service.nearest(
+                        user_id="user123", content_type="blog", query_vec=query_embedding, k=5
+                    )
+                    mongo_docs = self.memory_service.fetch_contents(
+                        [e.mongo_doc_id for e in nearest_embeddings], projection={"content": 1}
+                    )
+                    results = [{"id": str(doc["_id"]), "content": doc.get("content")} for doc in mongo_docs]
 
                     return jsonify({"intent": intent, "results": results}), 200
 
                 elif user_feedback.lower() == "not_satisfied_with_previous_results":
+                    session_id = get_session_id()
                     if not prompt_refinement:
-                        self.blog_service.session_state["chat"].send_message(self.blog_service.initial_prompt)
-                    return self.blog_service.refine_prompt(user_query)
+                        self.blog_service.start_refinement(session_id)
+                    return self.blog_service.refine_prompt(user_query, session_id)
 
             elif intent == Intent.PRESENTATION_GENERATION.value:
                 return jsonify({"intent": intent, "message": "Presentation generation not yet implemented."}), 501
@@ -81,12 +94,7 @@ class ChatController:
         Generates an embedding for the given text using a model.
         """
         try:
-            inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=4096)
-
-            # Forward pass through the model
-            with torch.no_grad():
-                outputs = embedding_model(**inputs)
-            return torch.mean(outputs.last_hidden_state, dim=1).squeeze().tolist()  # 1024 length embeddings
+            return get_text_embedding(text)  # EMBEDDING_SPACE-sized embeddings
 
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
@@ -112,12 +120,68 @@ class ChatController:
         logger.info(f"Generated blog content stored in MongoDB with ID: {mongo_id}")    
         return jsonify({'message':f"stored in database successfully, blog content stored in MongoDB with ID: {mongo_id}"}), 200
 
+    def _store_bulk_in_memory(self):
+        """
+        Queues many blogs for storage in one request: a JSON body {"blogs": [...]}
+        or a JSONL body (one {"text": ...} per line). Responds 202 with the job
+        to poll at /store/bulk/<job_id>. Larger backfills should use
+        `python -m services.bulk_ingest`.
+        """
+        try:
+            if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+                lines = request.get_data(as_text=True).splitlines()
+                records = [json.loads(line) for line in lines if line.strip()]
+            else:
+                records = (request.get_json(silent=True) or {}).get("blogs", [])
+        except (ValueError, AttributeError):
+            return jsonify({"error": "Invalid request body"}), 400
+        if not isinstance(records, list) or not records:
+            return jsonify({"error": "No blogs to store"}), 400
+        if not all(isinstance(record, dict) for record in records):
+            return jsonify({"error": "Every blog must be a JSON object"}), 400
+        if len(records) > BULK_INGEST_MAX_REQUEST_DOCS:
+            return jsonify({"error": f"At most {BULK_INGEST_MAX_REQUEST_DOCS} blogs per request"}), 413
+
+        job_id = str(uuid.uuid4())
+        try:
+            self.job_queue.enqueue(job_id, "bulk_ingest", {"records": records})
+        except Exception as e:
+            logger.error(f"Error queueing bulk store: {e}")
+            return jsonify({"error": "Failed to queue blogs"}), 500
+        response = jsonify({"job_id": job_id, "status": "queued", "blogs": len(records)})
+        response.headers["Location"] = f"{request.path.rstrip('/')}/{job_id}"
+        return response, 202
+
+    def get_bulk_job(self, job_id):
+        job = self.job_queue.get(job_id)
+        if job is None or job["kind"] != "bulk_ingest":
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify({key: job[key] for key in ("id", "status", "attempts", "error", "created_at", "finished_at")}), 200
+
+    def _run_bulk_ingest(self, job_id, payload):
+        """Worker-side bulk store; resumes from the job's checkpoint if an earlier attempt died."""
+        os.makedirs(BULK_INGEST_CHECKPOINT_DIR, exist_ok=True)
+        checkpoint_path = os.path.join(BULK_INGEST_CHECKPOINT_DIR, f"{job_id}.json")
+        checkpoint = Checkpoint(checkpoint_path)
+        records = list(enumerate(payload["records"]))[checkpoint.offset:]
+        summary = BulkIngestor().ingest(records, checkpoint)
+        logger.info(f"Bulk job {job_id} stored {summary['ingested']} blogs ({summary['docs_per_sec']} docs/sec)")
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
     def testBlog(self):
         data = request.json
         query = data.get('query', '')
         res = b.generateBlog(query)
         return jsonify({"result":res}), 200
 
+    def streamBlog(self):
+        data = request.json
+        query = data.get('query', '').strip()
+        if not query:
+            return jsonify({"error": "Query is required"}), 400
+        return b.streamBlog(query, on_complete=self.blog_service.store_blog)
+
 b = BlogService2()
 chat_controller = ChatController()
 chat_routes = chat_controller.blueprint
@@ -1,12 +1,25 @@
-from flask import Blueprint, request, jsonify, send_file, json
+from flask import Blueprint, current_app, request, jsonify, send_file, json
 # from services.presentation_service import create_presentation, fetch_content_from_gemini
 from services.presentation_service import PresentationService
+from services.job_queue import JOB_QUEUE_PATH, JobQueue, WorkerPool
+from services.render_pool import get_render_pool
+from services.render_worker import render_pptx_bytes
+from services.presentation_store import get_presentation_store
+from services.artifact_store import get_artifact_store
 from dotenv import load_dotenv
-import logging, os, uuid
+import hashlib, logging, os, time, uuid
 from configs.config import themes, supported_layouts
+from utils.metrics import metrics
 
 load_dotenv()
 GENERATED_FILES_DIR = os.getenv("STORAGE_PATH")
+PRESENTATION_WORKERS = int(os.getenv("PRESENTATION_WORKERS", 2))
+PRESENTATION_STREAMING = os.getenv("PRESENTATION_STREAMING", "true").lower() == "true"
+# How streamed decks are rendered. "inline" (default) renders each slide in the job thread as it
+# arrives, so rendering overlaps generation; "pool" waits for the whole deck and renders it in the
+# render pool, keeping python-pptx off the server's GIL at the cost of that overlap.
+# Non-streamed jobs always use the render pool when it is enabled.
+PRESENTATION_STREAM_RENDER = os.getenv("PRESENTATION_STREAM_RENDER", "inline").lower()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,9 +28,22 @@ class PresentationController:
     def __init__(self):
         self.blueprint = Blueprint("presentation_routes", __name__)
         self.blueprint.add_url_rule("/", view_func=self.create_presentation, methods=["POST"])
+        self.blueprint.add_url_rule("/", view_func=self.list_presentations, methods=["GET"])
         self.blueprint.add_url_rule("/<presentation_id>", view_func=self.get_presentation_details, methods=["GET"])
         self.blueprint.add_url_rule("/<presentation_id>/download", view_func=self.download_presentation, methods=["GET"])
         self.blueprint.add_url_rule("/<presentation_id>/configure", view_func=self.configure_presentation, methods=["POST"])
+        self.store = get_presentation_store()
+        self.artifacts = get_artifact_store()
+        self.job_queue = JobQueue(JOB_QUEUE_PATH)
+        self.worker_pool = WorkerPool(
+            self.job_queue,
+            {"create": self._run_presentation_job, "configure": self._run_presentation_job},
+            num_workers=PRESENTATION_WORKERS,
+        )
+
+    def start_workers(self):
+        """Starts the job workers; called once by the serving process, never on import."""
+        self.worker_pool.start()
 
     def _validate_request(self, data):
         topic = data.get("topic")
@@ -46,36 +72,96 @@ class PresentationController:
             layouts = layouts[:num_slides]
         return layouts
 
-    def _save_presentation(self, prs, presentation_id):
-        pptx_path = os.path.join(GENERATED_FILES_DIR, f"{presentation_id}.pptx")
+    def _save_presentation(self, data, presentation_id):
         try:
-            with open(pptx_path, 'wb') as pptx_file:
-                prs.save(pptx_file)
-            return pptx_path
+            # Atomic: downloads never see a partially written deck
+            return self.artifacts.put(f"{presentation_id}.pptx", data)
         except Exception as e:
             logger.error("Error saving presentation file: %s", e)
             raise
 
     def _save_presentation_details(self, presentation_id, details):
-        json_path = os.path.join(GENERATED_FILES_DIR, f"{presentation_id}.json")
         try:
-            with open(json_path, 'w') as json_file:
-                json.dump(details, json_file, indent=4)
+            self.store.save(details)
         except Exception as e:
             logger.error("Error saving presentation details: %s", e)
             raise
 
     def _load_presentation_details(self, presentation_id):
-        json_path = os.path.join(GENERATED_FILES_DIR, f"{presentation_id}.json")
-        if not os.path.exists(json_path):
-            logger.info("Presentation ID %s does not exist", presentation_id)
-            return None
         try:
-            with open(json_path, 'r') as json_file:
-                return json.load(json_file)
+            details = self.store.get(presentation_id)
         except Exception as e:
             logger.error("Error reading presentation details: %s", e)
             raise
+        if details is None:
+            logger.info("Presentation ID %s does not exist", presentation_id)
+        return details
+
+    def _run_presentation_job(self, presentation_id, payload):
+        """
+        Worker-side pipeline: LLM content generation, deck rendering (in the
+        render pool when enabled) and saving.
+        Stage timings and the final status are written to the presentation details.
+        """
+        details = self._load_presentation_details(presentation_id)
+        if details is None:
+            logger.error("Presentation %s was removed before its %s job ran; skipping", presentation_id,
+                         payload["done_status"])
+            return
+        timings = details.setdefault("timings", {})
+        timings["queued_ms"] = round((time.time() - payload["enqueued_at"]) * 1000)
+        details["status"] = "running"
+        self._save_presentation_details(presentation_id, details)
+
+        def timed(stage, fn, *args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            elapsed_ms = round((time.perf_counter() - start) * 1000)
+            timings[f"{stage}_ms"] = elapsed_ms
+            metrics.observe(f"presentations.{stage}_ms", elapsed_ms)
+            return result
+
+        render_pool = get_render_pool()
+        try:
+            if payload.get("stream") and (PRESENTATION_STREAM_RENDER == "inline" or not render_pool.enabled):
+                # Slides are rendered in this thread as they stream in, so generation and rendering overlap
+                content = service.stream_content_from_gemini(details["topic"], details["num_slides"], details["layouts"])
+                data = timed("generate_render", render_pptx_bytes, content, details["theme"])
+            else:
+                if payload.get("stream"):
+                    content = timed("generate", lambda: list(service.stream_content_from_gemini(
+                        details["topic"], details["num_slides"], details["layouts"])))
+                else:
+                    content = timed("generate", service.fetch_content_from_gemini,
+                                    details["topic"], details["num_slides"], details["layouts"])
+                # Build and serialize in a worker process so it doesn't contend for the GIL
+                data = timed("render", render_pool.render, content, details["theme"])
+            timed("save", self._save_presentation, data, presentation_id)
+            # Strong ETag for downloads; only changes when the deck's bytes do
+            details["content_hash"] = hashlib.sha256(data).hexdigest()
+            details["status"] = payload["done_status"]
+            details.pop("error", None)
+        except Exception as e:
+            logger.error("Error building presentation %s: %s", presentation_id, e)
+            details["status"] = "failed"
+            details["error"] = "Failed to create presentation"
+            metrics.increment("presentations.failed")
+            raise
+        finally:
+            timings["total_ms"] = round((time.time() - payload["enqueued_at"]) * 1000)
+            self._save_presentation_details(presentation_id, details)
+
+    def _enqueue(self, kind, presentation_details, done_status, stream=False):
+        presentation_details["status"] = "queued"
+        presentation_details["timings"] = {}
+        self._save_presentation_details(presentation_details["id"], presentation_details)
+        self.job_queue.enqueue(
+            presentation_details["id"], kind,
+            {"enqueued_at": time.time(), "done_status": done_status, "stream": stream},
+        )
+        response = jsonify(presentation_details)
+        response.headers["Location"] = f"/api/v1/presentations/{presentation_details['id']}"
+        return response, 202
 
     def create_presentation(self):
         data = request.json
@@ -89,32 +175,41 @@ class PresentationController:
         theme = data.get("theme", "default")
         layouts = self._extend_or_trim_layouts(data.get("layouts", []), num_slides)
 
-        try:
-            content = service.fetch_content_from_gemini(topic, num_slides, layouts)
-            print('here',content)
-            prs = service.create_presentation(content, theme_name=theme)
-        except Exception as e:
-            logger.error("Error creating presentation: %s", e)
-            return jsonify({"error": "Failed to create presentation"}), 500
-
         presentation_id = str(uuid.uuid4())
+        presentation_details = {
+            "id": presentation_id,
+            "topic": topic,
+            "num_slides": num_slides,
+            "theme": theme,
+            "layouts": layouts,
+            "download_url": f"/api/v1/presentations/{presentation_id}/download",
+            "created_at": time.time(),
+            # "silde_data": content
+        }
         try:
-            self._save_presentation(prs, presentation_id)   # Saving .pptx file
-            presentation_details = {
-                "id": presentation_id,
-                "topic": topic,
-                "num_slides": num_slides,
-                "theme": theme,
-                "layouts": layouts,
-                "status": "created",
-                "download_url": f"/api/v1/presentations/{presentation_id}/download",
-                # "silde_data": content
-            }
-            self._save_presentation_details(presentation_id, presentation_details)  # Saving the metadata about slide
+            # New decks stream; reconfigured ones keep the cached path so theme-only changes skip the LLM
+            return self._enqueue("create", presentation_details, done_status="created", stream=PRESENTATION_STREAMING)
         except Exception as e:
+            logger.error("Error queueing presentation: %s", e)
             return jsonify({"error": str(e)}), 500
 
-        return jsonify(presentation_details), 201
+    def list_presentations(self):
+        """Newest-first page of presentations, optionally filtered by topic, theme or status."""
+        try:
+            limit = int(request.args.get("limit", 20))
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        try:
+            presentations, next_cursor = self.store.list(
+                limit=limit,
+                cursor=request.args.get("cursor"),
+                topic=request.args.get("topic"),
+                theme=request.args.get("theme"),
+                status=request.args.get("status"),
+            )
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        return jsonify({"presentations": presentations, "next_cursor": next_cursor}), 200
 
     def get_presentation_details(self, presentation_id):
         presentation_details = self._load_presentation_details(presentation_id)
@@ -123,15 +218,34 @@ class PresentationController:
         return jsonify(presentation_details), 200
 
     def download_presentation(self, presentation_id):
-        pptx_path = os.path.join(GENERATED_FILES_DIR, f"{presentation_id}.pptx")
-        if os.path.exists(pptx_path):
-            return send_file(pptx_path, as_attachment=True)
+        """
+        Serves the deck with a strong ETag from its content hash.
+
+        Revalidations (If-None-Match) get a 304 straight from the details JSON
+        without touching the deck. Otherwise send_file handles Range requests
+        and hands the file to the server's zero-copy path (wsgi.file_wrapper,
+        or X-Sendfile when USE_X_SENDFILE is set).
+        """
+        details = self._load_presentation_details(presentation_id) or {}
+        etag = details.get("content_hash")
+        if etag and request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            return response
+
+        pptx_path = self.artifacts.locate(f"{presentation_id}.pptx")
+        if pptx_path:
+            # Decks written before content hashes existed fall back to werkzeug's mtime/size ETag
+            return send_file(pptx_path, as_attachment=True, conditional=True, etag=etag or True)
         return jsonify({"error": "Presentation not found"}), 404
 
     def configure_presentation(self, presentation_id):
         presentation_details = self._load_presentation_details(presentation_id)
         if not presentation_details:
             return jsonify({"error": "Presentation not found"}), 404
+        if presentation_details.get("status") in ("queued", "running"):
+            return jsonify({"error": "Presentation is still being generated"}), 409
 
         data = request.json
         if "topic" in data:
@@ -166,17 +280,11 @@ class PresentationController:
             layouts = presentation_details["layouts"]
 
         try:
-            content = service.fetch_content_from_gemini(presentation_details["topic"], num_slides, layouts)
-            prs = service.create_presentation(content, theme_name=theme)
-            self._save_presentation(prs, presentation_id)
-            presentation_details["status"] = "updated"
-            self._save_presentation_details(presentation_id, presentation_details)
+            return self._enqueue("configure", presentation_details, done_status="updated")
         except Exception as e:
             logger.error("Error configuring presentation: %s", e)
             return jsonify({"error": str(e)}), 500
 
-        return jsonify(presentation_details), 200
-
 service = PresentationService()
 presentation_controller = PresentationController()
 presentation_routes = presentation_controller.blueprint
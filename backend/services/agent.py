@@ -26,32 +26,9 @@
 
 from googlesearch import search
 import requests
-from bs4 import BeautifulSoup
+from services.html_extractor import extract_text
 
-def clean_html(html_content):
-    # Parse the HTML content
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Remove <script> and <style> tags
-    for script_or_style in soup(['script', 'style']):
-        script_or_style.decompose()
-    
-    # Remove unnecessary tags (e.g., comments, metadata)
-    for unwanted in soup(['noscript', 'iframe', 'svg', 'form', 'input']):
-        unwanted.decompose()
-
-    # Extract the main content (adjust selectors based on your needs)
-    main_content = soup.find('body')  # Use a more specific selector if needed
-    if main_content:
-        # Remove empty tags and clean text
-        for tag in main_content.find_all():
-            if not tag.text.strip():
-                tag.decompose()
-
-    # Get cleaned text
-    cleaned_text = main_content.get_text(separator=' ', strip=True) if main_content else ''
-    
-    return cleaned_text
+clean_html = extract_text
 
 query = "Give me latest information in Kumbh Mela"
 results = search(query, num_results=2, advanced=True)
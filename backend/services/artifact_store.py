@@ -0,0 +1,206 @@
+import argparse
+import hashlib
+import logging
+import os
+import time
+import uuid
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ARTIFACT_ROOT = os.getenv("ARTIFACT_ROOT", os.getenv("STORAGE_PATH"))
+# Store identical files once and hard-link them under each name
+ARTIFACT_DEDUP = os.getenv("ARTIFACT_DEDUP", "false").lower() == "true"
+ARTIFACT_RETENTION_DAYS = float(os.getenv("ARTIFACT_RETENTION_DAYS", 0))  # 0 keeps artifacts forever
+ARTIFACT_SWEEP_BATCH = int(os.getenv("ARTIFACT_SWEEP_BATCH", 1000))
+
+TMP_SUFFIX = ".tmp"
+# Leftover temp files from crashed writers older than this are swept regardless of retention
+STALE_TMP_SECONDS = 3600
+
+
+class ArtifactStore:
+    """
+    Generated files under `root`, sharded by a hash of their name.
+
+    `report.pptx` lives at `root/ab/cd/report.pptx`, where `abcd...` is the
+    sha256 of the name, so no directory holds more than a few thousand
+    entries. Writes go to a temp file in the same directory and are renamed
+    into place, so readers see the old file or the new one, never a partial
+    one. With `dedup` on, content is stored once under `root/blobs/` and every
+    name is a hard link to its blob.
+    """
+
+    def __init__(self, root=ARTIFACT_ROOT, dedup=ARTIFACT_DEDUP, shard_depth=2):
+        self.root = root
+        self.dedup = dedup
+        self.shard_depth = shard_depth
+        self.blob_root = os.path.join(root, "blobs")
+
+    def _shard_dir(self, base, digest):
+        parts = [digest[2 * i:2 * i + 2] for i in range(self.shard_depth)]
+        return os.path.join(base, *parts)
+
+    def path(self, name):
+        """Sharded path for `name`, whether or not it exists."""
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+        return os.path.join(self._shard_dir(self.root, digest), name)
+
+    def locate(self, name):
+        """Existing path for `name`, including files written flat into `root` before sharding, or None."""
+        for path in (self.path(name), os.path.join(self.root, name)):
+            if os.path.isfile(path):
+                return path
+        return None
+
+    @staticmethod
+    def _write_tmp(directory, data):
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}{TMP_SUFFIX}")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def _blob_path(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        return os.path.join(self._shard_dir(self.blob_root, digest), digest)
+
+    def put(self, name, data):
+        """
+        Atomically stores `data` under `name`, replacing any previous version.
+
+        Returns:
+            str: The artifact's path.
+        """
+        target = self.path(name)
+        if not self.dedup:
+            os.replace(self._write_tmp(os.path.dirname(target), data), target)
+            return target
+
+        blob = self._blob_path(data)
+        # Link under a temp name first so the rename onto the target stays atomic
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_link = os.path.join(os.path.dirname(target), f".{uuid.uuid4().hex}{TMP_SUFFIX}")
+        try:
+            os.link(blob, tmp_link)
+        except FileNotFoundError:
+            # New content, or an orphaned blob the sweeper just removed
+            os.replace(self._write_tmp(os.path.dirname(blob), data), blob)
+            os.link(blob, tmp_link)
+        os.replace(tmp_link, target)
+        if os.path.lexists(tmp_link):
+            # rename() does nothing when both names are already links to the same blob
+            os.remove(tmp_link)
+        # Every link shares the blob's mtime; refresh it so sweep() ages this name from now
+        os.utime(target)
+        return target
+
+    def delete(self, name):
+        path = self.locate(name)
+        if path is None:
+            return False
+        os.remove(path)
+        return True
+
+    def _shard_dirs(self, after=None):
+        """
+        Yields (position, leaf shard directory) in a fixed order: name shards,
+        then blob shards. Directories at or before the `after` position are
+        pruned without being listed.
+        """
+        def walk(directory, position):
+            depth = len(position) - 1
+            try:
+                entries = sorted(e.name for e in os.scandir(directory) if e.is_dir() and len(e.name) == 2)
+            except FileNotFoundError:
+                return
+            for entry in entries:
+                child_position = position + (entry,)
+                if after is not None and child_position < after[:len(child_position)]:
+                    continue
+                child = os.path.join(directory, entry)
+                if depth + 1 < self.shard_depth:
+                    yield from walk(child, child_position)
+                elif after is None or child_position > after:
+                    yield child_position, child
+
+        for tier, base in ((0, self.root), (1, self.blob_root)):
+            if after is None or tier >= after[0]:
+                yield from walk(base, (tier,))
+
+    def sweep(self, older_than, cursor=None, max_dirs=ARTIFACT_SWEEP_BATCH):
+        """
+        Deletes artifacts last modified more than `older_than` seconds ago,
+        visiting at most `max_dirs` shard directories per call.
+
+        Stale temp files from crashed writers are removed too, and with dedup
+        so are blobs no name links to any more. Call again with the returned
+        cursor to continue; a cursor of None means the pass is complete.
+
+        Returns:
+            tuple[int, str | None]: Files removed and the cursor for the next call.
+        """
+        now = time.time()
+        after = None
+        if cursor:
+            tier, _, shards = cursor.partition(":")
+            after = (int(tier), *shards.split("/"))
+        removed, visited = 0, 0
+        for position, directory in self._shard_dirs(after):
+            if visited >= max_dirs:
+                return removed, cursor
+            visited += 1
+            is_blob_dir = position[0] == 1
+            for entry in os.scandir(directory):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                age = now - stat.st_mtime
+                if entry.name.endswith(TMP_SUFFIX):
+                    expired = age > STALE_TMP_SECONDS
+                elif is_blob_dir:
+                    # Unlinked blobs get the temp-file grace period so a concurrent put can still claim them
+                    expired = stat.st_nlink <= 1 and age > STALE_TMP_SECONDS
+                else:
+                    expired = older_than is not None and age > older_than
+                if expired:
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+            cursor = f"{position[0]}:{'/'.join(position[1:])}"
+        return removed, None
+
+
+def get_artifact_store():
+    return ArtifactStore()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove expired artifacts, one batch of shard directories at a time.")
+    parser.add_argument("--root", default=ARTIFACT_ROOT)
+    parser.add_argument("--older-than-days", type=float, default=ARTIFACT_RETENTION_DAYS)
+    parser.add_argument("--batch", type=int, default=ARTIFACT_SWEEP_BATCH, help="shard directories per batch")
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.root)
+    older_than = args.older_than_days * 86400 if args.older_than_days > 0 else None
+    cursor, total = None, 0
+    while True:
+        removed, cursor = store.sweep(older_than, cursor=cursor, max_dirs=args.batch)
+        total += removed
+        if cursor is None:
+            break
+        logger.info(f"Swept up to {cursor}: {total} files removed so far")
+    logger.info(f"Sweep complete: {total} files removed")
@@ -1,9 +1,6 @@
 import logging
 from datetime import datetime
 from flask import jsonify
-from transformers import BertTokenizer, BertModel
-import torch.nn.functional as F
-import torch
 from models.generative_model import (
     get_model,
     extract_revised_prompt_and_questions,
@@ -13,20 +10,18 @@ from models.generative_model import (
 )
 from services.memory_service import MemoryAgent
 from services.search_service import SearchAgent
+from services.embedding_cache import get_text_embedding
+from services.streaming import GenerationStream, sse_response
+from services.session_store import session_store
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class BlogService:
     def __init__(self):
-        self.tokenizer = BertTokenizer.from_pretrained('bert-large-uncased')
-        self.embedding_model = BertModel.from_pretrained('bert-large-uncased')
         self.model = get_model()
         self.memory_service = MemoryAgent()
-        self.session_state = {
-            "chat": self.model.start_chat(history=[]),
-            "revisedPrompt": ''
-        }
+        self.sessions = session_store
         self.initial_prompt = (
             'I want you to become my prompt engineer. Your objective is to assist me in creating the most '
             'effective prompt tailored to my requirements. This prompt will be used by you. '
@@ -53,49 +48,82 @@ class BlogService:
             return response_text[start:end].strip('*\n()')
         return "Revised prompt not found."
 
-    def refine_prompt(self, user_query):
+    def store_blog(self, final_text):
+        """Embeds a generated blog and stores it in MongoDB and the vector store."""
+        embedding = get_text_embedding(final_text)
+        mongo_id = self.memory_service.store_content_in_mongo(
+            user_id="user123",
+            content_type="blog",
+            content={"revised_prompt": final_text},
+            additional_info={"status": "generated"}
+        )
+        self.memory_service.store_vector_embedding(
+            user_id="user123",
+            mongo_doc_id=mongo_id,
+            embedding=embedding,
+            content_type="blog",
+            additional_info="tone: conversational",
+            # created_at=datetime.now()
+        )
+        logger.info(f"Generated blog content stored in MongoDB with ID: {mongo_id}")
+        return mongo_id
+
+    def send_message(self, session, text):
+        """
+        Sends one turn of a session's conversation and records it.
+
+        The chat is rebuilt from the session's stored (token-capped) history,
+        so each user only resends their own recent turns to Gemini.
+
+        Returns:
+            str: The model's reply.
+        """
+        chat = self.model.start_chat(history=session.history)
+        response = chat.send_message(text)
+        response_text = self.get_response_text(response.to_dict())
+        session.append("user", text)
+        session.append("model", response_text)
+        return response_text
+
+    def start_refinement(self, session_id):
+        """Opens a session's conversation with the prompt-engineer instructions and returns the first reply."""
+        session = self.sessions.get(session_id)
+        session.history = []
+        response_text = self.send_message(session, self.initial_prompt)
+        revised_prompt, questions = extract_revised_prompt_and_questions(response_text)
+        session.revised_prompt = revised_prompt
+        self.sessions.save(session)
+        return revised_prompt, questions
+
+    def get_revised_prompt(self, session_id):
+        return self.sessions.get(session_id).revised_prompt
+
+    def stream_final_blog(self, session_id):
+        """
+        Streams the blog for the session's current revised prompt as Server-Sent Events.
+        The finished text is embedded and stored once the stream has closed.
+        """
+        stream = GenerationStream(self.model, self.get_revised_prompt(session_id), "blog")
+        return sse_response(stream, on_complete=self.store_blog)
+
+    def refine_prompt(self, user_query, session_id):
+        session = self.sessions.get(session_id)
         if user_query.lower() == "done":
-            final_prompt = self.session_state['revisedPrompt']
+            final_prompt = session.revised_prompt
             try:
                 final_response = self.model.generate_content(final_prompt).to_dict()
                 final_text = self.get_response_text(final_response)
-                inputs = self.tokenizer(
-                    final_text,
-                    return_tensors="pt",
-                    padding=True,
-                    truncation=True,
-                    max_length=512
-                )
-
-                with torch.no_grad():
-                    outputs = self.embedding_model(**inputs)
-                embedding = torch.mean(outputs.last_hidden_state, dim=1).squeeze().tolist()
-
-                mongo_id = self.memory_service.store_content_in_mongo(
-                    user_id="user123",
-                    content_type="blog",
-                    content={"revised_prompt": final_text},
-                    additional_info={"status": "generated"}
-                )
-                self.memory_service.store_vector_embedding(
-                    user_id="user123",
-                    mongo_doc_id=mongo_id,
-                    embedding=embedding,
-                    content_type="blog",
-                    additional_info="tone: conversational",
-                    # created_at=datetime.now()
-                )
-                logger.info(f"Generated blog content stored in MongoDB with ID: {mongo_id}")
+                self.store_blog(final_text)
                 return jsonify({'Final Blog': final_text}), 200
             except Exception as e:
                 logger.error(f"Error generating final content: {e}")
                 return jsonify({"error": "Failed to generate final content."}), 500
 
         try:
-            response = self.session_state["chat"].send_message(user_query)
-            response_text = self.get_response_text(response.to_dict())
+            response_text = self.send_message(session, user_query)
             revised_prompt, questions = extract_revised_prompt_and_questions(response_text)
-            self.session_state['revisedPrompt'] = revised_prompt
+            session.revised_prompt = revised_prompt
+            self.sessions.save(session)
             return jsonify(format_model_response(revised_prompt, questions)), 200
         except Exception as e:
             logger.error(f"Error refining prompt: {e}")
@@ -110,37 +138,16 @@ class BlogService2:
         self.search_service = SearchAgent()
 
     def getPreviousContents(self, query):
-        tokenizer = BertTokenizer.from_pretrained('bert-large-uncased')
-        embedding_model = BertModel.from_pretrained('bert-large-uncased')
-        inputs = tokenizer(
-                    query,
-                    return_tensors="pt",
-                    padding=True,
-                    truncation=True,
-                    max_length=512
-        )
-
-        with torch.no_grad():
-            outputs = embedding_model(**inputs)
-        query_embedding = torch.mean(outputs.last_hidden_state, dim=1).squeeze().tolist()
+        query_embedding = get_text_embedding(query)
 
-        embeddings = self.memory_service.query_embeddings(user_id="user123", content_type="blog")
-
-        nearest_embeddings = sorted(
-            embeddings,
-            key=lambda x: F.cosine_similarity(
-            torch.tensor(query_embedding, dtype=torch.float32).unsqueeze(0),
-            torch.tensor(x.embedding, dtype=torch.float32).unsqueeze(0)
-            ).item(), reverse=True
-        )[:5]
-
-        results = []
-        for e in nearest_embeddings:
-            mongo_doc = self.memory_service.query_content_from_mongo(e.mongo_doc_id)
-            if mongo_doc:
-                results.append({"id": e.mongo_doc_id, "content": mongo_doc.get("content")})
+        nearest_embeddings = self.memory_service.nearest(
+            user_id="user123", content_type="blog", query_vec=query_embedding, k=5
+        )
 
-        return results
+        mongo_docs = self.memory_service.fetch_contents(
+            [e.mongo_doc_id for e in nearest_embeddings], projection={"content": 1}
+        )
+        return [{"id": str(doc["_id"]), "content": doc.get("content")} for doc in mongo_docs]
 
     def get_response_text(self, response):
         try:
@@ -149,11 +156,22 @@ class BlogService2:
             return "No response available from the model."
 
     def generateBlog(self, query):
+        final_prompt = self.buildBlogPrompt(query)
+        final_response = get_model().generate_content(final_prompt).to_dict()
+        final_text = self.get_response_text(final_response)
+
+        return final_text
+
+    def buildBlogPrompt(self, query):
         a = self.getPreviousContents(query)
         b = self.search_service.fetch_articles(query)
         print(a, b)
-        final_prompt = getBlogGenerationPrompt(query, a, b)
-        final_response = get_model().generate_content(final_prompt).to_dict()
-        final_text = self.get_response_text(final_response)
+        return getBlogGenerationPrompt(query, a, b)
 
-        return final_text
\ No newline at end of file
+    def streamBlog(self, query, on_complete=None):
+        """
+        Streams the generated blog as Server-Sent Events. Retrieval and article
+        fetching happen up front; `on_complete(text)` runs after the stream closes.
+        """
+        stream = GenerationStream(get_model(), self.buildBlogPrompt(query), "chat_blog")
+        return sse_response(stream, on_complete=on_complete)
@@ -0,0 +1,194 @@
+import argparse
+import json
+import logging
+import os
+import time
+import uuid
+from bson import ObjectId
+from dotenv import load_dotenv
+from services.embedding_service import get_embedding_engine
+from services.memory_service import MemoryAgent
+from utils.metrics import metrics
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BULK_INGEST_BATCH_SIZE = int(os.getenv("BULK_INGEST_BATCH_SIZE", 256))
+# Texts per model forward pass; smaller than the write batch to bound padding and memory
+BULK_EMBED_BATCH_SIZE = int(os.getenv("BULK_EMBED_BATCH_SIZE", 32))
+
+
+def record_text(record):
+    """The blog text of an input record; "Final Blog" is the /store payload's key."""
+    return (record.get("text") or record.get("Final Blog") or "").strip()
+
+
+def read_jsonl(path, start=0):
+    """Yields (line_number, record) for every non-empty line from `start` onwards."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f):
+            if line_number < start or not line.strip():
+                continue
+            yield line_number, json.loads(line)
+
+
+class Checkpoint:
+    """
+    Resume point for an ingestion run, kept in a small JSON file.
+
+    Before a batch is written its document IDs are recorded as `pending`; a
+    run that dies mid-batch leaves them there, and the next run deletes those
+    documents before redoing the batch, so nothing is stored twice.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.ingested = 0
+        self.pending = []
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                state = json.load(f)
+            self.offset = state.get("offset", 0)
+            self.ingested = state.get("ingested", 0)
+            self.pending = state.get("pending", [])
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"offset": self.offset, "ingested": self.ingested, "pending": self.pending}, f)
+        os.replace(tmp_path, self.path)
+
+
+class BulkIngestor:
+    """
+    Stores blogs in batches: one batched embedding pass per few dozen texts,
+    one Mongo `insert_many` and one Postgres executemany per batch.
+    """
+
+    def __init__(self, embed_fn=None, memory_agent=MemoryAgent, batch_size=BULK_INGEST_BATCH_SIZE,
+                 embed_batch_size=BULK_EMBED_BATCH_SIZE):
+        self.embed_fn = embed_fn or (lambda texts: get_embedding_engine().embed(texts))
+        self.memory_agent = memory_agent
+        self.batch_size = batch_size
+        self.embed_batch_size = embed_batch_size
+
+    def embed_texts(self, texts):
+        # Length-sorted sub-batches keep padding low; vectors are returned in input order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.embed_batch_size):
+            chunk = order[start:start + self.embed_batch_size]
+            for i, vector in zip(chunk, self.embed_fn([texts[i] for i in chunk])):
+                vectors[i] = [float(x) for x in vector]
+        return vectors
+
+    def ingest_batch(self, records, checkpoint=None, next_offset=None):
+        """
+        Embeds and stores one batch of records.
+
+        Returns:
+            int: Number of documents stored (records without text are skipped).
+        """
+        records = [r for r in records if record_text(r)]
+        if not records:
+            if checkpoint is not None and next_offset is not None:
+                checkpoint.offset = next_offset
+                checkpoint.save()
+            return 0
+        texts = [record_text(r) for r in records]
+        vectors = self.embed_texts(texts)
+
+        ids = [ObjectId() for _ in records]
+        if checkpoint is not None:
+            checkpoint.pending = [str(i) for i in ids]
+            checkpoint.save()
+
+        documents = [
+            {
+                "_id": doc_id,
+                "user_id": record.get("user_id", "user123"),
+                "content_type": record.get("content_type", "blog"),
+                "content": {"revised_prompt": text},
+                "additional_info": {"status": record.get("status", "imported")},
+            }
+            for doc_id, record, text in zip(ids, records, texts)
+        ]
+        self.memory_agent.store_contents_in_mongo(documents)
+        self.memory_agent.store_vector_embeddings([
+            {
+                "user_id": document["user_id"],
+                "mongo_doc_id": str(document["_id"]),
+                "embedding": vector,
+                "content_type": document["content_type"],
+                "additional_info": record.get("additional_info", "tone: conversational"),
+            }
+            for document, vector, record in zip(documents, vectors, records)
+        ])
+
+        if checkpoint is not None:
+            checkpoint.pending = []
+            checkpoint.ingested += len(records)
+            if next_offset is not None:
+                checkpoint.offset = next_offset
+            checkpoint.save()
+        return len(records)
+
+    def ingest(self, records, checkpoint=None):
+        """
+        Ingests (line_number, record) pairs in batches.
+
+        Returns:
+            dict: Documents stored, elapsed seconds and docs/sec for this run.
+        """
+        if checkpoint is not None and checkpoint.pending:
+            logger.info(f"Rolling back {len(checkpoint.pending)} documents from an interrupted batch")
+            self.memory_agent.delete_contents(checkpoint.pending)
+            checkpoint.pending = []
+            checkpoint.save()
+
+        start = time.perf_counter()
+        stored, batch, last_line = 0, [], None
+        for line_number, record in records:
+            batch.append(record)
+            last_line = line_number
+            if len(batch) >= self.batch_size:
+                stored += self._timed_batch(batch, checkpoint, last_line + 1, stored, start)
+                batch = []
+        if batch:
+            stored += self._timed_batch(batch, checkpoint, last_line + 1, stored, start)
+
+        elapsed = time.perf_counter() - start
+        return {"ingested": stored, "seconds": round(elapsed, 3), "docs_per_sec": round(stored / elapsed, 1) if elapsed else 0.0}
+
+    def _timed_batch(self, batch, checkpoint, next_offset, stored_so_far, run_start):
+        batch_start = time.perf_counter()
+        count = self.ingest_batch(batch, checkpoint, next_offset)
+        metrics.increment("bulk_ingest.documents", count)
+        metrics.observe("bulk_ingest.batch_ms", (time.perf_counter() - batch_start) * 1000)
+        total = stored_so_far + count
+        logger.info(f"Ingested {total} documents ({total / (time.perf_counter() - run_start):.1f} docs/sec)")
+        return count
+
+
+def ingest_file(path, checkpoint_path=None, batch_size=BULK_INGEST_BATCH_SIZE):
+    """Ingests a JSONL file, resuming from `checkpoint_path` if it exists."""
+    checkpoint = Checkpoint(checkpoint_path)
+    if checkpoint.offset:
+        logger.info(f"Resuming {path} at line {checkpoint.offset} ({checkpoint.ingested} already ingested)")
+    return BulkIngestor(batch_size=batch_size).ingest(read_jsonl(path, checkpoint.offset), checkpoint)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load blogs from a JSONL file (one {\"text\": ...} per line).")
+    parser.add_argument("path")
+    parser.add_argument("--checkpoint", help="progress file; defaults to <path>.checkpoint")
+    parser.add_argument("--batch-size", type=int, default=BULK_INGEST_BATCH_SIZE)
+    args = parser.parse_args()
+
+    summary = ingest_file(args.path, args.checkpoint or f"{args.path}.checkpoint", args.batch_size)
+    logger.info(f"Done: {summary['ingested']} documents in {summary['seconds']}s ({summary['docs_per_sec']} docs/sec)")
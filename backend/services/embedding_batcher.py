@@ -0,0 +1,140 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from dotenv import load_dotenv
+from services.embedding_service import get_embedding_engine
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", 32))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", 5))
+EMBEDDING_BATCH_MAX_CHARS = int(os.getenv("EMBEDDING_BATCH_MAX_CHARS", 32768))
+
+
+def _frozen(vector):
+    """
+    A compact, read-only float32 copy of one row: callers share cached vectors
+    without being able to change them, and the copy does not keep the whole
+    batch matrix alive.
+    """
+    vector = np.array(vector, dtype=np.float32, copy=True)
+    vector.setflags(write=False)
+    return vector
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front end for the embedding model.
+
+    Callers submit single texts from their own request threads. A background
+    worker gathers whatever arrives within `max_wait_ms` (up to
+    `max_batch_size` texts), sorts them by length so similarly sized texts are
+    padded together, runs as few forward passes as the padded size budget
+    allows and resolves each caller's future with its own vector.
+    """
+
+    def __init__(self, embed_fn=None, max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+                 max_wait_ms=EMBEDDING_BATCH_WAIT_MS, max_padded_chars=EMBEDDING_BATCH_MAX_CHARS):
+        self.embed_fn = embed_fn or (lambda texts: get_embedding_engine().embed(texts))
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_padded_chars = max_padded_chars
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, text):
+        """Queues a text for embedding and returns a Future resolving to its vector."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text, timeout=None):
+        """Embeds a single text through the batcher and returns it as a read-only float32 array."""
+        return self.submit(text).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _split(self, batch):
+        """Splits a length-sorted batch so no pass pads more than `max_padded_chars`."""
+        passes, current = [], []
+        for item in batch:
+            longest = len(item[0])  # Sorted ascending, so the newest item is the longest
+            if current and longest * (len(current) + 1) > self.max_padded_chars:
+                passes.append(current)
+                current = []
+            current.append(item)
+        if current:
+            passes.append(current)
+        return passes
+
+    def _run(self):
+        while True:
+            try:
+                batch = self._collect()
+                batch.sort(key=lambda item: len(item[0]))
+                for chunk in self._split(batch):
+                    self._embed_chunk(chunk)
+            except Exception as e:
+                # Never let the worker die: every later submit() would wait on it
+                logger.error(f"Embedding batcher error: {e}")
+
+    def _embed_chunk(self, chunk):
+        # Marking futures as running skips ones the caller cancelled and stops later cancels
+        chunk = [(text, future) for text, future in chunk
+                 if not future.done() and future.set_running_or_notify_cancel()]
+        if not chunk:
+            return
+        try:
+            vectors = list(self.embed_fn([text for text, _ in chunk]))
+            if len(vectors) != len(chunk):
+                raise ValueError(f"embed_fn returned {len(vectors)} vectors for {len(chunk)} texts")
+        except Exception as e:
+            logger.error(f"Error embedding batch of {len(chunk)} texts: {e}")
+            for _, future in chunk:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(chunk, vectors):
+            if not future.done():
+                future.set_result(_frozen(vector))
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_embedding_batcher():
+    """Returns the shared embedding batcher instance."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = EmbeddingBatcher()
+    return _batcher
@@ -0,0 +1,105 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from flask import g, has_app_context
+from dotenv import load_dotenv
+from services.embedding_batcher import get_embedding_batcher
+from services.embedding_service import EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, EMBEDDING_QUANTIZE, EMBEDDING_SPACE
+from utils.metrics import metrics
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 4096))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Collapses whitespace, and case for uncased models, so equivalent texts share a key."""
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text.lower() if "uncased" in EMBEDDING_MODEL_NAME else text
+
+
+def text_key(text):
+    normalized = normalize_text(text)
+    # Quantized backends stay in the same space but produce slightly different vectors
+    namespace = f"{EMBEDDING_SPACE}\0{EMBEDDING_BACKEND}\0{EMBEDDING_QUANTIZE}"
+    return hashlib.sha256(f"{namespace}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Bounded, thread-safe LRU of embeddings keyed on the normalized text hash."""
+
+    def __init__(self, max_entries=EMBEDDING_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def set(self, key, vector):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+embedding_cache = EmbeddingCache()
+metrics.register_gauge("embedding_cache.hit_rate", lambda: metrics.ratio("embedding_cache.hits", "embedding_cache.lookups"))
+metrics.register_gauge("embedding_cache.entries", lambda: len(embedding_cache))
+
+
+def _request_context():
+    """Per-request {text_key: embedding} map, or None outside a Flask app context."""
+    if not has_app_context():
+        return None
+    if "embedding_context" not in g:
+        g.embedding_context = {}
+    return g.embedding_context
+
+
+def get_text_embedding(text):
+    """
+    Returns the embedding for `text`, encoding it at most once.
+
+    Looks in the current request's context first, then the process-wide LRU,
+    and only then runs the model through the micro-batcher.
+
+    Returns:
+        np.ndarray: Read-only float32 vector shared with the cache; convert it
+            (`tolist()`) only where a list is needed, e.g. JSON.
+    """
+    key = text_key(text)
+    context = _request_context()
+    metrics.increment("embedding_cache.lookups")
+    if context is not None and key in context:
+        metrics.increment("embedding_cache.hits")
+        metrics.increment("embedding_cache.request_hits")
+        return context[key]
+
+    vector = embedding_cache.get(key)
+    if vector is not None:
+        metrics.increment("embedding_cache.hits")
+    else:
+        metrics.increment("embedding_cache.misses")
+        vector = get_embedding_batcher().embed(text)
+        embedding_cache.set(key, vector)
+
+    if context is not None:
+        context[key] = vector
+    return vector
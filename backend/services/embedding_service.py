@@ -0,0 +1,309 @@
+import inspect
+import logging
+import os
+import threading
+import uuid
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "torch" runs the model eagerly; "onnx" runs an exported graph with ONNX Runtime (pip install onnxruntime)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+# Any Hugging Face encoder, e.g. bert-large-uncased or sentence-transformers/all-MiniLM-L6-v2
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "bert-large-uncased")
+EMBEDDING_POOLING = os.getenv("EMBEDDING_POOLING", "mean").lower()  # mean | cls
+# "int8" applies dynamic quantization to the linear layers' weights
+EMBEDDING_QUANTIZE = os.getenv("EMBEDDING_QUANTIZE", "none").lower()  # none | int8
+EMBEDDING_MAX_LENGTH = int(os.getenv("EMBEDDING_MAX_LENGTH", 512))
+EMBEDDING_NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", 0))  # 0 keeps the runtime default
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", os.path.join(os.getenv("STORAGE_PATH") or ".", "onnx_models"))
+# Vectors from different models or pooling are not comparable, so every stored row records the
+# space it was embedded in and searches only read the current one. Quantizing a model keeps its space.
+EMBEDDING_SPACE = os.getenv("EMBEDDING_SPACE") or f"{EMBEDDING_MODEL_NAME}/{EMBEDDING_POOLING}"
+# Width of the vector_embeddings columns. Smaller spaces are zero-padded on write, which
+# leaves cosine distance unchanged, so one column and HNSW index serve every space.
+EMBEDDING_STORAGE_DIMENSION = 1024
+
+
+def pool(hidden_state, attention_mask, pooling=EMBEDDING_POOLING):
+    """
+    Reduces token states of shape (batch, tokens, hidden) to one float32 vector per text.
+
+    Mean pooling is masked so padding added for batching does not skew shorter texts.
+    """
+    if pooling == "cls":
+        return np.ascontiguousarray(hidden_state[:, 0], dtype=np.float32)
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (hidden_state * mask).sum(axis=1)
+    return (summed / np.maximum(mask.sum(axis=1), 1.0)).astype(np.float32)
+
+
+def to_storage_vector(embedding):
+    """Zero-pads an embedding to EMBEDDING_STORAGE_DIMENSION for the vector_embeddings columns."""
+    embedding = [float(x) for x in embedding]
+    if len(embedding) > EMBEDDING_STORAGE_DIMENSION:
+        raise ValueError(
+            f"Embedding space '{EMBEDDING_SPACE}' has {len(embedding)} dimensions; "
+            f"vector_embeddings stores at most {EMBEDDING_STORAGE_DIMENSION}"
+        )
+    return embedding + [0.0] * (EMBEDDING_STORAGE_DIMENSION - len(embedding))
+
+
+def from_storage_vector(embedding, dimension):
+    """Drops the zero padding added by `to_storage_vector`."""
+    return np.asarray(embedding, dtype=np.float32)[:dimension]
+
+
+class EmbeddingBackend:
+    """
+    Tokenizer plus encoder behind EmbeddingEngine.
+
+    Subclasses load the model in `_load_model` and return the last hidden state
+    for a tokenized batch from `_hidden_state`; tokenization and pooling are shared.
+    transformers is imported on first load, so the pure helpers above (and
+    modules that only need them) do not pull it in.
+    """
+    name = None
+    tensor_type = "np"
+
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME, max_length=EMBEDDING_MAX_LENGTH,
+                 pooling=EMBEDDING_POOLING, quantize=EMBEDDING_QUANTIZE, num_threads=EMBEDDING_NUM_THREADS):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.pooling = pooling
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self._tokenizer = None
+        self._dimension = None
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        if self._tokenizer is not None:
+            return
+        with self._load_lock:
+            if self._tokenizer is not None:
+                return
+            from transformers import AutoTokenizer
+
+            logger.info(f"Loading embedding model '{self.model_name}' ({self.name}, quantize={self.quantize})")
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self._load_model(tokenizer)
+            self._tokenizer = tokenizer
+
+    def _load_model(self, tokenizer):
+        raise NotImplementedError
+
+    def _hidden_state(self, inputs):
+        raise NotImplementedError
+
+    @property
+    def is_loaded(self):
+        return self._tokenizer is not None
+
+    @property
+    def dimension(self):
+        """Width of the embeddings, read from the model config without loading the weights."""
+        if self._dimension is None:
+            from transformers import AutoConfig
+
+            self._dimension = AutoConfig.from_pretrained(self.model_name).hidden_size
+        return self._dimension
+
+    def embed(self, texts):
+        self._load()
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        inputs = self._tokenizer(
+            list(texts),
+            return_tensors=self.tensor_type,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length
+        )
+        attention_mask = np.asarray(inputs["attention_mask"])
+        return pool(self._hidden_state(inputs), attention_mask, self.pooling)
+
+
+class TorchEmbeddingBackend(EmbeddingBackend):
+    """Eager PyTorch model, optionally with int8 dynamic quantization of its linear layers."""
+    name = "torch"
+    tensor_type = "pt"
+
+    def _load_model(self, tokenizer):
+        import torch
+        from transformers import AutoModel
+
+        if self.num_threads > 0:
+            torch.set_num_threads(self.num_threads)
+        model = AutoModel.from_pretrained(self.model_name)
+        model.eval()
+        if self.quantize == "int8":
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._model = model
+
+    def _hidden_state(self, inputs):
+        import torch
+
+        with torch.inference_mode():
+            return self._model(**inputs).last_hidden_state.float().cpu().numpy()
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """
+    The model exported to ONNX and run with ONNX Runtime on CPU.
+
+    The export (and its int8 dynamically quantized copy) is written once under
+    EMBEDDING_ONNX_DIR and reused by every later process; after that, torch is
+    no longer needed to embed.
+    """
+    name = "onnx"
+
+    def model_path(self):
+        directory = os.path.join(EMBEDDING_ONNX_DIR, self.model_name.replace("/", "--"))
+        filename = "model.int8.onnx" if self.quantize == "int8" else "model.onnx"
+        return os.path.join(directory, filename)
+
+    def _load_model(self, tokenizer):
+        import onnxruntime as ort
+
+        path = self.model_path()
+        if not os.path.exists(path):
+            self._export(tokenizer, path)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads > 0:
+            options.intra_op_num_threads = self.num_threads
+        self._session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self._input_names = [i.name for i in self._session.get_inputs()]
+
+    def _export(self, tokenizer, path):
+        import torch
+        from transformers import AutoModel
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fp32_path = os.path.join(os.path.dirname(path), "model.onnx")
+        if not os.path.exists(fp32_path):
+            logger.info(f"Exporting '{self.model_name}' to {fp32_path}")
+            model = AutoModel.from_pretrained(self.model_name)
+            model.eval()
+            sample = tokenizer(["export"], return_tensors="pt")
+            names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+
+            class LastHiddenState(torch.nn.Module):
+                """Calls the encoder with keyword arguments only; newer transformers reject traced positionals."""
+
+                def __init__(self, encoder):
+                    super().__init__()
+                    self.encoder = encoder
+
+                def forward(self, *inputs):
+                    return self.encoder(**dict(zip(names, inputs))).last_hidden_state
+
+            tmp_path = f"{fp32_path}.{uuid.uuid4().hex}.tmp"
+            # torch >= 2.9 defaults to the dynamo exporter (needs onnxscript, ignores dynamic_axes); keep the tracer
+            options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+            # no_grad rather than inference_mode: the exporter traces the graph and needs ordinary tensors
+            with torch.no_grad():
+                torch.onnx.export(
+                    LastHiddenState(model),
+                    tuple(sample[n] for n in names),
+                    tmp_path,
+                    input_names=names,
+                    output_names=["last_hidden_state"],
+                    dynamic_axes={n: {0: "batch", 1: "sequence"} for n in names + ["last_hidden_state"]},
+                    opset_version=14,
+                    **options,
+                )
+            os.replace(tmp_path, fp32_path)
+        if path != fp32_path:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info(f"Quantizing {fp32_path} to int8")
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, path)
+
+    def _hidden_state(self, inputs):
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self._input_names}
+        return self._session.run(None, feed)[0]
+
+
+BACKENDS = {
+    "torch": TorchEmbeddingBackend,
+    "onnx": OnnxEmbeddingBackend,
+}
+
+
+def create_backend(name=EMBEDDING_BACKEND, **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{name}'; expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
+
+
+class EmbeddingEngine:
+    """
+    Process-wide embedding model shared by every service.
+
+    The backend (EMBEDDING_BACKEND) is loaded lazily on the first call to
+    `embed` (or eagerly through `warm_up`) and then stays resident for the
+    life of the worker.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, backend=None, space=EMBEDDING_SPACE):
+        self.backend = backend or create_backend()
+        self.space = space
+
+    @classmethod
+    def get_instance(cls):
+        """Returns the shared engine, creating it on first use."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def model_name(self):
+        return self.backend.model_name
+
+    @property
+    def is_loaded(self):
+        return self.backend.is_loaded
+
+    @property
+    def dimension(self):
+        return self.backend.dimension
+
+    def warm_up(self):
+        """Loads the model and runs one forward pass so the first request is not slow."""
+        self.embed(["warm up"])
+        logger.info(f"Embedding engine warmed up: space '{self.space}', {self.dimension} dimensions")
+
+    def embed(self, texts):
+        """
+        Embeds a batch of texts.
+
+        Args:
+            texts (list[str] | str): Texts to embed.
+
+        Returns:
+            np.ndarray: float32 array of shape (len(texts), dimension).
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        return self.backend.embed(texts)
+
+    def embed_one(self, text):
+        """Embeds a single text and returns it as a list of floats."""
+        return self.embed([text])[0].tolist()
+
+
+def get_embedding_engine():
+    """Returns the shared embedding engine instance."""
+    return EmbeddingEngine.get_instance()
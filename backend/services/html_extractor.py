@@ -0,0 +1,219 @@
+import logging
+import os
+import re
+from html.parser import HTMLParser
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "auto" picks lxml when it is installed and falls back to the stdlib parser
+HTML_EXTRACTOR = os.getenv("HTML_EXTRACTOR", "auto").lower()
+HTML_EXTRACT_MAX_CHARS = int(os.getenv("HTML_EXTRACT_MAX_CHARS", 20000))
+
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "iframe", "svg", "form"})
+VOID_TAGS = frozenset({"input"})  # Dropped as well, but never hold text
+FEED_CHUNK_SIZE = 65536
+_BODY_TAG = re.compile(r"<body[\s>/]", re.IGNORECASE)
+
+
+class _TextCollector:
+    """
+    Single-pass body text collection shared by the streaming backends.
+
+    Text inside skipped tags or outside <body> is ignored. Adjacent text runs
+    are merged before stripping so output matches `get_text(' ', strip=True)`.
+    """
+
+    def __init__(self, max_chars=None):
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self.in_body = False
+        self.skip_depth = 0
+        self._pending = []
+
+    @property
+    def full(self):
+        return self.max_chars is not None and self.length >= self.max_chars
+
+    def _flush(self):
+        if self._pending:
+            text = "".join(self._pending).strip()
+            self._pending = []
+            if text and not self.full:
+                self.parts.append(text)
+                self.length += len(text) + 1
+
+    def start(self, tag):
+        self._flush()
+        tag = tag.lower()
+        if tag == "body":
+            self.in_body = True
+        elif tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        self._flush()
+        tag = tag.lower()
+        if tag == "body":
+            self.in_body = False
+        elif tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def boundary(self):
+        """A void or self-closing tag: ends the current text run like any other tag."""
+        self._flush()
+
+    def data(self, data):
+        if self.in_body and not self.skip_depth:
+            self._pending.append(data)
+
+    def text(self):
+        self._flush()
+        text = " ".join(self.parts)
+        return text[:self.max_chars] if self.max_chars is not None else text
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            self.collector.boundary()
+        else:
+            self.collector.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.collector.boundary()  # Self-closing tags carry no text
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+class _LxmlTarget:
+    def __init__(self, collector):
+        self.collector = collector
+        # lxml invents a <body> for fragments; only text under a real one counts, as with bs4
+        self.has_body = False
+
+    def start(self, tag, attrib):
+        if tag in VOID_TAGS or (tag == "body" and not self.has_body):
+            self.collector.boundary()
+        else:
+            self.collector.start(tag)
+
+    def end(self, tag):
+        if tag in VOID_TAGS:
+            self.collector.boundary()
+        else:
+            self.collector.end(tag)
+
+    def data(self, data):
+        self.collector.data(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return None
+
+
+def _chunks(html_content):
+    if isinstance(html_content, str):
+        for start in range(0, len(html_content), FEED_CHUNK_SIZE):
+            yield html_content[start:start + FEED_CHUNK_SIZE]
+    else:
+        yield from html_content
+
+
+def extract_text_stdlib(html_content, max_chars=None):
+    """Extracts body text with the stdlib HTMLParser, feeding the input in chunks."""
+    collector = _TextCollector(max_chars)
+    parser = _StdlibParser(collector)
+    for chunk in _chunks(html_content):
+        parser.feed(chunk)
+        if collector.full:
+            break
+    else:
+        parser.close()
+    return collector.text()
+
+
+def extract_text_lxml(html_content, max_chars=None):
+    """Extracts body text with lxml's event-driven HTML parser."""
+    from lxml import etree
+
+    collector = _TextCollector(max_chars)
+    target = _LxmlTarget(collector)
+    parser = etree.HTMLParser(target=target)
+    tail = ""
+    for chunk in _chunks(html_content):
+        # Events for a chunk fire during feed(), so look for the tag first; the tail covers a split tag
+        if not target.has_body and _BODY_TAG.search(tail + chunk):
+            target.has_body = True
+        tail = chunk[-6:]
+        parser.feed(chunk)
+        if collector.full:
+            break
+    parser.close()
+    return collector.text()
+
+
+def extract_text_bs4(html_content, max_chars=None):
+    """The original BeautifulSoup cleaner; kept as a reference backend."""
+    from bs4 import BeautifulSoup
+
+    if not isinstance(html_content, str):
+        html_content = "".join(html_content)
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for unwanted in soup(list(SKIPPED_TAGS | VOID_TAGS)):
+        unwanted.decompose()
+    main_content = soup.find('body')
+    cleaned_text = main_content.get_text(separator=' ', strip=True) if main_content else ''
+    return cleaned_text[:max_chars] if max_chars is not None else cleaned_text
+
+
+EXTRACTORS = {
+    "stdlib": extract_text_stdlib,
+    "lxml": extract_text_lxml,
+    "bs4": extract_text_bs4,
+}
+
+
+def _default_backend():
+    if HTML_EXTRACTOR != "auto":
+        return HTML_EXTRACTOR
+    try:
+        import lxml.etree  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "stdlib"
+
+
+DEFAULT_BACKEND = _default_backend()
+
+
+def extract_text(html_content, backend=None, max_chars=HTML_EXTRACT_MAX_CHARS):
+    """
+    Returns the visible body text of an HTML page.
+
+    Args:
+        html_content (str | Iterable[str]): The page, or chunks of it as they arrive.
+        backend (str, optional): One of EXTRACTORS; defaults to HTML_EXTRACTOR.
+        max_chars (int, optional): Stop collecting once this many characters are gathered.
+
+    Returns:
+        str: Body text with script/style/noscript/iframe/svg/form content removed.
+    """
+    extractor = EXTRACTORS.get(backend or DEFAULT_BACKEND)
+    if extractor is None:
+        raise ValueError(f"Unsupported HTML extractor: {backend or DEFAULT_BACKEND}")
+    return extractor(html_content, max_chars=max_chars)
@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import closing
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One queue file serves every WorkerPool in the process; each claims only the kinds it handles
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(os.getenv("STORAGE_PATH") or ".", "jobs.sqlite3"))
+# A running job whose owner hasn't sent a heartbeat for JOB_STALE_AFTER seconds is requeued
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", 10))
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", 60))
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", 7))
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JobQueue:
+    """
+    Durable FIFO job queue in a local SQLite file.
+
+    Jobs survive worker restarts. A claimed job records its owner, and the
+    owner's WorkerPool refreshes `heartbeat_at` while it runs. Jobs whose
+    heartbeat has expired belonged to a process that died, and
+    `requeue_stale` puts only those back in the queue.
+    """
+
+    def __init__(self, path, busy_timeout=30):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._wakeup = threading.Condition()
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, owner TEXT, heartbeat_at REAL)"
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    # Queue files created before jobs had owners
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_created ON jobs (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_finished ON jobs (status, finished_at)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, job_id, kind, payload):
+        """Adds a job, replacing any finished job with the same id, and wakes an idle worker."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, kind, payload, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), JobStatus.QUEUED, time.time()),
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def claim(self, owner=None, kinds=None):
+        """
+        Atomically marks the oldest queued job as running by `owner` and returns it, or None.
+        With `kinds`, only jobs of those kinds are considered.
+        """
+        query, params = "SELECT * FROM jobs WHERE status = ?", [JobStatus.QUEUED]
+        if kinds is not None:
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(f"{query} ORDER BY created_at LIMIT 1", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, owner = ?, heartbeat_at = ? "
+                "WHERE id = ?",
+                (JobStatus.RUNNING, now, owner, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+            job = dict(row)
+            job["payload"] = json.loads(job["payload"])
+            return job
+        except Exception:
+            # BEGIN itself may have failed (e.g. database is locked); only roll back a transaction we hold
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def finish(self, job_id, error=None, owner=None):
+        """
+        Records a job's outcome. With `owner`, only while that owner still holds
+        the job: one requeued after its heartbeat lapsed belongs to someone else.
+        """
+        status = JobStatus.FAILED if error else JobStatus.DONE
+        query = "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?"
+        params = [status, error, time.time(), job_id]
+        if owner is not None:
+            query += " AND owner = ? AND status = ?"
+            params += [owner, JobStatus.RUNNING]
+        with closing(self._connect()) as conn:
+            updated = conn.execute(query, params).rowcount
+        if not updated:
+            logger.warning(f"Job {job_id} was reclaimed by another worker; dropping this result")
+        return bool(updated)
+
+    def get(self, job_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def heartbeat(self, owner):
+        """Marks every job `owner` is running as still alive."""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = ?",
+                (time.time(), owner, JobStatus.RUNNING),
+            ).rowcount
+
+    def requeue_stale(self, stale_after):
+        """Puts running jobs whose heartbeat is older than `stale_after` seconds back in the queue."""
+        with closing(self._connect()) as conn:
+            count = conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL WHERE status = ? AND COALESCE(heartbeat_at, started_at, 0) < ?",
+                (JobStatus.QUEUED, JobStatus.RUNNING, time.time() - stale_after),
+            ).rowcount
+        if count:
+            logger.info(f"Requeued {count} interrupted jobs")
+        return count
+
+    def prune(self, older_than):
+        """Deletes done and failed jobs that finished more than `older_than` seconds ago."""
+        with closing(self._connect()) as conn:
+            count = conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (JobStatus.DONE, JobStatus.FAILED, time.time() - older_than),
+            ).rowcount
+        if count:
+            logger.info(f"Pruned {count} finished jobs")
+        return count
+
+    def wait(self, timeout):
+        with self._wakeup:
+            self._wakeup.wait(timeout)
+
+
+class WorkerPool:
+    """
+    Threads that pull jobs from a JobQueue and dispatch them by kind.
+
+    Handlers are `fn(job_id, payload)`; an exception marks the job failed.
+    Workers only claim jobs of the kinds they have handlers for, so pools
+    with different handlers can share a queue.
+    A housekeeping thread refreshes the heartbeat of this pool's jobs every
+    `heartbeat_interval` seconds, requeues other owners' jobs whose heartbeat
+    is older than `stale_after`, and prunes jobs finished more than
+    `retention` seconds ago.
+    """
+
+    def __init__(self, job_queue, handlers, num_workers=2, poll_interval=1.0,
+                 heartbeat_interval=JOB_HEARTBEAT_INTERVAL, stale_after=JOB_STALE_AFTER,
+                 retention=JOB_RETENTION_DAYS * 24 * 3600):
+        self.job_queue = job_queue
+        self.handlers = handlers
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.retention = retention
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._threads:
+            return
+        self._housekeeping()
+        threads = [threading.Thread(target=self._run_housekeeping, name="job-housekeeping", daemon=True)]
+        threads += [threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+                    for i in range(self.num_workers)]
+        for thread in threads:
+            thread.start()
+        self._threads = threads
+        logger.info(f"Started {self.num_workers} job workers as {self.owner}")
+
+    def stop(self):
+        self._stop.set()
+        with self.job_queue._wakeup:
+            self.job_queue._wakeup.notify_all()
+
+    def _housekeeping(self):
+        try:
+            self.job_queue.heartbeat(self.owner)
+            self.job_queue.requeue_stale(self.stale_after)
+            self.job_queue.prune(self.retention)
+        except sqlite3.Error as e:
+            logger.error(f"Error in job queue housekeeping: {e}")
+
+    def _run_housekeeping(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            self._housekeeping()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.job_queue.claim(self.owner, kinds=list(self.handlers))
+            except sqlite3.Error as e:
+                logger.error(f"Error claiming job: {e}")
+                job = None
+            if job is None:
+                self.job_queue.wait(self.poll_interval)
+                continue
+
+            handler = self.handlers.get(job["kind"])
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler for job kind: {job['kind']}")
+                handler(job["id"], job["payload"])
+                self.job_queue.finish(job["id"], owner=self.owner)
+            except Exception as e:
+                logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}\n{traceback.format_exc()}")
+                self.job_queue.finish(job["id"], error=str(e), owner=self.owner)
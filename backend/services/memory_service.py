@@ -1,9 +1,10 @@
 import logging
 from datetime import datetime
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import delete, insert, select, text
 from sqlalchemy.exc import SQLAlchemyError
-from utils.database import VectorEmbedding, ActionLog
+from utils.database import EMBEDDING_STORAGE_PRECISION, VectorEmbedding, ActionLog, get_session
+from services.vector_index import InMemoryVectorIndex, NearestResult
+from services.embedding_service import EMBEDDING_SPACE, from_storage_vector, get_embedding_engine, to_storage_vector
 from pymongo import MongoClient
 from bson import ObjectId
 import os
@@ -28,10 +29,16 @@ mongo_client = MongoClient(MONGO_URI)
 mongo_db = mongo_client[MONGO_DB_NAME]
 content_collection = mongo_db[MONGO_COLLECTION]
 
-# SQLAlchemy Session
-DATABASE_URL = os.getenv('DATABASE_URL')
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
+# Nearest-neighbour backend: "pgvector" ranks inside Postgres, "memory" ranks cached matrices in-process
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "pgvector").lower()
+# Seconds before a cached in-memory partition is reloaded, picking up rows other workers stored (0 = never)
+VECTOR_INDEX_MAX_AGE = float(os.getenv("VECTOR_INDEX_MAX_AGE", 60))
+# HNSW candidate list size per query; larger trades latency for recall
+PGVECTOR_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", 0))
+# "float16" or "int8" (scalar-quantized) shrinks the in-memory index
+VECTOR_INDEX_PRECISION = os.getenv("VECTOR_INDEX_PRECISION", "float32").lower()
+# Reduced-precision searches fetch k * RERANK_FACTOR candidates and rescore them against the float32 column
+RERANK_FACTOR = int(os.getenv("RERANK_FACTOR", 4))
 
 class MemoryAgent:
     @staticmethod
@@ -55,18 +62,24 @@ class MemoryAgent:
     @staticmethod
     def store_vector_embedding(user_id, mongo_doc_id, embedding, content_type, additional_info):
         """Store vector embedding and link it to MongoDB content."""
-        session = Session()
+        session = get_session()
         try:
+            stored = to_storage_vector(embedding)
             new_embedding = VectorEmbedding(
                 user_id=user_id,
                 mongo_doc_id=mongo_doc_id,
-                embedding=embedding,
+                embedding=stored,
+                embedding_space=EMBEDDING_SPACE,
                 content_type=content_type,
                 additional_info=additional_info,
                 created_at=datetime.now()
             )
+            if EMBEDDING_STORAGE_PRECISION == "halfvec":
+                new_embedding.embedding_half = stored
             session.add(new_embedding)
             session.commit()
+            if in_memory_index is not None:
+                in_memory_index.add(user_id, content_type, mongo_doc_id, embedding)
             logger.info(f"Stored vector embedding for MongoDB document ID: {mongo_doc_id}")
         except SQLAlchemyError as e:
             session.rollback()
@@ -79,12 +92,94 @@ class MemoryAgent:
         finally:
             session.close()
 
+    @staticmethod
+    def store_contents_in_mongo(documents):
+        """
+        Store many content documents with one unordered `insert_many`.
+
+        Documents may carry their own `_id`; missing `created_at` fields are filled in.
+
+        Returns:
+            list[str]: IDs of the inserted documents, in input order.
+        """
+        try:
+            now = datetime.now()
+            for document in documents:
+                document.setdefault("created_at", now)
+            result = content_collection.insert_many(documents, ordered=False)
+            logger.info(f"Stored {len(result.inserted_ids)} documents in MongoDB")
+            return [str(inserted_id) for inserted_id in result.inserted_ids]
+        except Exception as e:
+            logger.error(f"Error bulk storing content in MongoDB: {e}")
+            raise
+
+    @staticmethod
+    def store_vector_embeddings(rows):
+        """
+        Store many embeddings in one transaction with a single executemany INSERT.
+
+        Args:
+            rows (list[dict]): VectorEmbedding column values (user_id, mongo_doc_id,
+                embedding, content_type, additional_info). `embedding_space`
+                defaults to the current EMBEDDING_SPACE.
+        """
+        if not rows:
+            return
+        session = get_session()
+        try:
+            now = datetime.now()
+            embeddings = [row["embedding"] for row in rows]
+            rows = [dict(row, embedding=to_storage_vector(row["embedding"])) for row in rows]
+            for row in rows:
+                row.setdefault("created_at", now)
+                row.setdefault("embedding_space", EMBEDDING_SPACE)
+                if EMBEDDING_STORAGE_PRECISION == "halfvec":
+                    row.setdefault("embedding_half", row["embedding"])
+            session.execute(insert(VectorEmbedding), rows)
+            session.commit()
+            if in_memory_index is not None:
+                for row, embedding in zip(rows, embeddings):
+                    if row["embedding_space"] == EMBEDDING_SPACE:
+                        in_memory_index.add(row["user_id"], row["content_type"], row["mongo_doc_id"], embedding)
+            logger.info(f"Stored {len(rows)} vector embeddings")
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"SQLAlchemy error bulk storing vector embeddings: {e}")
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def delete_contents(mongo_doc_ids):
+        """Remove documents and their embeddings, e.g. to roll back a partially ingested batch."""
+        session = get_session()
+        try:
+            embedding_ids = select(VectorEmbedding.id).where(VectorEmbedding.mongo_doc_id.in_(mongo_doc_ids))
+            # Bulk deletes skip the ORM cascade; remove the action logs first so their FK doesn't block the rollback
+            session.execute(delete(ActionLog).where(ActionLog.embedding_id.in_(embedding_ids)))
+            session.execute(delete(VectorEmbedding).where(VectorEmbedding.mongo_doc_id.in_(mongo_doc_ids)))
+            session.commit()
+            content_collection.delete_many({"_id": {"$in": [ObjectId(doc_id) for doc_id in mongo_doc_ids]}})
+            if in_memory_index is not None:
+                in_memory_index.invalidate()
+            logger.info(f"Deleted {len(mongo_doc_ids)} documents and their embeddings")
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"SQLAlchemy error deleting embeddings: {e}")
+            raise
+        finally:
+            session.close()
+
     @staticmethod
     def query_embeddings(user_id, content_type):
         """Query embeddings by user_id and content_type."""
-        session = Session()
+        session = get_session()
         try:
-            results = session.query(VectorEmbedding).filter_by(user_id=user_id, content_type=content_type).all()
+            results = (
+                session.query(VectorEmbedding)
+                .filter_by(user_id=user_id, content_type=content_type, embedding_space=EMBEDDING_SPACE)
+                .all()
+            )
             logger.info(f"Retrieved {len(results)} embeddings for user ID: {user_id}")
             return results
         except SQLAlchemyError as e:
@@ -96,10 +191,99 @@ class MemoryAgent:
         finally:
             session.close()
 
+    @staticmethod
+    def nearest(user_id, content_type, query_vec, k=5):
+        """
+        Return the k stored embeddings closest to `query_vec` by cosine similarity.
+
+        Uses the backend selected by VECTOR_INDEX_BACKEND and only searches
+        embeddings in the current EMBEDDING_SPACE.
+
+        Returns:
+            list[NearestResult]: (mongo_doc_id, similarity) pairs, most similar first.
+        """
+        if in_memory_index is not None:
+            return in_memory_index.nearest(user_id, content_type, query_vec, k)
+        return MemoryAgent._nearest_pgvector(user_id, content_type, query_vec, k)
+
+    @staticmethod
+    def _nearest_pgvector(user_id, content_type, query_vec, k):
+        """
+        Ranks inside Postgres with pgvector's `<=>` operator and `ORDER BY ... LIMIT k`.
+
+        With halfvec storage the HNSW search runs on the float16 column for
+        k * RERANK_FACTOR candidates, which are then reordered by their float32
+        distance in the same query.
+        """
+        session = get_session()
+        try:
+            if PGVECTOR_EF_SEARCH > 0:
+                session.execute(text(f"SET LOCAL hnsw.ef_search = {PGVECTOR_EF_SEARCH}"))
+            query_vec = to_storage_vector(query_vec)
+            filters = (
+                VectorEmbedding.embedding_space == EMBEDDING_SPACE,
+                VectorEmbedding.user_id == user_id,
+                VectorEmbedding.content_type == content_type,
+            )
+            distance = VectorEmbedding.embedding.cosine_distance(query_vec)
+            query = session.query(VectorEmbedding.mongo_doc_id, distance.label("distance"))
+            if EMBEDDING_STORAGE_PRECISION == "halfvec":
+                candidates = (
+                    select(VectorEmbedding.id)
+                    .where(*filters)
+                    .order_by(VectorEmbedding.embedding_half.cosine_distance(query_vec))
+                    .limit(k * RERANK_FACTOR)
+                    .subquery()
+                )
+                query = query.join(candidates, VectorEmbedding.id == candidates.c.id)
+            else:
+                query = query.filter(*filters)
+            rows = query.order_by(distance).limit(k).all()
+            return [NearestResult(row.mongo_doc_id, 1.0 - row.distance) for row in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"SQLAlchemy error querying nearest embeddings: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error querying nearest embeddings: {e}")
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _load_embeddings(mongo_doc_ids):
+        """Full-precision embeddings for re-ranking, as {mongo_doc_id: embedding}."""
+        session = get_session()
+        try:
+            rows = (
+                session.query(VectorEmbedding.mongo_doc_id, VectorEmbedding.embedding)
+                .filter(VectorEmbedding.mongo_doc_id.in_(mongo_doc_ids), VectorEmbedding.embedding_space == EMBEDDING_SPACE)
+                .all()
+            )
+            dimension = get_embedding_engine().dimension
+            return {row.mongo_doc_id: from_storage_vector(row.embedding, dimension) for row in rows}
+        finally:
+            session.close()
+
+    @staticmethod
+    def _load_partition(user_id, content_type):
+        """Yields (mongo_doc_id, embedding) pairs in the current space for the in-memory index."""
+        dimension = get_embedding_engine().dimension
+        session = get_session()
+        try:
+            rows = (
+                session.query(VectorEmbedding.mongo_doc_id, VectorEmbedding.embedding)
+                .filter_by(user_id=user_id, content_type=content_type, embedding_space=EMBEDDING_SPACE)
+                .yield_per(1000)
+            )
+            for row in rows:
+                yield row.mongo_doc_id, from_storage_vector(row.embedding, dimension)
+        finally:
+            session.close()
+
     @staticmethod
     def store_action_log(embedding_id, action_type, details):
         """Store user action log."""
-        session = Session()
+        session = get_session()
         try:
             new_action_log = ActionLog(
                 embedding_id=embedding_id,
@@ -135,3 +319,37 @@ class MemoryAgent:
         except Exception as e:
             logger.error(f"Error querying content from MongoDB: {e}")
             raise
+
+    @staticmethod
+    def fetch_contents(mongo_doc_ids, projection=None):
+        """
+        Retrieve several MongoDB documents in one `$in` round trip.
+
+        Args:
+            mongo_doc_ids (list[str]): Document IDs, in the order the caller ranked them.
+            projection (dict | list, optional): Fields to return, e.g. {"content": 1}.
+
+        Returns:
+            list[dict]: Documents found, in the same order as `mongo_doc_ids`.
+        """
+        try:
+            object_ids = [ObjectId(doc_id) for doc_id in mongo_doc_ids if ObjectId.is_valid(doc_id)]
+            if not object_ids:
+                return []
+            documents = {doc["_id"]: doc for doc in content_collection.find({"_id": {"$in": object_ids}}, projection)}
+            ordered = [documents[oid] for oid in object_ids if oid in documents]
+            if len(ordered) < len(mongo_doc_ids):
+                logger.warning(f"Found {len(ordered)} of {len(mongo_doc_ids)} requested documents in MongoDB")
+            return ordered
+        except Exception as e:
+            logger.error(f"Error querying contents from MongoDB: {e}")
+            raise
+
+
+in_memory_index = InMemoryVectorIndex(
+    MemoryAgent._load_partition,
+    precision=VECTOR_INDEX_PRECISION,
+    rerank_fn=MemoryAgent._load_embeddings,
+    rerank_factor=RERANK_FACTOR,
+    max_age=VECTOR_INDEX_MAX_AGE or None,
+) if VECTOR_INDEX_BACKEND == "memory" else None
@@ -1,28 +1,40 @@
-from pptx import Presentation
-from pptx.util import Pt, Inches
-from pptx.dml.color import RGBColor
 import os, re
 import json
 import uuid
-from configs.config import themes
 import logging
 from models.generative_model import get_model
-from models.generative_model import SlideLayout, generate_slide_prompts
+from models.generative_model import (
+    generate_slide_prompts,
+    generate_outline_prompt,
+    generate_slide_group_prompt,
+)
+from services.slide_parser import SlideStreamParser, extract_json, parse_slides
+from services.slide_renderer import get_theme_style, hex_to_rgbcolor, new_presentation, render_slides
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Decks with at least this many slides are generated outline-first, in parallel groups (0 disables)
+SLIDE_FANOUT_THRESHOLD = int(os.getenv("SLIDE_FANOUT_THRESHOLD", 8))
+SLIDE_FANOUT_GROUP_SIZE = int(os.getenv("SLIDE_FANOUT_GROUP_SIZE", 2))
+SLIDE_FANOUT_CONCURRENCY = int(os.getenv("SLIDE_FANOUT_CONCURRENCY", 6))
+SLIDE_FANOUT_RETRIES = int(os.getenv("SLIDE_FANOUT_RETRIES", 2))
+# Process-wide cap on in-flight Gemini calls for slide content, shared by concurrent decks
+GEMINI_MAX_CONCURRENT_CALLS = int(os.getenv("GEMINI_MAX_CONCURRENT_CALLS", 8))
+_gemini_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENT_CALLS)
 
 class PresentationService:
     def __init__(self):
         self.model = get_model()
         self.logger = logging.getLogger(__name__)
         logging.basicConfig(level=logging.INFO)
-        self.generated_files_dir = "data/generated"
-        os.makedirs(self.generated_files_dir, exist_ok=True)
 
     @staticmethod
     def hex_to_rgbcolor(hex_color):
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
-        return RGBColor(r, g, b)
+        return hex_to_rgbcolor(hex_color)
 
     def set_slide_background(self, slide, hex_color):
         fill = slide.background.fill
@@ -48,10 +60,96 @@ class PresentationService:
         text = re.sub(r'_(.*?)_', r'\1', text)
         return text
 
+    def _generate_text(self, prompt):
+        try:
+            with _gemini_slots:
+                response = self.model.generate_content(prompt).to_dict()
+        except Exception as e:
+            self.logger.error("Error generating content from Gemini: %s", e)
+            raise RuntimeError("Content generation failed") from e
+        return response['candidates'][0]['content']['parts'][0]['text']
+
+    def _stream_text(self, prompt):
+        """
+        Yields the text of a streamed response as it arrives.
+
+        The stream is read on its own thread, which holds a Gemini slot only
+        until the model has finished; the caller can take as long as it
+        likes over each chunk (e.g. rendering a slide) without keeping other
+        decks waiting for a slot.
+        """
+        chunks = queue.Queue()
+
+        def read():
+            try:
+                with _gemini_slots:
+                    for chunk in self.model.generate_content(prompt, stream=True):
+                        try:
+                            chunks.put(chunk.text)
+                        except ValueError:
+                            continue  # Chunk carries no text (e.g. safety metadata only)
+                chunks.put(None)
+            except Exception as e:
+                chunks.put(e)
+
+        threading.Thread(target=read, name="gemini-stream", daemon=True).start()
+        while True:
+            item = chunks.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _discard_cached(self, prompt):
+        """Evicts an unusable response from the response cache so a retry asks the model again."""
+        invalidate = getattr(self.model, "invalidate", None)
+        if invalidate is not None:
+            invalidate(prompt)
+
+    def _generate_json(self, prompt):
+        """Generates a response and parses it as JSON; returns None if it cannot be recovered."""
+        text = self._generate_text(prompt)
+        try:
+            return extract_json(text)
+        except json.JSONDecodeError:
+            self.logger.warning("Failed to parse part text as JSON: %s", text)
+            self._discard_cached(prompt)
+            return None
+
+    def _generate_slides(self, prompt):
+        """Generates a response and returns every slide object that could be parsed from it."""
+        text = self._generate_text(prompt)
+        slides = parse_slides(text)
+        if not slides:
+            self.logger.warning("Failed to parse part text as JSON: %s", text)
+            self._discard_cached(prompt)
+        return slides
+
+    @staticmethod
+    def _apply_layout(slide, layout):
+        slide["layout"] = getattr(layout, "value", layout)
+        return slide
+
+    def _fill_missing(self, topic, slides, num_slides, layouts):
+        """Generates only the slides after the ones already parsed, instead of regenerating the deck."""
+        if len(slides) >= num_slides:
+            return []
+        outline = [slide.get("title", "") for slide in slides] + [""] * (num_slides - len(slides))
+        missing = list(range(len(slides), num_slides))
+        self.logger.warning("Generating %d missing slides for topic %s", len(missing), topic)
+        recovered = self._fetch_slide_group(topic, outline, missing, layouts)
+        return [self._apply_layout(recovered.get(i) or {"title": "", "points": []}, layouts[i]) for i in missing]
+
     def fetch_content_from_gemini(self, topic, num_slides, layouts):
         """
         Fetches slide content from the Gemini model based on the topic, number of slides, and layouts.
 
+        Decks of SLIDE_FANOUT_THRESHOLD slides or more are generated with
+        `fetch_content_fanout`; smaller ones use a single prompt. Slides are
+        parsed leniently, and if only part of the deck parses just the rest
+        is requested again.
+
         Args:
             topic (str): Topic for the slides.
             num_slides (int): Number of slides to generate.
@@ -60,165 +158,111 @@ class PresentationService:
         Returns:
             list[dict]: List of content for each slide.
         """
+        if SLIDE_FANOUT_THRESHOLD and num_slides >= SLIDE_FANOUT_THRESHOLD:
+            try:
+                return self.fetch_content_fanout(topic, num_slides, layouts)
+            except Exception as e:
+                self.logger.warning("Fan-out generation failed, falling back to a single prompt: %s", e)
+
         # Generate the prompt using the helper function
         prompt = generate_slide_prompts(topic, num_slides, layouts)
-        # print('prompt', prompt)
-        # Generate content using the model
-        try:
-            response = self.model.generate_content(prompt).to_dict()
-        except Exception as e:
-            self.logger.error("Error generating content from Gemini: %s", e)
-            raise RuntimeError("Content generation failed") from e
-
-        text = response['candidates'][0]['content']['parts'][0]['text'][7:-5]
-        slide_data = []
-        try:
-            # Parse response text as JSON
-            slide_data = json.loads(text)
-        except json.JSONDecodeError as e:
-            self.logger.warning("Failed to parse part text as JSON: %s", text)
+        slide_data = self._generate_slides(prompt)[:num_slides]
 
         # Validate the generated content
         if not slide_data:
             self.logger.error("No content generated for the topic: %s", topic)
             raise ValueError("Generated content is empty or invalid.")
 
-        return slide_data
-    
-    def add_title(self, slide, title, theme):
-        self.set_slide_background(slide, theme["background_color"])
-        title_shape = slide.shapes.title
-        title_shape.text = title
-        title_shape.text_frame.paragraphs[0].font.name = theme["font"]
-        title_shape.text_frame.paragraphs[0].font.size = Pt(theme["font_size"] + 10)
-        title_shape.text_frame.paragraphs[0].font.color.rgb = self.hex_to_rgbcolor(theme["title_color"])
-
-    def add_subtitle(self, slide, subtitle, theme):
-        slide.placeholders[1].text = subtitle
-
-    def add_bullet_points(self, slide, title, points, theme):
-        self.set_slide_background(slide, theme["background_color"])
-        title_shape = slide.shapes.title
-        title_shape.text = title
-        title_shape.text_frame.paragraphs[0].font.name = theme["font"]
-        title_shape.text_frame.paragraphs[0].font.size = Pt(theme["font_size"] + 5)
-        title_shape.text_frame.paragraphs[0].font.color.rgb = self.hex_to_rgbcolor(theme["title_color"])
-        body_shape = slide.shapes.placeholders[1]
-        tf = body_shape.text_frame
-        tf.clear()
-        for point in points:
-            p = tf.add_paragraph()
-            p.text = point
-            p.bullet = True
-            p.level = 0
-            p.font.name = theme["font"]
-            p.font.size = Pt(theme["font_size"])
-            p.font.color.rgb = self.hex_to_rgbcolor(theme["content_color"])
-
-    def add_two_column(self, slide, title, left, right, theme):
-        self.set_slide_background(slide, theme["background_color"])
-        title_shape = slide.shapes.title
-        title_shape.text = title
-        title_shape.text_frame.paragraphs[0].font.name = theme["font"]
-        title_shape.text_frame.paragraphs[0].font.size = Pt(theme["font_size"] + 5)
-        title_shape.text_frame.paragraphs[0].font.color.rgb = self.hex_to_rgbcolor(theme["title_color"])
-        left_box = slide.shapes.add_textbox(Inches(1), Inches(1.7), Inches(4), Inches(4))
-        left_tf = left_box.text_frame
-        left_tf.word_wrap = True
-        for point in left:
-            p = left_tf.add_paragraph()
-            p.text = point
-            p.bullet = True
-            p.font.name = theme["font"]
-            p.font.size = Pt(theme["font_size"])
-            p.font.color.rgb = self.hex_to_rgbcolor(theme["content_color"])
-
-        right_box = slide.shapes.add_textbox(Inches(5.5), Inches(1.7), Inches(4), Inches(4))
-        right_tf = right_box.text_frame
-        right_tf.word_wrap = True
-        for point in right:
-            p = right_tf.add_paragraph()
-            p.text = point
-            p.bullet = True
-            p.font.name = theme["font"]
-            p.font.size = Pt(theme["font_size"])
-            p.font.color.rgb = self.hex_to_rgbcolor(theme["content_color"])
-
-    def add_content_with_image(self, slide, title, content, image, theme):
-        self.set_slide_background(slide, theme["background_color"])
-                
-        title_shape = slide.shapes.title
-        title_shape.text = title
-        title_shape.text_frame.paragraphs[0].font.name = theme["font"]
-        title_shape.text_frame.paragraphs[0].font.size = Pt(theme["font_size"] + 5)
-        title_shape.text_frame.paragraphs[0].font.color.rgb = self.hex_to_rgbcolor(theme["title_color"])
-                
-        content_box = slide.shapes.add_textbox(Inches(1), Inches(1.7), Inches(5), Inches(4))
-        content_tf = content_box.text_frame
-        content_tf.word_wrap = True
-        content_tf.text = content
-        content_tf.paragraphs[0].font.name = theme["font"]
-        content_tf.paragraphs[0].font.size = Pt(theme["font_size"] + 5)
-        content_tf.paragraphs[0].font.color.rgb = self.hex_to_rgbcolor(theme["title_color"])
-
-        image_path = image
-        if image_path and os.path.exists(image_path):
-            slide.shapes.add_picture(image_path, Inches(7), Inches(1.7), width=Inches(2), height=Inches(2))
-        else:
-            placeholder = slide.shapes.add_textbox(Inches(7), Inches(1.7), Inches(2), Inches(2))
-            placeholder.text = "Image Not Found"
-            placeholder.text_frame.paragraphs[0].font.size = Pt(theme["font_size"])
-            placeholder.text_frame.paragraphs[0].font.color.rgb = self.hex_to_rgbcolor(theme["content_color"])
+        slide_data = [self._apply_layout(slide, layouts[i]) for i, slide in enumerate(slide_data)]
+        return slide_data + self._fill_missing(topic, slide_data, num_slides, layouts)
+
+    def stream_content_from_gemini(self, topic, num_slides, layouts):
+        """
+        Yields slides in deck order as soon as each one has been generated, so
+        rendering can start before the model has finished the whole deck.
+
+        Large decks use the fan-out path instead and are yielded once complete.
+        """
+        if SLIDE_FANOUT_THRESHOLD and num_slides >= SLIDE_FANOUT_THRESHOLD:
+            yield from self.fetch_content_from_gemini(topic, num_slides, layouts)
+            return
+
+        prompt = generate_slide_prompts(topic, num_slides, layouts)
+        parser = SlideStreamParser()
+        slides = []
+        try:
+            for text in self._stream_text(prompt):
+                for slide in parser.feed(text):
+                    if len(slides) < num_slides:
+                        slides.append(self._apply_layout(slide, layouts[len(slides)]))
+                        yield slides[-1]
+        except Exception as e:
+            self.logger.error("Error streaming content from Gemini: %s", e)
+            if not slides:
+                raise RuntimeError("Content generation failed") from e
+
+        if not slides:
+            self.logger.error("No content generated for the topic: %s", topic)
+            self._discard_cached(prompt)
+            raise ValueError("Generated content is empty or invalid.")
+        yield from self._fill_missing(topic, slides, num_slides, layouts)
 
+    def _fetch_slide_group(self, topic, outline, indices, layouts):
+        """Generates the slides at `indices`; returns {index: slide} for those that parsed."""
+        slides = self._generate_slides(generate_slide_group_prompt(topic, outline, indices, layouts))
+        if len(slides) != len(indices):
+            # Cannot tell which slide is which; keep only an exact single-slide answer
+            return {indices[0]: slides[0]} if len(indices) == 1 and slides else {}
+        return dict(zip(indices, slides))
+
+    def fetch_content_fanout(self, topic, num_slides, layouts):
+        """
+        Generates a deck in two phases: a compact outline of slide titles, then
+        groups of SLIDE_FANOUT_GROUP_SIZE slides requested concurrently. Only
+        slides that fail to parse are retried, one at a time, up to
+        SLIDE_FANOUT_RETRIES times; any still missing become title-only slides.
+
+        Returns:
+            list[dict]: Slides in deck order.
+        """
+        outline = self._generate_json(generate_outline_prompt(topic, num_slides, layouts))
+        if not isinstance(outline, list) or len(outline) != num_slides:
+            raise ValueError("Outline is missing or has the wrong number of slides.")
+        outline = [str(title) for title in outline]
+
+        slides = {}
+        pending = [list(range(i, min(i + SLIDE_FANOUT_GROUP_SIZE, num_slides)))
+                   for i in range(0, num_slides, SLIDE_FANOUT_GROUP_SIZE)]
+        with ThreadPoolExecutor(max_workers=SLIDE_FANOUT_CONCURRENCY) as executor:
+            for attempt in range(SLIDE_FANOUT_RETRIES + 1):
+                futures = [executor.submit(self._fetch_slide_group, topic, outline, group, layouts) for group in pending]
+                for future in futures:
+                    try:
+                        slides.update(future.result())
+                    except RuntimeError as e:
+                        self.logger.warning("Slide group generation failed: %s", e)
+                missing = [i for i in range(num_slides) if i not in slides]
+                if not missing:
+                    break
+                self.logger.warning("Retrying %d slides for topic %s (attempt %d)", len(missing), topic, attempt + 1)
+                pending = [[i] for i in missing]
+
+        return [self._apply_layout(slides.get(i) or {"title": outline[i], "points": []}, layouts[i])
+                for i in range(num_slides)]
+    
     def create_presentation(self, content, theme_name="default"):
-        prs = Presentation()
-        theme = themes.get(theme_name, themes["default"])
-
-        for slide_content in content:
-            layout = slide_content.get("Layout", SlideLayout.BULLET_POINTS.value)
-
-            if layout == SlideLayout.TITLE.value:
-                slide = prs.slides.add_slide(prs.slide_layouts[0])
-                self.add_title(slide, slide_content['title'], theme)
-                if "subtitle" in slide_content:
-                    self.add_subtitle(slide, slide_content['subtitle'], theme)
-
-            elif layout == SlideLayout.BULLET_POINTS.value:
-                slide = prs.slides.add_slide(prs.slide_layouts[1])
-                self.add_bullet_points(slide, slide_content['title'], slide_content['points'], theme)
-                
-            elif layout == SlideLayout.TWO_COLUMN.value:
-                slide = prs.slides.add_slide(prs.slide_layouts[5])
-                title = slide_content.get('title', '')
-                left_point = slide_content.get('left_points', [])
-                right_points = slide_content.get('right_points', [])
-                self.add_two_column(slide, title, left_point, right_points, theme)
-
-            elif layout == SlideLayout.CONTENT_WITH_IMAGE.value:
-                slide = prs.slides.add_slide(prs.slide_layouts[5])
-                self.add_content_with_image(slide, slide_content.get('title'), slide_content.get('content'), slide_content.get('image_path'), theme)
-
-            else:
-                slide = prs.slides.add_slide(prs.slide_layouts[1])
-                self.set_slide_background(slide, theme["background_color"])
-                title_shape = slide.shapes.title
-                title_shape.text = slide_content["title"]
-                title_shape.text_frame.paragraphs[0].font.name = theme["font"]
-                title_shape.text_frame.paragraphs[0].font.size = Pt(theme["font_size"] + 5)
-                title_shape.text_frame.paragraphs[0].font.color.rgb = self.hex_to_rgbcolor(theme["title_color"])
-                body_shape = slide.shapes.placeholders[1]
-                tf = body_shape.text_frame
-                tf.clear()
-                for point in slide_content.get("points", []):
-                    p = tf.add_paragraph()
-                    p.text = point
-                    p.bullet = True
-                    p.level = 0
-                    p.font.name = theme["font"]
-                    p.font.size = Pt(theme["font_size"])
-                    p.font.color.rgb = self.hex_to_rgbcolor(theme["content_color"])
-
-        return prs
+        """
+        Renders slide content into a deck cloned from the cached theme template.
+
+        Args:
+            content (Iterable[dict]): Slides in order; may be a generator still being produced.
+            theme_name (str): Key into configs.config.themes.
+
+        Returns:
+            Presentation: The rendered deck.
+        """
+        style = get_theme_style(theme_name)
+        return render_slides(new_presentation(style), content, style)
 
     # def save_presentation(self, prs, topic, num_slides, theme, layouts):
     #     presentation_id = str(uuid.uuid4())
@@ -0,0 +1,263 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STORAGE_PATH = os.getenv("STORAGE_PATH")
+PRESENTATION_STORE = os.getenv("PRESENTATION_STORE", "sqlite")  # sqlite | json
+PRESENTATION_DB_PATH = os.getenv("PRESENTATION_DB_PATH", os.path.join(STORAGE_PATH or ".", "presentations.sqlite3"))
+PRESENTATION_LIST_MAX_LIMIT = 100
+
+
+def _encode_cursor(details):
+    return f"{details.get('created_at', 0)!r}:{details['id']}"
+
+
+def _decode_cursor(cursor):
+    created_at, _, presentation_id = cursor.partition(":")
+    return float(created_at), presentation_id
+
+
+class SQLitePresentationStore:
+    """
+    Presentation details in one SQLite file (WAL mode).
+
+    The full details dict is kept as JSON next to indexed id, topic, theme,
+    status and created_at columns, so lookups are a primary-key read and
+    listings page through an index instead of a directory.
+
+    Decks saved before this store existed are read from their `<id>.json`
+    file in `legacy_directory` on a miss and copied in, so they stay
+    reachable without running the importer first.
+    """
+
+    def __init__(self, path=PRESENTATION_DB_PATH, legacy_directory=None):
+        self.path = path
+        self.legacy_directory = legacy_directory
+        self._local = threading.local()
+        self._connections = {}  # Thread -> its connection, so finished threads' ones can be closed
+        self._connections_lock = threading.Lock()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS presentations ("
+            "id TEXT PRIMARY KEY, topic TEXT, theme TEXT, status TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, details TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS ix_presentations_created ON presentations (created_at, id);"
+            "CREATE INDEX IF NOT EXISTS ix_presentations_topic ON presentations (topic);"
+            "CREATE INDEX IF NOT EXISTS ix_presentations_theme_created ON presentations (theme, created_at);"
+            "CREATE INDEX IF NOT EXISTS ix_presentations_status_created ON presentations (status, created_at);"
+        )
+
+    def _connect(self):
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only lets close() run elsewhere; each connection is used by one thread
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                for thread in [t for t in self._connections if not t.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    def close(self):
+        """Closes every thread's connection; threads that use the store afterwards reconnect."""
+        with self._connections_lock:
+            connections, self._connections = list(self._connections.values()), {}
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def save(self, details):
+        details.setdefault("created_at", time.time())
+        self._connect().execute(
+            "INSERT OR REPLACE INTO presentations (id, topic, theme, status, created_at, updated_at, details) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (details["id"], details.get("topic"), details.get("theme"), details.get("status"),
+             details["created_at"], time.time(), json.dumps(details)),
+        )
+
+    def save_many(self, all_details):
+        """Inserts many details dicts in one transaction; used by the importer."""
+        now = time.time()
+        rows = []
+        for details in all_details:
+            details.setdefault("created_at", now)
+            rows.append((details["id"], details.get("topic"), details.get("theme"), details.get("status"),
+                         details["created_at"], now, json.dumps(details)))
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO presentations (id, topic, theme, status, created_at, updated_at, details) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def get(self, presentation_id):
+        row = self._connect().execute(
+            "SELECT details FROM presentations WHERE id = ?", (presentation_id,)
+        ).fetchone()
+        if row:
+            return json.loads(row[0])
+        return self._get_legacy(presentation_id)
+
+    def _get_legacy(self, presentation_id):
+        if not self.legacy_directory or os.path.basename(presentation_id) != presentation_id:
+            return None
+        path = os.path.join(self.legacy_directory, f"{presentation_id}.json")
+        try:
+            with open(path, "r") as json_file:
+                details = json.load(json_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping {path}: {e}")
+            return None
+        if not isinstance(details, dict) or details.get("id") != presentation_id:
+            return None
+        details.setdefault("created_at", os.path.getmtime(path))
+        self.save(details)
+        logger.info(f"Imported legacy presentation {presentation_id} from {path}")
+        return details
+
+    def list(self, limit=20, cursor=None, topic=None, theme=None, status=None):
+        """
+        Returns one page of presentations, newest first, and the cursor for the next page.
+
+        Args:
+            limit (int): Page size, capped at PRESENTATION_LIST_MAX_LIMIT.
+            cursor (str): `next_cursor` from the previous page, or None for the first page.
+            topic, theme, status (str): Optional exact-match filters.
+
+        Returns:
+            tuple[list[dict], str | None]: The page and the next cursor (None on the last page).
+        """
+        limit = max(1, min(limit, PRESENTATION_LIST_MAX_LIMIT))
+        clauses, params = [], []
+        for column, value in (("topic", topic), ("theme", theme), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if cursor:
+            # Keyset pagination: deep pages cost the same as the first one
+            created_at, presentation_id = _decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([created_at, created_at, presentation_id])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT details FROM presentations {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        page = [json.loads(row[0]) for row in rows[:limit]]
+        next_cursor = _encode_cursor(page[-1]) if len(rows) > limit else None
+        return page, next_cursor
+
+
+class JsonFilePresentationStore:
+    """
+    The original layout: one `<id>.json` file per presentation in a directory.
+
+    Writes are atomic (temp file + rename). Listing has to read every file,
+    so it is only meant for small or legacy stores.
+    """
+
+    def __init__(self, directory=STORAGE_PATH):
+        self.directory = directory
+
+    def _path(self, presentation_id):
+        return os.path.join(self.directory, f"{presentation_id}.json")
+
+    def save(self, details):
+        details.setdefault("created_at", time.time())
+        path = self._path(details["id"])
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as json_file:
+            json.dump(details, json_file, indent=4)
+        os.replace(tmp_path, path)
+
+    def get(self, presentation_id):
+        try:
+            with open(self._path(presentation_id), "r") as json_file:
+                return json.load(json_file)
+        except FileNotFoundError:
+            return None
+
+    def list(self, limit=20, cursor=None, topic=None, theme=None, status=None):
+        limit = max(1, min(limit, PRESENTATION_LIST_MAX_LIMIT))
+        matches = []
+        for details in iter_json_details(self.directory):
+            if all(value is None or details.get(key) == value
+                   for key, value in (("topic", topic), ("theme", theme), ("status", status))):
+                matches.append(details)
+        matches.sort(key=lambda d: (d["created_at"], d["id"]), reverse=True)
+        if cursor:
+            after = _decode_cursor(cursor)
+            matches = [d for d in matches if (d["created_at"], d["id"]) < after]
+        page = matches[:limit]
+        return page, _encode_cursor(page[-1]) if len(matches) > limit else None
+
+
+def iter_json_details(directory):
+    """Yields the details dict of every `<id>.json` file in `directory`, skipping unreadable ones."""
+    for path in glob.iglob(os.path.join(directory, "*.json")):
+        try:
+            with open(path, "r") as json_file:
+                details = json.load(json_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping {path}: {e}")
+            continue
+        if not isinstance(details, dict) or "id" not in details:
+            continue
+        # Files from before created_at was recorded are dated by their mtime
+        details.setdefault("created_at", os.path.getmtime(path))
+        yield details
+
+
+def import_json_details(store, directory, batch_size=1000):
+    """Copies every per-deck JSON file in `directory` into `store`; returns how many were imported."""
+    imported, batch = 0, []
+    for details in iter_json_details(directory):
+        batch.append(details)
+        if len(batch) >= batch_size:
+            imported += store.save_many(batch)
+            batch = []
+    if batch:
+        imported += store.save_many(batch)
+    return imported
+
+
+def get_presentation_store():
+    if PRESENTATION_STORE == "json":
+        return JsonFilePresentationStore()
+    return SQLitePresentationStore(legacy_directory=STORAGE_PATH)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import per-presentation JSON files into the SQLite metadata store.")
+    parser.add_argument("--source", default=STORAGE_PATH, help="directory holding <id>.json files")
+    parser.add_argument("--db", default=PRESENTATION_DB_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = import_json_details(SQLitePresentationStore(args.db), args.source)
+    logger.info(f"Imported {count} presentations into {args.db} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,87 @@
+import argparse
+import logging
+import time
+from sqlalchemy import exists, select
+from sqlalchemy.orm import aliased
+from services.bulk_ingest import BulkIngestor
+from services.embedding_service import EMBEDDING_SPACE
+from services.memory_service import MemoryAgent
+from utils.database import VectorEmbedding, get_session
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def missing_rows(source_space, target_space, after_id, limit):
+    """Rows of `source_space`, in id order after `after_id`, whose document has no `target_space` embedding yet."""
+    target = aliased(VectorEmbedding)
+    session = get_session()
+    try:
+        return session.execute(
+            select(VectorEmbedding)
+            .where(
+                VectorEmbedding.embedding_space == source_space,
+                VectorEmbedding.id > after_id,
+                ~exists().where(
+                    target.mongo_doc_id == VectorEmbedding.mongo_doc_id,
+                    target.embedding_space == target_space,
+                ),
+            )
+            .order_by(VectorEmbedding.id)
+            .limit(limit)
+        ).scalars().all()
+    finally:
+        session.close()
+
+
+def reembed(source_space, batch_size=256, ingestor=None):
+    """
+    Embeds every document stored in `source_space` again with the current
+    model and stores the result in EMBEDDING_SPACE, next to the old rows.
+
+    Searches keep reading the space the serving processes are configured
+    with, so the old space serves until they are switched over. Documents
+    already present in the new space are skipped, so the run can be stopped
+    and restarted.
+
+    Returns:
+        int: Number of embeddings written.
+    """
+    ingestor = ingestor or BulkIngestor()
+    written, after_id, start = 0, 0, time.perf_counter()
+    while True:
+        rows = missing_rows(source_space, EMBEDDING_SPACE, after_id, batch_size)
+        if not rows:
+            return written
+        after_id = rows[-1].id
+        documents = MemoryAgent.fetch_contents([row.mongo_doc_id for row in rows], projection={"content": 1})
+        texts = {str(doc["_id"]): (doc.get("content") or {}).get("revised_prompt", "") for doc in documents}
+        rows = [row for row in rows if texts.get(row.mongo_doc_id)]
+        vectors = ingestor.embed_texts([texts[row.mongo_doc_id] for row in rows])
+        MemoryAgent.store_vector_embeddings([
+            {
+                "user_id": row.user_id,
+                "mongo_doc_id": row.mongo_doc_id,
+                "embedding": vector,
+                "content_type": row.content_type,
+                "additional_info": row.additional_info,
+            }
+            for row, vector in zip(rows, vectors)
+        ])
+        written += len(rows)
+        logger.info(f"Re-embedded {written} documents into '{EMBEDDING_SPACE}' "
+                    f"({written / (time.perf_counter() - start):.1f} docs/sec)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backfill the configured EMBEDDING_SPACE from documents embedded in another space (run migration 003 first)."
+    )
+    parser.add_argument("--from-space", default="bert-large-uncased/mean")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+    if args.from_space == EMBEDDING_SPACE:
+        parser.error(f"--from-space is the configured EMBEDDING_SPACE '{EMBEDDING_SPACE}'; set EMBEDDING_MODEL to the new model")
+    logger.info(f"Wrote {reembed(args.from_space, args.batch_size)} embeddings")
+
+# Command to run this >>>  EMBEDDING_MODEL=sentence-transformers/all-MiniLM-L6-v2 python -m services.reembed
@@ -0,0 +1,100 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
+from services.render_worker import initialize_worker, render_pptx_bytes
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Worker processes used to build and serialize decks (0 renders in the calling thread)
+RENDER_POOL_SIZE = int(os.getenv("RENDER_POOL_SIZE", min(4, os.cpu_count() or 1)))
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", 120))
+# "spawn" keeps children from inheriting the server's threads and held locks
+RENDER_POOL_START_METHOD = os.getenv("RENDER_POOL_START_METHOD", "spawn")
+
+
+class RenderPool:
+    """
+    Renders decks in separate processes so python-pptx's CPU-bound lxml work
+    does not hold the GIL for the server's request and job threads.
+
+    The executor is started on first use. Workers run services.render_worker,
+    which imports only the slide renderer. If a worker process dies the pool
+    is rebuilt for the next call.
+    """
+
+    def __init__(self, max_workers=RENDER_POOL_SIZE, timeout=RENDER_TIMEOUT, start_method=RENDER_POOL_START_METHOD):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_workers > 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=initialize_worker,
+                )
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def render(self, slides, theme_name="default"):
+        """
+        Renders a deck and returns its .pptx bytes.
+
+        Args:
+            slides (Iterable[dict]): Slide content in order. With the pool disabled a
+                generator is rendered as it yields; otherwise it is drained first.
+            theme_name (str): Key into configs.config.themes.
+
+        Returns:
+            bytes: The serialized presentation.
+        """
+        if not self.enabled:
+            return render_pptx_bytes(slides, theme_name)
+
+        executor = self._get_executor()
+        try:
+            return executor.submit(render_pptx_bytes, list(slides), theme_name).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            logger.error("Render pool worker died; restarting the pool")
+            self._reset(executor)
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Returns the process-wide render pool."""
+    global _render_pool
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                _render_pool = RenderPool()
+    return _render_pool
@@ -0,0 +1,34 @@
+"""
+Entry module of the render pool's worker processes.
+
+Workers are spawned, so they import only what is pickled into them: this
+module and the slide renderer. Nothing here may import the Flask app, the
+routes, the job queue, the Gemini client or the embedding engine.
+"""
+import io
+import signal
+from services.slide_renderer import THEME_STYLES, get_theme_style, new_presentation, render_slides
+
+
+def initialize_worker():
+    """
+    Pool initializer: leaves Ctrl-C to the parent, which shuts the pool down,
+    and builds every theme's template so the first deck is not slower.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for style in THEME_STYLES.values():
+        new_presentation(style)
+
+
+def render_pptx_bytes(slides, theme_name):
+    """
+    Renders slide dicts with a theme and returns the saved .pptx file as bytes.
+
+    Runs inside the pool's worker processes, so it only takes and returns
+    picklable values.
+    """
+    style = get_theme_style(theme_name)
+    prs = render_slides(new_presentation(style), slides, style)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
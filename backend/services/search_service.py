@@ -1,47 +1,44 @@
 from googlesearch import search
 import requests
 import logging
-from bs4 import BeautifulSoup
+import os
+from services.web_fetcher import ConcurrentFetcher
+from services.html_extractor import extract_text
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+FETCH_CONCURRENT = os.getenv("FETCH_CONCURRENT", "true").lower() == "true"
+
 
 class SearchAgent:
+    def __init__(self, fetcher=None):
+        self.fetcher = fetcher or ConcurrentFetcher()
 
     def clean_html(self, html_content):
-        # Parse the HTML content
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove <script> and <style> tags
-        for script_or_style in soup(['script', 'style']):
-            script_or_style.decompose()
-        
-        # Remove unnecessary tags (e.g., comments, metadata)
-        for unwanted in soup(['noscript', 'iframe', 'svg', 'form', 'input']):
-            unwanted.decompose()
-
-        # Extract the main content (adjust selectors based on your needs)
-        main_content = soup.find('body')  # Use a more specific selector if needed
-        if main_content:
-            # Remove empty tags and clean text
-            for tag in main_content.find_all():
-                if not tag.text.strip():
-                    tag.decompose()
-
-        # Get cleaned text
-        cleaned_text = main_content.get_text(separator=' ', strip=True) if main_content else ''
-        
-        return cleaned_text
-
-
-    def fetch_articles(self, query="Gen AI", num_results=3):
+        """Returns the visible body text of a page (see services.html_extractor)."""
+        return extract_text(html_content)
+
+
+    def fetch_articles(self, query="Gen AI", num_results=3, concurrent=FETCH_CONCURRENT):
         """
         Fetches the latest news articles based on the query.
+
+        With `concurrent` set, result pages are downloaded in parallel through
+        the shared fetcher and cleaned in the order they finish.
         """
         try:
             search_results = search(query, num_results=num_results, advanced=True)
+            if concurrent:
+                urls = [result.url for result in search_results]
+                articles = []
+                for _, html in self.fetcher.fetch_iter(urls):
+                    body = self.clean_html(html)
+                    if body:
+                        articles.append(body)
+                return articles
+
             articles = []
             for result in search_results:
                 try:
@@ -57,4 +54,4 @@ class SearchAgent:
             return articles
         except Exception as e:
             logger.error(f"Error fetching latest news: {e}")
-            return []
\ No newline at end of file
+            return []
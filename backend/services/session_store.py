@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from flask import after_this_request, request
+from dotenv import load_dotenv
+from utils.metrics import metrics
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")  # memory | sqlite | redis
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", 1000))
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", 3600))
+SESSION_MAX_HISTORY_TOKENS = int(os.getenv("SESSION_MAX_HISTORY_TOKENS", 8000))
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(os.getenv("STORAGE_PATH") or ".", "sessions.sqlite3"))
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+
+SESSION_HEADER = "X-Session-Id"
+SESSION_COOKIE = "session_id"
+# The first exchange carries the prompt-engineer instructions and is never trimmed
+PINNED_TURNS = 2
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class ChatSession:
+    """One user's prompt-refinement conversation: Gemini history as plain dicts plus the latest revised prompt."""
+
+    def __init__(self, session_id, history=None, revised_prompt="", updated_at=None):
+        self.session_id = session_id
+        self.history = history or []
+        self.revised_prompt = revised_prompt
+        self.updated_at = updated_at or time.time()
+
+    def append(self, role, text):
+        self.history.append({"role": role, "parts": [text]})
+
+    def history_tokens(self):
+        return sum(estimate_tokens(part) for turn in self.history for part in turn["parts"])
+
+    def trim(self, max_tokens):
+        """
+        Drops the oldest exchanges after the pinned first one until the history
+        fits in `max_tokens`. The latest exchange is always kept.
+
+        Returns:
+            int: Number of turns removed.
+        """
+        removed = 0
+        while self.history_tokens() > max_tokens and len(self.history) > PINNED_TURNS + 2:
+            # Remove a user/model pair so roles keep alternating
+            del self.history[PINNED_TURNS:PINNED_TURNS + 2]
+            removed += 2
+        return removed
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            # Copies, so a stored dict never shares its list with a live session
+            "history": list(self.history),
+            "revised_prompt": self.revised_prompt,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["session_id"], list(data.get("history") or []), data.get("revised_prompt", ""), data.get("updated_at"))
+
+
+class InMemorySessionBackend:
+    """Per-process LRU of sessions with idle expiry."""
+
+    def __init__(self, max_sessions=SESSION_MAX_SESSIONS, idle_ttl=SESSION_IDLE_TTL):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            data = self._sessions.get(session_id)
+            if data is None:
+                return None
+            if time.time() - data["updated_at"] > self.idle_ttl:
+                del self._sessions[session_id]
+                metrics.increment("sessions.expired")
+                return None
+            self._sessions.move_to_end(session_id)
+            return data
+
+    def set(self, session_id, data):
+        with self._lock:
+            self._sessions[session_id] = data
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                metrics.increment("sessions.evicted")
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SQLiteSessionBackend:
+    """
+    Sessions in a SQLite file (WAL mode), so they survive restarts and are
+    shared by every worker process on the host. Idle sessions are purged on
+    write, and the oldest ones beyond `max_sessions` are dropped.
+    """
+
+    PURGE_EVERY = 100
+
+    def __init__(self, path=SESSION_DB_PATH, max_sessions=SESSION_MAX_SESSIONS, idle_ttl=SESSION_IDLE_TTL):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_updated ON sessions (updated_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, session_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE id = ? AND updated_at > ?", (session_id, time.time() - self.idle_ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, session_id, data):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(data), data["updated_at"]),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM sessions WHERE updated_at <= ?", (time.time() - self.idle_ttl,))
+                conn.execute(
+                    "DELETE FROM sessions WHERE id NOT IN (SELECT id FROM sessions ORDER BY updated_at DESC LIMIT ?)",
+                    (self.max_sessions,),
+                )
+
+
+class RedisSessionBackend:
+    """Sessions in Redis with the idle TTL as key expiry; works with any Redis-protocol server."""
+
+    def __init__(self, url=SESSION_REDIS_URL, idle_ttl=SESSION_IDLE_TTL, prefix="session:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.idle_ttl = int(idle_ttl)
+        self.prefix = prefix
+
+    def get(self, session_id):
+        key = self.prefix + session_id
+        raw = self.client.get(key)
+        if raw is None:
+            return None
+        self.client.expire(key, self.idle_ttl)
+        return json.loads(raw)
+
+    def set(self, session_id, data):
+        self.client.set(self.prefix + session_id, json.dumps(data), ex=self.idle_ttl)
+
+
+class SessionStore:
+    """Loads and saves ChatSessions, capping each session's history at `max_history_tokens`."""
+
+    def __init__(self, backend, max_history_tokens=SESSION_MAX_HISTORY_TOKENS):
+        self.backend = backend
+        self.max_history_tokens = max_history_tokens
+
+    def get(self, session_id):
+        """Returns the stored session, or a new empty one if it is unknown or expired."""
+        data = self.backend.get(session_id)
+        if data is None:
+            metrics.increment("sessions.created")
+            return ChatSession(session_id)
+        return ChatSession.from_dict(data)
+
+    def save(self, session):
+        removed = session.trim(self.max_history_tokens)
+        if removed:
+            metrics.increment("sessions.trimmed_turns", removed)
+        metrics.observe("sessions.history_tokens", session.history_tokens())
+        session.updated_at = time.time()
+        self.backend.set(session.session_id, session.to_dict())
+
+
+def _create_backend():
+    if SESSION_BACKEND == "sqlite":
+        return SQLiteSessionBackend()
+    if SESSION_BACKEND == "redis":
+        return RedisSessionBackend()
+    return InMemorySessionBackend()
+
+
+session_store = SessionStore(_create_backend())
+if isinstance(session_store.backend, InMemorySessionBackend):
+    metrics.register_gauge("sessions.active", lambda: len(session_store.backend))
+
+
+def get_session_id():
+    """
+    Session id for the current request, from the X-Session-Id header, a
+    `session_id` body field or the session cookie. A new id is issued when
+    none is sent. The id is echoed back in the header and cookie so clients
+    can keep using it.
+    """
+    body = request.get_json(silent=True) or {}
+    session_id = request.headers.get(SESSION_HEADER) or body.get("session_id") or request.cookies.get(SESSION_COOKIE)
+    if not session_id:
+        session_id = uuid.uuid4().hex
+
+    @after_this_request
+    def attach_session_id(response):
+        response.headers[SESSION_HEADER] = session_id
+        response.set_cookie(SESSION_COOKIE, session_id, max_age=int(SESSION_IDLE_TTL), httponly=True, samesite="Lax")
+        return response
+
+    return session_id
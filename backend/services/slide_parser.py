@@ -0,0 +1,187 @@
+import json
+import logging
+import re
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)\s*(?:```|$)", re.DOTALL)
+_KEY_SEPARATORS = re.compile(r"[\s\-]+")
+LIST_KEYS = ("points", "left_points", "right_points")
+
+
+def _strip_trailing_commas(text):
+    """Removes commas directly before a closing bracket or brace, ignoring string contents."""
+    out, in_string, escaped = [], False, False
+    for i, ch in enumerate(text):
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch == ",":
+            rest = text[i + 1:].lstrip()
+            if rest[:1] in ("]", "}"):
+                continue
+        out.append(ch)
+    return "".join(out)
+
+
+def loads_lenient(text):
+    """json.loads that tolerates trailing commas and raw control characters inside strings."""
+    try:
+        return json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        return json.loads(_strip_trailing_commas(text), strict=False)
+
+
+def extract_json(text):
+    """
+    Parses the JSON value in a model response, fenced with ``` or not.
+
+    Raises:
+        json.JSONDecodeError: If no valid JSON value can be recovered.
+    """
+    match = _FENCE.search(text)
+    body = match.group(1) if match else text
+    starts = [i for i in (body.find("["), body.find("{")) if i != -1]
+    if starts:
+        body = body[min(starts):]
+        end = max(body.rfind("]"), body.rfind("}"))
+        body = body[:end + 1] if end != -1 else body
+    return loads_lenient(body)
+
+
+def normalize_slide(slide):
+    """
+    Canonicalizes one slide object: keys become snake_case ("Layout" -> "layout",
+    "Left Points" -> "left_points"), bullet fields become lists and `content`
+    becomes a single string.
+    """
+    normalized = {}
+    for key, value in slide.items():
+        normalized[_KEY_SEPARATORS.sub("_", str(key).strip()).lower()] = value
+    for key in LIST_KEYS:
+        value = normalized.get(key)
+        if isinstance(value, str):
+            normalized[key] = [value] if value.strip() else []
+    content = normalized.get("content")
+    if isinstance(content, list):
+        normalized["content"] = "\n".join(str(line) for line in content)
+    if isinstance(normalized.get("layout"), str):
+        normalized["layout"] = normalized["layout"].strip().lower()
+    return normalized
+
+
+class SlideStreamParser:
+    """
+    Incremental parser for a JSON array of slide objects.
+
+    Feed it response text as it arrives; every time a slide object closes it
+    is repaired, parsed, normalized and returned, so callers can act on slides
+    before the response ends. Code fences, text around the JSON and objects
+    that fail to parse are skipped. The root may be an array of slides, a
+    single slide object, or an object wrapping the array (e.g.
+    {"slides": [...]}): a root object is a wrapper when an object shows up in
+    one of its lists before any slide key (title, layout) has been seen, and
+    the objects in that list are emitted instead of the wrapper.
+    """
+
+    SLIDE_KEYS = ("title", "layout")
+
+    def __init__(self):
+        self._buffer = []
+        self._stack = []  # Open brackets, from the root "[" or "{"
+        self._slide_depth = 0  # len(self._stack) just outside the slide being read
+        self._root_is_slide = False  # A root object has shown a slide key
+        self._string = []  # Characters of the string being read, for key detection
+        self._last_string = None
+        self._in_string = False
+        self._escaped = False
+        self.failed = 0
+
+    def feed(self, chunk):
+        """Consumes a chunk of response text and returns the slides it completed."""
+        slides = []
+        for ch in chunk:
+            if self._stack:
+                self._buffer.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = "".join(self._string)
+                    continue
+                self._string.append(ch)
+            elif ch == '"':
+                self._in_string = bool(self._stack)
+                self._string = []
+            elif ch == ":":
+                if self._stack == ["{"] and self._is_slide_key(self._last_string):
+                    self._root_is_slide = True
+            elif ch == "[":
+                if not self._stack:
+                    self._start(ch, slide_depth=1)
+                else:
+                    self._stack.append(ch)
+            elif ch == "{":
+                if not self._stack:
+                    self._start(ch, slide_depth=0)
+                    self._buffer = [ch]
+                    continue
+                if self._stack == ["["]:
+                    self._buffer = [ch]
+                elif self._stack == ["{", "["] and not self._root_is_slide:
+                    # The root object is a wrapper; its list holds the slides
+                    self._slide_depth = 2
+                    self._buffer = [ch]
+                self._stack.append(ch)
+            elif ch in "]}" and self._stack:
+                if self._stack.pop() != ("{" if ch == "}" else "["):
+                    self._reset()  # Mismatched bracket; resynchronise on the next root
+                    continue
+                if ch == "}" and len(self._stack) == self._slide_depth:
+                    slide = self._complete("".join(self._buffer))
+                    if slide is not None:
+                        slides.append(slide)
+                if not self._stack:
+                    self._reset()
+        return slides
+
+    def _is_slide_key(self, key):
+        return key is not None and _KEY_SEPARATORS.sub("_", key.strip()).lower() in self.SLIDE_KEYS
+
+    def _start(self, ch, slide_depth):
+        self._reset()
+        self._stack = [ch]
+        self._slide_depth = slide_depth
+
+    def _reset(self):
+        self._buffer = []
+        self._stack = []
+        self._slide_depth = 0
+        self._root_is_slide = False
+        self._last_string = None
+
+    def _complete(self, text):
+        try:
+            value = loads_lenient(text)
+        except json.JSONDecodeError as e:
+            self.failed += 1
+            logger.warning(f"Skipping unparseable slide object: {e}")
+            return None
+        return normalize_slide(value) if isinstance(value, dict) else None
+
+
+def parse_slides(text):
+    """Parses every slide object in a complete response."""
+    return SlideStreamParser().feed(text)
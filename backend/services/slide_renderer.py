@@ -0,0 +1,165 @@
+import io
+import os
+import threading
+from dataclasses import dataclass
+from pptx import Presentation
+from pptx.util import Pt, Inches
+from pptx.dml.color import RGBColor
+from configs.config import SlideLayout, themes
+
+
+@dataclass(frozen=True)
+class ThemeStyle:
+    """A theme from configs.config with every font size and color precomputed."""
+    name: str
+    font: str
+    body_size: Pt
+    title_size: Pt
+    cover_title_size: Pt
+    title_color: RGBColor
+    content_color: RGBColor
+    background_color: RGBColor
+
+
+def hex_to_rgbcolor(hex_color):
+    return RGBColor(int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16))
+
+
+def compile_theme(name, theme):
+    return ThemeStyle(
+        name=name,
+        font=theme["font"],
+        body_size=Pt(theme["font_size"]),
+        title_size=Pt(theme["font_size"] + 5),
+        cover_title_size=Pt(theme["font_size"] + 10),
+        title_color=hex_to_rgbcolor(theme["title_color"]),
+        content_color=hex_to_rgbcolor(theme["content_color"]),
+        background_color=hex_to_rgbcolor(theme["background_color"]),
+    )
+
+
+THEME_STYLES = {name: compile_theme(name, theme) for name, theme in themes.items()}
+
+
+def get_theme_style(theme_name):
+    """Returns the compiled style for a theme, falling back to the default theme."""
+    return THEME_STYLES.get(theme_name, THEME_STYLES["default"])
+
+
+def _style_font(font, family, size, color):
+    if family is not None:
+        font.name = family
+    font.size = size
+    font.color.rgb = color
+
+
+def _set_background(slide, style):
+    fill = slide.background.fill
+    fill.solid()
+    fill.fore_color.rgb = style.background_color
+
+
+_template_bytes = {}
+_template_lock = threading.Lock()
+
+
+def _build_template(style):
+    """Serializes an empty deck whose slide master carries the theme background."""
+    prs = Presentation()
+    # Every layout and slide inherits the master background, so it is set once here
+    _set_background(prs.slide_master, style)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def new_presentation(style):
+    """
+    Returns an empty deck pre-styled for `style`.
+
+    The default template is parsed and themed once per style; every call after
+    that reopens the cached package bytes, which skips template setup and any
+    per-slide background fills.
+    """
+    data = _template_bytes.get(style.name)
+    if data is None:
+        with _template_lock:
+            data = _template_bytes.get(style.name)
+            if data is None:
+                data = _template_bytes[style.name] = _build_template(style)
+    return Presentation(io.BytesIO(data))
+
+
+def _set_title(slide, title, style, size):
+    title_shape = slide.shapes.title
+    title_shape.text = title
+    _style_font(title_shape.text_frame.paragraphs[0].font, style.font, size, style.title_color)
+
+
+def _add_points(text_frame, points, style):
+    for point in points:
+        p = text_frame.add_paragraph()
+        p.text = point
+        p.level = 0
+        _style_font(p.font, style.font, style.body_size, style.content_color)
+
+
+def render_title(slide, content, style):
+    _set_title(slide, content.get('title', ''), style, style.cover_title_size)
+    if "subtitle" in content:
+        slide.placeholders[1].text = content['subtitle']
+
+
+def render_bullet_points(slide, content, style):
+    _set_title(slide, content.get('title', ''), style, style.title_size)
+    tf = slide.shapes.placeholders[1].text_frame
+    tf.clear()
+    _add_points(tf, content.get('points', []), style)
+
+
+def render_two_column(slide, content, style):
+    _set_title(slide, content.get('title', ''), style, style.title_size)
+    for left, points in ((Inches(1), content.get('left_points', [])), (Inches(5.5), content.get('right_points', []))):
+        tf = slide.shapes.add_textbox(left, Inches(1.7), Inches(4), Inches(4)).text_frame
+        tf.word_wrap = True
+        _add_points(tf, points, style)
+
+
+def render_content_with_image(slide, content, style):
+    _set_title(slide, content.get('title', ''), style, style.title_size)
+    content_tf = slide.shapes.add_textbox(Inches(1), Inches(1.7), Inches(5), Inches(4)).text_frame
+    content_tf.word_wrap = True
+    content_tf.text = content.get('content') or ''
+    _style_font(content_tf.paragraphs[0].font, style.font, style.title_size, style.title_color)
+
+    image_path = content.get('image_path')
+    if image_path and os.path.exists(image_path):
+        slide.shapes.add_picture(image_path, Inches(7), Inches(1.7), width=Inches(2), height=Inches(2))
+    else:
+        placeholder = slide.shapes.add_textbox(Inches(7), Inches(1.7), Inches(2), Inches(2))
+        placeholder.text = "Image Not Found"
+        _style_font(placeholder.text_frame.paragraphs[0].font, None, style.body_size, style.content_color)
+
+
+# SlideLayout -> (index into the template's slide layouts, renderer)
+LAYOUT_RENDERERS = {
+    SlideLayout.TITLE: (0, render_title),
+    SlideLayout.BULLET_POINTS: (1, render_bullet_points),
+    SlideLayout.TWO_COLUMN: (5, render_two_column),
+    SlideLayout.CONTENT_WITH_IMAGE: (5, render_content_with_image),
+}
+_RENDERERS_BY_VALUE = {layout.value: entry for layout, entry in LAYOUT_RENDERERS.items()}
+
+
+def render_slides(prs, slides, style):
+    """
+    Appends one slide per content dict to `prs`, dispatching on its `layout`.
+    Unknown layouts are rendered as bullet points. Backgrounds come from the
+    slide master, so `prs` should come from new_presentation(style).
+    """
+    default = LAYOUT_RENDERERS[SlideLayout.BULLET_POINTS]
+    for content in slides:
+        layout_index, renderer = _RENDERERS_BY_VALUE.get(content.get("layout"), default)
+        slide = prs.slides.add_slide(prs.slide_layouts[layout_index])
+        renderer(slide, content, style)
+    return prs
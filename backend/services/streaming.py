@@ -0,0 +1,79 @@
+import json
+import logging
+import time
+from flask import Response
+from utils.metrics import metrics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def sse_event(data, event=None):
+    """Formats one Server-Sent Event with a JSON payload."""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+class GenerationStream:
+    """
+    Streams a Gemini generation as SSE events while collecting the full text.
+
+    Emits a `chunk` event per model chunk, then `done` (or `error`). The
+    time to the first chunk is logged and recorded as `<name>.ttft_ms`.
+    """
+
+    def __init__(self, model, prompt, name):
+        self.model = model
+        self.prompt = prompt
+        self.name = name
+        self.parts = []
+        self.completed = False
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def events(self):
+        start = time.perf_counter()
+        try:
+            for chunk in self.model.generate_content(self.prompt, stream=True):
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue  # Chunk carries no text (e.g. safety metadata only)
+                if not self.parts:
+                    ttft_ms = (time.perf_counter() - start) * 1000
+                    metrics.observe(f"{self.name}.ttft_ms", ttft_ms)
+                    logger.info(f"{self.name}: first token after {ttft_ms:.0f} ms")
+                self.parts.append(text)
+                yield sse_event({"text": text}, event="chunk")
+            self.completed = True
+            metrics.observe(f"{self.name}.stream_ms", (time.perf_counter() - start) * 1000)
+            yield sse_event({"length": len(self.text)}, event="done")
+        except Exception as e:
+            logger.error(f"Error streaming {self.name}: {e}")
+            metrics.increment(f"{self.name}.stream_errors")
+            yield sse_event({"error": "Failed to generate content."}, event="error")
+
+
+def sse_response(stream, on_complete=None):
+    """
+    Wraps a GenerationStream in a text/event-stream response.
+
+    `on_complete(text)` runs after the response has been fully sent, so slow
+    post-processing such as embedding and storage never delays the client.
+    """
+    response = Response(
+        stream.events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    if on_complete is not None:
+        def finish():
+            if stream.completed:
+                try:
+                    on_complete(stream.text)
+                except Exception as e:
+                    logger.error(f"Error finishing {stream.name} stream: {e}")
+        response.call_on_close(finish)
+    return response
@@ -0,0 +1,283 @@
+import copy
+import logging
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NearestResult = namedtuple("NearestResult", ["mongo_doc_id", "similarity"])
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector, axis=-1, keepdims=True)
+    return vector / np.maximum(norm, 1e-12)
+
+
+class _Partition:
+    """
+    Embeddings of one (user_id, content_type) pair as a contiguous, L2-normalized matrix.
+
+    Rows are only ever appended: a stored row is never rewritten, and growing
+    the matrix copies it to a new array, so a `snapshot` stays valid while
+    the partition keeps changing.
+    """
+
+    dtype = np.float32
+
+    def __init__(self, dimension, capacity=64):
+        self.matrix = np.empty((capacity, dimension), dtype=self.dtype)
+        self.ids = []
+        self.positions = {}
+        self.size = 0
+        self.loaded_at = time.monotonic()
+
+    @property
+    def nbytes(self):
+        return self.matrix[:self.size].nbytes
+
+    def _grow(self):
+        # Grow geometrically so appends stay amortized O(dimension)
+        grown = np.empty((self.matrix.shape[0] * 2, self.matrix.shape[1]), dtype=self.dtype)
+        grown[:self.size] = self.matrix[:self.size]
+        self.matrix = grown
+
+    def _store(self, row, vector):
+        self.matrix[row] = vector
+
+    def _scores(self, query):
+        return self.matrix[:self.size] @ query
+
+    def append(self, mongo_doc_id, vector):
+        if mongo_doc_id in self.positions:
+            return
+        if self.size == self.matrix.shape[0]:
+            self._grow()
+        self._store(self.size, _normalize(vector))
+        self.positions[mongo_doc_id] = self.size
+        self.ids.append(mongo_doc_id)
+        self.size += 1
+
+    def snapshot(self):
+        """A view of the rows stored so far that later appends don't touch; take it under the index lock."""
+        return copy.copy(self)
+
+    def top_k(self, query_vec, k):
+        if self.size == 0 or k <= 0:
+            return []
+        scores = self._scores(_normalize(query_vec))
+        if k < self.size:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(self.size)
+        ordered = candidates[np.argsort(-scores[candidates])]
+        return [NearestResult(self.ids[i], float(scores[i])) for i in ordered]
+
+
+def _blockwise_scores(matrix, query, block_rows=4096):
+    """matrix @ query for a reduced-precision matrix, upcasting one block of rows at a time."""
+    scores = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], block_rows):
+        scores[start:start + block_rows] = matrix[start:start + block_rows].astype(np.float32) @ query
+    return scores
+
+
+class _Float16Partition(_Partition):
+    """A _Partition stored in float16, like pgvector's halfvec: half the float32 footprint."""
+
+    dtype = np.float16
+
+    def _scores(self, query):
+        return _blockwise_scores(self.matrix[:self.size], query)
+
+
+class _Int8Partition(_Partition):
+    """
+    A _Partition stored as int8 codes with one float32 scale per row, about a
+    quarter of the float32 footprint. Scores are approximate; callers rerank
+    the best candidates at full precision.
+    """
+
+    dtype = np.int8
+
+    def __init__(self, dimension, capacity=64):
+        super().__init__(dimension, capacity)
+        self.scales = np.empty(capacity, dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        return self.matrix[:self.size].nbytes + self.scales[:self.size].nbytes
+
+    def _grow(self):
+        super()._grow()
+        grown = np.empty(self.matrix.shape[0], dtype=np.float32)
+        grown[:self.size] = self.scales[:self.size]
+        self.scales = grown
+
+    def _store(self, row, vector):
+        scale = max(float(np.abs(vector).max()) / 127.0, 1e-12)
+        self.matrix[row] = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+        self.scales[row] = scale
+
+    def _scores(self, query):
+        return _blockwise_scores(self.matrix[:self.size], query) * self.scales[:self.size]
+
+
+PARTITION_TYPES = {"float32": _Partition, "float16": _Float16Partition, "int8": _Int8Partition}
+
+
+class _Load:
+    """One in-flight partition load that other callers for the same key wait on."""
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.pending = []  # (mongo_doc_id, embedding) added while the load ran
+        self.partition = None
+        self.error = None
+
+
+class InMemoryVectorIndex:
+    """
+    In-process cosine top-k over cached per-partition embedding matrices.
+
+    Partitions are loaded on first use through `loader(user_id, content_type)`,
+    which yields `(mongo_doc_id, embedding)` pairs, and then kept up to date by
+    `add` as new embeddings are stored. Exposes the same `nearest` interface
+    as the pgvector path in MemoryAgent.
+
+    With `precision="float16"` or `"int8"` partitions are stored at reduced
+    precision (int8 is scalar-quantized per row). If `rerank_fn` is given, the best `k * rerank_factor` candidates are rescored against
+    the full-precision vectors it returns (`{mongo_doc_id: embedding}`).
+
+    Loads run outside the index lock, one per partition at a time, so a cold
+    partition only delays the callers that need it. `add` only reaches this
+    process's cache; with `max_age` set, partitions older than that many
+    seconds are reloaded, so writes made by other workers show up within
+    `max_age`. The stale copy keeps serving while the reload runs.
+    """
+
+    def __init__(self, loader, precision="float32", rerank_fn=None, rerank_factor=4, max_age=None):
+        self.loader = loader
+        self.partition_type = PARTITION_TYPES[precision]
+        self.rerank_fn = rerank_fn
+        self.rerank_factor = rerank_factor
+        self.max_age = max_age
+        self._partitions = {}
+        self._loading = {}
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    def _is_fresh(self, partition):
+        return self.max_age is None or time.monotonic() - partition.loaded_at < self.max_age
+
+    def _partition(self, user_id, content_type):
+        key = (user_id, content_type)
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is not None and self._is_fresh(partition):
+                return partition
+            load = self._loading.get(key)
+            if load is not None and partition is not None:
+                return partition  # Another caller is refreshing it
+            leader = load is None
+            if leader:
+                load = self._loading[key] = _Load(self._generation)
+        if leader:
+            try:
+                return self._load(key, load)
+            except Exception as e:
+                if partition is None:
+                    raise
+                logger.warning(f"Keeping stale embeddings for user ID: {user_id} after reload failed: {e}")
+                return partition
+        load.done.wait()
+        if load.error is not None:
+            raise load.error
+        return load.partition
+
+    def _load(self, key, load):
+        """Runs `loader` without holding the lock and publishes the result to waiting callers."""
+        user_id, content_type = key
+        try:
+            rows = list(self.loader(user_id, content_type))
+            partition = None
+            if rows:
+                partition = self.partition_type(len(rows[0][1]), capacity=max(64, len(rows)))
+                for mongo_doc_id, embedding in rows:
+                    partition.append(mongo_doc_id, embedding)
+            logger.info(f"Loaded {len(rows)} embeddings into memory for user ID: {user_id}")
+        except Exception as e:
+            with self._lock:
+                del self._loading[key]
+            load.error = e
+            load.done.set()
+            raise
+        with self._lock:
+            if partition is None and load.pending:
+                partition = self.partition_type(len(load.pending[0][1]))
+            if partition is not None:
+                for mongo_doc_id, embedding in load.pending:
+                    partition.append(mongo_doc_id, embedding)
+                if load.generation == self._generation:
+                    self._partitions[key] = partition
+            del self._loading[key]
+        load.partition = partition
+        load.done.set()
+        return partition
+
+    def nearest(self, user_id, content_type, query_vec, k=5):
+        """Returns the k most similar embeddings as NearestResult pairs, most similar first."""
+        partition = self._partition(user_id, content_type)
+        if partition is None:
+            return []
+        with self._lock:
+            partition = partition.snapshot()
+        # Score outside the lock: the matmul releases the GIL, so queries on any partitions run in parallel
+        if self.rerank_fn is None or partition.dtype == np.float32:
+            return partition.top_k(query_vec, k)
+        candidates = partition.top_k(query_vec, k * self.rerank_factor)
+        return self._rerank(candidates, query_vec, k)
+
+    def _rerank(self, candidates, query_vec, k):
+        vectors = self.rerank_fn([c.mongo_doc_id for c in candidates])
+        query = _normalize(query_vec)
+        rescored = [
+            NearestResult(c.mongo_doc_id, float(_normalize(vectors[c.mongo_doc_id]) @ query))
+            if c.mongo_doc_id in vectors else c
+            for c in candidates
+        ]
+        rescored.sort(key=lambda result: result.similarity, reverse=True)
+        return rescored[:k]
+
+    def memory_bytes(self):
+        """Bytes held by cached partition matrices."""
+        with self._lock:
+            return sum(partition.nbytes for partition in self._partitions.values())
+
+    def add(self, user_id, content_type, mongo_doc_id, embedding):
+        """Appends a newly stored embedding to its partition if that partition is cached."""
+        key = (user_id, content_type)
+        with self._lock:
+            load = self._loading.get(key)
+            if load is not None:
+                # The running load may have read the table before this row was committed
+                load.pending.append((mongo_doc_id, embedding))
+            partition = self._partitions.get(key)
+            if partition is None:
+                # Not cached yet; the row will be picked up when the partition is first loaded
+                return
+            partition.append(mongo_doc_id, embedding)
+
+    def invalidate(self, user_id=None, content_type=None):
+        """Drops cached partitions, all of them when no key is given."""
+        with self._lock:
+            # Loads already running read the table before the change; don't cache their result
+            self._generation += 1
+            if user_id is None:
+                self._partitions.clear()
+            else:
+                self._partitions.pop((user_id, content_type), None)
@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", 8))
+FETCH_PER_HOST_LIMIT = int(os.getenv("FETCH_PER_HOST_LIMIT", 2))
+FETCH_REQUEST_TIMEOUT = float(os.getenv("FETCH_REQUEST_TIMEOUT", 5))
+FETCH_DEADLINE = float(os.getenv("FETCH_DEADLINE", 8))
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", 2 * 1024 * 1024))
+
+
+class ConcurrentFetcher:
+    """
+    Fetches many URLs in parallel over one pooled HTTP session.
+
+    Each host is limited to `per_host_limit` simultaneous requests, every
+    response body is capped at `max_bytes`, and a whole batch is bounded by
+    `deadline` seconds: pages still loading when it expires are abandoned.
+    """
+
+    def __init__(self, max_workers=FETCH_MAX_WORKERS, per_host_limit=FETCH_PER_HOST_LIMIT,
+                 request_timeout=FETCH_REQUEST_TIMEOUT, deadline=FETCH_DEADLINE, max_bytes=FETCH_MAX_BYTES):
+        self.per_host_limit = per_host_limit
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="web-fetcher")
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def _read_capped(self, response):
+        chunks, size = [], 0
+        for chunk in response.iter_content(chunk_size=16384):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_bytes:
+                logger.info(f"Truncated response from {response.url} at {self.max_bytes} bytes")
+                break
+        return b"".join(chunks)[:self.max_bytes]
+
+    def fetch(self, url, expires_at=None):
+        """
+        Fetches one URL and returns its decoded body, or None on failure or non-200 status.
+        """
+        with self._host_slot(url):
+            timeout = self.request_timeout
+            if expires_at is not None:
+                timeout = min(timeout, expires_at - time.monotonic())
+                if timeout <= 0:
+                    return None
+            try:
+                with self.session.get(url, timeout=timeout, stream=True) as response:
+                    if response.status_code != 200:
+                        return None
+                    body = self._read_capped(response)
+                    return body.decode(response.encoding or "utf-8", errors="replace")
+            except (requests.RequestException, LookupError) as e:
+                logger.warning(f"Failed to fetch {url}: {e}")
+                return None
+
+    def fetch_iter(self, urls):
+        """
+        Fetches all `urls` concurrently and yields `(url, text)` pairs as pages finish.
+
+        Failed pages are skipped; pages still pending at the deadline are dropped.
+        """
+        expires_at = time.monotonic() + self.deadline
+        futures = {self.executor.submit(self.fetch, url, expires_at): url for url in urls}
+        try:
+            for future in as_completed(futures, timeout=max(0.0, expires_at - time.monotonic())):
+                text = future.result()
+                if text:
+                    yield futures[future], text
+        except FuturesTimeoutError:
+            pending = [url for future, url in futures.items() if not future.done()]
+            logger.warning(f"Fetch deadline of {self.deadline}s reached, dropping {len(pending)} pages")
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,52 @@
+import os
+import time
+from services.artifact_store import ArtifactStore
+
+
+def test_put_shards_and_dedups(tmp_path):
+    store = ArtifactStore(str(tmp_path), dedup=True)
+    first = store.put("a.pptx", b"deck")
+    second = store.put("b.pptx", b"deck")
+
+    assert os.path.dirname(first) != str(tmp_path)
+    assert os.path.samefile(first, second)
+    assert store.locate("a.pptx") == first
+
+    store.put("a.pptx", b"changed")
+    with open(store.locate("a.pptx"), "rb") as f:
+        assert f.read() == b"changed"
+    assert not [n for _, _, files in os.walk(tmp_path) for n in files if n.endswith(".tmp")]
+
+
+def test_sweep_resumes_from_cursor(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    old = time.time() - 7 * 86400
+    for i in range(50):
+        path = store.put(f"deck{i}.pptx", b"x")
+        if i % 2 == 0:
+            os.utime(path, (old, old))
+
+    removed, cursor, calls = 0, None, 0
+    while True:
+        count, cursor = store.sweep(86400, cursor=cursor, max_dirs=5)
+        removed += count
+        calls += 1
+        if cursor is None:
+            break
+
+    assert removed == 25 and calls > 1
+    assert store.locate("deck0.pptx") is None and store.locate("deck1.pptx")
+
+
+def test_dedup_put_is_fresh_and_leaves_no_temp_links(tmp_path):
+    store = ArtifactStore(str(tmp_path), dedup=True)
+    old = time.time() - 7 * 86400
+    os.utime(store.put("old.pptx", b"deck"), (old, old))
+
+    fresh = store.put("new.pptx", b"deck")  # Links the week-old blob
+    assert time.time() - os.stat(fresh).st_mtime < 60
+    store.put("new.pptx", b"deck")  # Same bytes again: target already links the blob
+
+    assert not [n for _, _, files in os.walk(tmp_path) for n in files if n.endswith(".tmp")]
+    store.sweep(86400)
+    assert store.locate("new.pptx") == fresh
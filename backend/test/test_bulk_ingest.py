@@ -0,0 +1,73 @@
+import json
+import pytest
+from services.bulk_ingest import BulkIngestor, Checkpoint, read_jsonl
+
+
+class FakeMemoryAgent:
+    """Mongo documents and embedding rows in dicts; can fail once between the two writes."""
+
+    def __init__(self):
+        self.documents = {}
+        self.embeddings = {}
+        self.fail_embeddings_on_batch = None
+        self.batches = 0
+
+    def store_contents_in_mongo(self, documents):
+        for document in documents:
+            self.documents[str(document["_id"])] = document
+
+    def store_vector_embeddings(self, rows):
+        self.batches += 1
+        if self.batches == self.fail_embeddings_on_batch:
+            raise RuntimeError("worker died")
+        for row in rows:
+            self.embeddings[row["mongo_doc_id"]] = row
+
+    def delete_contents(self, mongo_doc_ids):
+        for doc_id in mongo_doc_ids:
+            self.documents.pop(doc_id, None)
+            self.embeddings.pop(doc_id, None)
+
+
+def embed(texts):
+    return [[float(len(text)), 1.0] for text in texts]
+
+
+def write_blogs(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps({"text": f"blog number {i}"}) + "\n")
+
+
+def test_resume_after_crash_between_mongo_and_postgres_stores_each_blog_once(tmp_path):
+    source, checkpoint_path = str(tmp_path / "blogs.jsonl"), str(tmp_path / "blogs.checkpoint")
+    write_blogs(source, 7)
+    memory = FakeMemoryAgent()
+    memory.fail_embeddings_on_batch = 2
+
+    ingestor = BulkIngestor(embed_fn=embed, memory_agent=memory, batch_size=3)
+    with pytest.raises(RuntimeError):
+        ingestor.ingest(read_jsonl(source), Checkpoint(checkpoint_path))
+    # The second batch reached Mongo but not Postgres
+    assert len(memory.documents) == 6 and len(memory.embeddings) == 3
+
+    checkpoint = Checkpoint(checkpoint_path)
+    assert checkpoint.offset == 3 and len(checkpoint.pending) == 3
+    summary = ingestor.ingest(read_jsonl(source, checkpoint.offset), checkpoint)
+
+    assert summary["ingested"] == 4
+    texts = sorted(document["content"]["revised_prompt"] for document in memory.documents.values())
+    assert texts == sorted(f"blog number {i}" for i in range(7))
+    assert memory.embeddings.keys() == memory.documents.keys()
+    assert Checkpoint(checkpoint_path).pending == [] and Checkpoint(checkpoint_path).ingested == 7
+
+
+def test_skips_records_without_text_and_keeps_input_order(tmp_path):
+    memory = FakeMemoryAgent()
+    records = [{"text": "a much longer blog text"}, {"text": "  "}, {"Final Blog": "short"}]
+    summary = BulkIngestor(embed_fn=embed, memory_agent=memory, embed_batch_size=1).ingest(enumerate(records))
+
+    assert summary["ingested"] == 2
+    by_text = {row["mongo_doc_id"]: row["embedding"] for row in memory.embeddings.values()}
+    for doc_id, document in memory.documents.items():
+        assert by_text[doc_id][0] == len(document["content"]["revised_prompt"])
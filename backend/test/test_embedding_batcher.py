@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from services.embedding_batcher import EmbeddingBatcher
+
+
+def test_worker_survives_failures_and_cancelled_futures():
+    calls = []
+
+    def embed_fn(texts):
+        calls.append(list(texts))
+        if "boom" in texts:
+            raise RuntimeError("model failed")
+        return np.ones((len(texts), 3), dtype=np.float32)
+
+    batcher = EmbeddingBatcher(embed_fn, max_wait_ms=50)
+    cancelled = batcher.submit("cancelled")
+    cancelled.cancel()
+    failed = batcher.submit("boom")
+    with pytest.raises(RuntimeError):
+        failed.result(timeout=5)
+
+    vector = batcher.embed("after", timeout=5)
+    assert vector.dtype == np.float32 and vector.tolist() == [1.0, 1.0, 1.0]
+    assert not vector.flags.writeable
+    assert all("cancelled" not in texts for texts in calls)
+
+
+def test_short_result_fails_the_chunk_instead_of_hanging():
+    batcher = EmbeddingBatcher(lambda texts: np.ones((1, 3), dtype=np.float32), max_wait_ms=200)
+    futures = [batcher.submit("a"), batcher.submit("b")]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
@@ -0,0 +1,66 @@
+import json
+import subprocess
+import sys
+import numpy as np
+import pytest
+from services.embedding_service import (
+    EMBEDDING_STORAGE_DIMENSION, create_backend, from_storage_vector, pool, to_storage_vector,
+)
+
+
+def test_mean_pooling_ignores_padding():
+    hidden = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+    assert pool(hidden, mask, "mean").tolist() == [[2.0, 3.0]]
+    assert pool(hidden, mask, "cls").tolist() == [[1.0, 2.0]]
+
+
+def test_storage_padding_keeps_cosine_similarity():
+    rng = np.random.default_rng(0)
+    a, b = rng.normal(size=(2, 384)).astype(np.float32)
+    padded_a, padded_b = np.asarray(to_storage_vector(a)), np.asarray(to_storage_vector(b))
+    assert padded_a.shape == (EMBEDDING_STORAGE_DIMENSION,)
+
+    def cosine(x, y):
+        return x @ y / (np.linalg.norm(x) * np.linalg.norm(y))
+
+    assert np.isclose(cosine(a, b), cosine(padded_a, padded_b), atol=1e-6)
+    assert np.allclose(from_storage_vector(padded_a, 384), a)
+
+
+def test_helpers_import_without_transformers():
+    code = "import sys, services.embedding_service; print('transformers' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_dimension_comes_from_the_config_without_loading_weights(tmp_path):
+    pytest.importorskip("transformers")
+    (tmp_path / "config.json").write_text(json.dumps({"model_type": "bert", "hidden_size": 48}))
+    backend = create_backend("torch", model_name=str(tmp_path))
+    assert backend.dimension == 48
+    assert not backend.is_loaded
+
+
+def test_onnx_export_matches_torch_for_any_batch_shape(tmp_path, monkeypatch):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    pytest.importorskip("onnxruntime")
+    import services.embedding_service as embedding_service
+
+    words = "the quick brown fox jumps over lazy dog a longer sentence".split()
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words) + "\n")
+    model_dir = str(tmp_path / "tiny-bert")
+    torch.manual_seed(0)
+    config = transformers.BertConfig(vocab_size=len(words) + 5, hidden_size=32, num_hidden_layers=2,
+                                     num_attention_heads=2, intermediate_size=64)
+    transformers.BertModel(config).save_pretrained(model_dir)
+    transformers.BertTokenizer(str(vocab)).save_pretrained(model_dir)
+    monkeypatch.setattr(embedding_service, "EMBEDDING_ONNX_DIR", str(tmp_path / "onnx"))
+
+    texts = ["the fox", "a longer sentence the quick brown fox jumps over the lazy dog", "dog"]
+    expected = create_backend("torch", model_name=model_dir).embed(texts)
+    onnx = create_backend("onnx", model_name=model_dir)
+    assert np.allclose(onnx.embed(texts), expected, atol=1e-4)
+    assert np.allclose(onnx.embed(texts[2:]), expected[2:], atol=1e-4)
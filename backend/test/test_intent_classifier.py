@@ -0,0 +1,38 @@
+import hashlib
+import re
+import numpy as np
+from benchmarks.intent_eval import evaluate, load_queries
+from models.generative_model import Intent
+from models.intent_classifier import CentroidIntentScorer, IntentClassifier
+
+DIMENSION = 512
+# Every vector shares this large component, like mean-pooled BERT embeddings do
+COMMON_DIRECTION = np.full(DIMENSION, 0.5, dtype=np.float32)
+
+
+def bag_of_words_embed(texts):
+    """Deterministic stand-in for the embedding model: hashed word counts plus a shared offset."""
+    vectors = np.zeros((len(texts), DIMENSION), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in re.findall(r"[a-z]+", text.lower()):
+            vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % DIMENSION] += 1.0
+        vectors[row] = vectors[row] / max(np.linalg.norm(vectors[row]), 1e-12) + COMMON_DIRECTION
+    return vectors
+
+
+def make_classifier():
+    return IntentClassifier(centroid_scorer=CentroidIntentScorer(bag_of_words_embed))
+
+
+def test_off_topic_query_is_unknown_not_the_closest_intent():
+    scorer = CentroidIntentScorer(bag_of_words_embed)
+    intent, confidence = scorer.score(bag_of_words_embed(["Who is the prime minister of Canada"])[0])
+    assert (intent, confidence) == (Intent.UNKNOWN, 0.0)
+    intent, _ = scorer.score(bag_of_words_embed(["Build a pitch deck for investors"])[0])
+    assert intent == Intent.PRESENTATION_GENERATION
+
+
+def test_labelled_queries_accuracy_and_unknown_recall():
+    result = evaluate(make_classifier(), load_queries(), bag_of_words_embed)
+    assert result["unknown_recall"] == 1.0
+    assert result["accuracy"] >= 0.85
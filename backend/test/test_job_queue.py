@@ -0,0 +1,78 @@
+import sqlite3
+import time
+import pytest
+from services.job_queue import JobQueue, JobStatus
+
+
+def test_requeue_stale_skips_jobs_with_live_heartbeats(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.enqueue("live", "create", {})
+    queue.enqueue("dead", "create", {})
+    assert queue.claim("worker-a")["id"] == "live"
+    assert queue.claim("worker-b")["id"] == "dead"
+
+    time.sleep(0.2)
+    queue.heartbeat("worker-a")
+    assert queue.requeue_stale(stale_after=0.1) == 1
+    assert queue.get("live")["status"] == JobStatus.RUNNING
+    assert queue.get("dead")["status"] == JobStatus.QUEUED
+
+    # The dead worker's late result is dropped once someone else owns the job
+    assert queue.claim("worker-c")["id"] == "dead"
+    assert not queue.finish("dead", owner="worker-b")
+    assert queue.finish("dead", owner="worker-c")
+
+
+def test_prune_removes_only_old_finished_jobs(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    for job_id in ("old", "recent", "queued"):
+        queue.enqueue(job_id, "create", {})
+    for job_id in ("old", "recent"):
+        queue.claim("w")
+        queue.finish(job_id, owner="w")
+    with sqlite3.connect(queue.path) as conn:
+        conn.execute("UPDATE jobs SET finished_at = ? WHERE id = 'old'", (time.time() - 3600,))
+
+    assert queue.prune(older_than=60) == 1
+    assert queue.get("old") is None and queue.get("recent") and queue.get("queued")
+
+
+def test_claim_surfaces_lock_error_instead_of_rollback_error(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), busy_timeout=0.05)
+    holder = sqlite3.connect(queue.path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            queue.claim("w")
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+
+
+def test_claim_only_takes_the_given_kinds(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.enqueue("deck", "create", {})
+    queue.enqueue("blogs", "bulk_ingest", {})
+    assert queue.claim("ingest-worker", kinds=["bulk_ingest"])["id"] == "blogs"
+    assert queue.claim("ingest-worker", kinds=["bulk_ingest"]) is None
+    assert queue.claim("deck-worker", kinds=["create", "configure"])["id"] == "deck"
+
+
+def test_every_operation_closes_its_connection(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    opened = []
+    connect = queue._connect
+    queue._connect = lambda: opened.append(connect()) or opened[-1]
+
+    queue.enqueue("job", "create", {})
+    queue.claim("worker-a")
+    queue.heartbeat("worker-a")
+    queue.finish("job", owner="worker-a")
+    queue.get("job")
+    queue.requeue_stale(stale_after=60)
+    queue.prune(older_than=60)
+
+    assert len(opened) == 7
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
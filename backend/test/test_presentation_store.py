@@ -0,0 +1,55 @@
+import json
+import threading
+from services.presentation_store import SQLitePresentationStore, import_json_details
+
+
+def test_lists_newest_first_with_cursor_and_filters(tmp_path):
+    store = SQLitePresentationStore(str(tmp_path / "presentations.sqlite3"))
+    for i in range(5):
+        store.save({"id": f"p{i}", "topic": "AI", "theme": "dark" if i % 2 else "light", "created_at": float(i)})
+
+    page, cursor = store.list(limit=2)
+    assert [d["id"] for d in page] == ["p4", "p3"]
+    page, cursor = store.list(limit=2, cursor=cursor)
+    assert [d["id"] for d in page] == ["p2", "p1"]
+    page, cursor = store.list(limit=2, cursor=cursor)
+    assert [d["id"] for d in page] == ["p0"] and cursor is None
+
+    page, _ = store.list(theme="dark")
+    assert [d["id"] for d in page] == ["p3", "p1"]
+
+
+def test_imports_legacy_json_files(tmp_path):
+    for i in range(3):
+        (tmp_path / f"deck{i}.json").write_text(json.dumps({"id": f"deck{i}", "topic": "T", "status": "created"}))
+    (tmp_path / "broken.json").write_text("{not json")
+
+    store = SQLitePresentationStore(str(tmp_path / "presentations.sqlite3"))
+    assert import_json_details(store, str(tmp_path)) == 3
+    assert store.get("deck1")["topic"] == "T"
+    assert store.get("missing") is None
+
+
+def test_falls_back_to_legacy_json_and_copies_it_in(tmp_path):
+    (tmp_path / "old.json").write_text(json.dumps({"id": "old", "topic": "Legacy", "status": "created"}))
+    store = SQLitePresentationStore(str(tmp_path / "presentations.sqlite3"), legacy_directory=str(tmp_path))
+
+    assert store.get("old")["topic"] == "Legacy"
+    (tmp_path / "old.json").unlink()
+    assert store.get("old")["topic"] == "Legacy"  # Now served from SQLite
+    assert [d["id"] for d in store.list()[0]] == ["old"]
+    assert store.get("../old") is None
+
+
+def test_closes_connections_of_finished_threads(tmp_path):
+    store = SQLitePresentationStore(str(tmp_path / "presentations.sqlite3"))
+    for i in range(3):
+        thread = threading.Thread(target=store.save, args=({"id": f"p{i}"},))
+        thread.start()
+        thread.join()
+    # Each new thread's first connection closes the ones left by finished threads
+    assert len(store._connections) == 2 and not store._connections.keys() - {threading.current_thread(), thread}
+
+    store.close()
+    assert store._connections == {}
+    assert store.get("p2")["id"] == "p2"  # Reconnects after close
@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Started the way `python app.py` starts: spawned render workers re-import this main module
+MAIN = '''
+import json, sys, threading
+sys.path.insert(0, {backend_dir!r})
+import app
+from services.render_pool import RenderPool
+
+SERVER_MODULES = ("routes.presentation_routes", "services.job_queue", "services.embedding_service",
+                  "services.memory_service", "models.generative_model", "transformers", "torch")
+
+
+def worker_state():
+    return {{
+        "threads": [thread.name for thread in threading.enumerate()],
+        "modules": [name for name in SERVER_MODULES if name in sys.modules],
+    }}
+
+
+if __name__ == "__main__":
+    pool = RenderPool(max_workers=1, start_method="spawn")
+    deck = pool.render([{{"layout": "title", "title": "Hello", "subtitle": "World"}}], "dark")
+    state = pool._get_executor().submit(worker_state).result(timeout=60)
+    pool.shutdown()
+    print(json.dumps(dict(state, deck_is_zip=deck[:2] == b"PK")))
+'''
+
+
+def test_spawned_workers_only_load_the_renderer(tmp_path):
+    main = tmp_path / "serve.py"
+    main.write_text(MAIN.format(backend_dir=BACKEND_DIR))
+    result = subprocess.run([sys.executable, str(main)], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+
+    state = json.loads(result.stdout.strip().splitlines()[-1])
+    assert state["deck_is_zip"]
+    assert state["threads"] == ["MainThread"]
+    assert state["modules"] == []
@@ -0,0 +1,45 @@
+import sqlite3
+from models.response_cache import CachedGenerativeModel, ResponseCache, cache_key
+
+
+def test_expired_rows_are_purged_from_disk(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path=path, ttl=-1)  # Every entry is already expired
+    for i in range(ResponseCache.PURGE_EVERY - 1):
+        cache.set(f"old{i}", {"i": i})
+    cache.ttl = 3600
+    cache.set("fresh", {"i": "fresh"})
+
+    with sqlite3.connect(path) as conn:
+        keys = [row[0] for row in conn.execute("SELECT key FROM responses")]
+    assert keys == ["fresh"]
+    assert ResponseCache(path=path).get("fresh") == {"i": "fresh"}
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _StreamingModel:
+    model_name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, contents, generation_config=None, stream=False, **kwargs):
+        self.calls += 1
+        return iter([_Chunk("[{\"title\": "), _Chunk("\"A\"}]")])
+
+
+def test_stream_is_cached_once_read_to_the_end():
+    model = CachedGenerativeModel(_StreamingModel(), cache=ResponseCache(path=None))
+    stream = model.generate_content("prompt", stream=True)
+    next(stream)
+    assert model.cache.get(cache_key("fake", "prompt")) is None  # Not cached until the stream ends
+    assert [chunk.text for chunk in stream] == ["\"A\"}]"]
+
+    replay = list(model.generate_content("prompt", stream=True))
+    assert [chunk.text for chunk in replay] == ["[{\"title\": \"A\"}]"]
+    assert model.generate_content("prompt").text == "[{\"title\": \"A\"}]"
+    assert model._model.calls == 1
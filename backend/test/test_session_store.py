@@ -0,0 +1,58 @@
+from services.session_store import (
+    ChatSession,
+    InMemorySessionBackend,
+    SQLiteSessionBackend,
+    SessionStore,
+)
+
+
+def test_trim_keeps_pinned_and_latest_exchange():
+    session = ChatSession("s1")
+    session.append("user", "instructions")
+    session.append("model", "ok")
+    for i in range(20):
+        session.append("user", f"question {i} " + "x" * 400)
+        session.append("model", f"answer {i} " + "y" * 400)
+
+    store = SessionStore(InMemorySessionBackend(), max_history_tokens=500)
+    store.save(session)
+
+    assert session.history_tokens() <= 500
+    assert session.history[0]["parts"] == ["instructions"]
+    assert session.history[-1]["parts"][0].startswith("answer 19")
+    assert [turn["role"] for turn in session.history] == ["user", "model"] * (len(session.history) // 2)
+
+
+def test_memory_backend_evicts_lru_and_idle_sessions():
+    backend = InMemorySessionBackend(max_sessions=2, idle_ttl=60)
+    store = SessionStore(backend)
+    for session_id in ("a", "b", "c"):
+        store.save(ChatSession(session_id, revised_prompt=session_id))
+    assert backend.get("a") is None and store.get("c").revised_prompt == "c"
+
+    backend._sessions["b"]["updated_at"] -= 120
+    assert store.get("b").revised_prompt == ""
+
+
+def test_sqlite_backend_round_trips(tmp_path):
+    store = SessionStore(SQLiteSessionBackend(str(tmp_path / "sessions.sqlite3")))
+    session = store.get("s1")
+    session.append("user", "hi")
+    session.revised_prompt = "prompt"
+    store.save(session)
+
+    loaded = store.get("s1")
+    assert loaded.history == [{"role": "user", "parts": ["hi"]}] and loaded.revised_prompt == "prompt"
+
+
+def test_memory_backend_keeps_unsaved_changes_out_of_the_store():
+    store = SessionStore(InMemorySessionBackend())
+    session = store.get("s1")
+    session.append("user", "hi")
+    store.save(session)
+
+    first, second = store.get("s1"), store.get("s1")
+    first.append("model", "hello")
+    session.append("user", "again")
+    assert second.history == [{"role": "user", "parts": ["hi"]}]
+    assert store.get("s1").history == [{"role": "user", "parts": ["hi"]}]
@@ -0,0 +1,61 @@
+from services.slide_parser import SlideStreamParser, extract_json, parse_slides
+
+RESPONSE = '''```json
+[
+  {"title": "Intro", "subtitle": "Why {braces} matter", "Layout": "title",},
+  {"Title": "Agenda", "Points": ["One", "Two",], "Layout": "bullet_points"},
+  {"title": "Compare", "Left Points": ["A"], "Right Points": ["B"], "Layout": "two_column"},
+  {"title": "Picture", "Content": ["Line 1", "Line 2"], "Image Path": "", "Layout": "content_with_image"}
+]
+```'''
+
+
+def test_parses_fenced_response_with_repairs():
+    slides = parse_slides(RESPONSE)
+    assert [s["layout"] for s in slides] == ["title", "bullet_points", "two_column", "content_with_image"]
+    assert slides[0]["subtitle"] == "Why {braces} matter"
+    assert slides[1] == {"title": "Agenda", "points": ["One", "Two"], "layout": "bullet_points"}
+    assert slides[2]["left_points"] == ["A"] and slides[2]["right_points"] == ["B"]
+    assert slides[3]["content"] == "Line 1\nLine 2" and slides[3]["image_path"] == ""
+
+
+def test_emits_each_slide_as_soon_as_it_closes():
+    parser = SlideStreamParser()
+    emitted = []
+    for i in range(0, len(RESPONSE), 7):
+        emitted.append(len(parser.feed(RESPONSE[i:i + 7])))
+    assert sum(emitted) == 4
+    assert emitted.count(1) == 4
+
+
+def test_skips_broken_objects_and_keeps_the_rest():
+    parser = SlideStreamParser()
+    slides = parser.feed('[{"title": "Good"}, {"title": oops}, {"title": "Also good"}]')
+    assert [s["title"] for s in slides] == ["Good", "Also good"]
+    assert parser.failed == 1
+
+
+def test_extract_json_handles_unfenced_and_fenced_arrays():
+    assert extract_json('Here is the outline: ["A", "B",]') == ["A", "B"]
+    assert extract_json('```\n["A"]\n```') == ["A"]
+
+
+def test_unwraps_a_top_level_object_holding_the_slides():
+    response = '```json\n{"slides": [{"title": "Intro", "Layout": "title"}, {"title": "Agenda", "points": ["A"]}]}\n```'
+    parser = SlideStreamParser()
+    slides = [slide for i in range(0, len(response), 5) for slide in parser.feed(response[i:i + 5])]
+    assert slides == [{"title": "Intro", "layout": "title"}, {"title": "Agenda", "points": ["A"]}]
+    assert parse_slides(response) == slides
+
+
+def test_objects_nested_in_a_slide_stay_in_that_slide():
+    response = '[{"title": "A", "layout": "two_column", "columns": [{"a": 1}, {"b": 2}]}, {"title": "B"}]'
+    assert parse_slides(response) == [
+        {"title": "A", "layout": "two_column", "columns": [{"a": 1}, {"b": 2}]},
+        {"title": "B"},
+    ]
+
+
+def test_a_bare_top_level_slide_object_is_one_slide():
+    response = 'Here it is: {"Title": "A", "Points": [{"text": "x"}, {"text": "y"}]}'
+    assert parse_slides(response) == [{"title": "A", "points": [{"text": "x"}, {"text": "y"}]}]
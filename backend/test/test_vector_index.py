@@ -0,0 +1,139 @@
+import threading
+import time
+import numpy as np
+from services.vector_index import PARTITION_TYPES, InMemoryVectorIndex
+
+
+def make_rows(count=500, dimension=32, seed=0):
+    rng = np.random.default_rng(seed)
+    return [(f"doc{i}", rng.normal(size=dimension).astype(np.float32)) for i in range(count)]
+
+
+def brute_force(rows, query, k):
+    matrix = np.stack([v / np.linalg.norm(v) for _, v in rows])
+    scores = matrix @ (query / np.linalg.norm(query))
+    return [rows[i][0] for i in np.argsort(-scores)[:k]]
+
+
+def test_top_k_matches_brute_force():
+    rows = make_rows()
+    index = InMemoryVectorIndex(lambda user_id, content_type: rows)
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        query = rng.normal(size=32).astype(np.float32)
+        results = index.nearest("u", "blog", query, k=10)
+        assert [r.mongo_doc_id for r in results] == brute_force(rows, query, 10)
+        assert all(a.similarity >= b.similarity for a, b in zip(results, results[1:]))
+
+
+def test_cold_load_runs_once_and_does_not_block_other_partitions():
+    rows = make_rows(50)
+    release = threading.Event()
+    calls = []
+
+    def loader(user_id, content_type):
+        calls.append(user_id)
+        if user_id == "slow":
+            release.wait(5)
+        return rows
+
+    index = InMemoryVectorIndex(loader)
+    threads = [threading.Thread(target=index.nearest, args=("slow", "blog", rows[0][1])) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    # The slow load is still running, but another user's partition loads and answers
+    assert index.nearest("fast", "blog", rows[0][1], k=1)[0].mongo_doc_id == "doc0"
+    index.add("slow", "blog", "added-during-load", rows[1][1])
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert calls.count("slow") == 1
+    assert "added-during-load" in index._partitions[("slow", "blog")].positions
+
+
+def test_snapshot_keeps_its_rows_while_the_partition_grows():
+    rows = make_rows(70)
+    partition = PARTITION_TYPES["int8"](32, capacity=64)
+    for mongo_doc_id, embedding in rows[:60]:
+        partition.append(mongo_doc_id, embedding)
+    snapshot = partition.snapshot()
+    for mongo_doc_id, embedding in rows[60:]:
+        partition.append(mongo_doc_id, embedding)  # grows past the initial capacity
+    assert snapshot.size == 60 and partition.size == 70
+    assert snapshot.top_k(rows[65][1], 60)[0].mongo_doc_id != "doc65"
+    assert partition.top_k(rows[65][1], 1)[0].mongo_doc_id == "doc65"
+
+
+def test_scoring_runs_outside_the_index_lock():
+    rows = make_rows(50)
+    index = InMemoryVectorIndex(lambda user_id, content_type: rows)
+    lock_free = []
+    top_k = PARTITION_TYPES["float32"].top_k
+
+    def probe():
+        if index._lock.acquire(timeout=1):
+            index._lock.release()
+            lock_free.append(True)
+
+    def checked_top_k(partition, query_vec, k):
+        # Another thread must be able to take the index lock while this query scores
+        probe_thread = threading.Thread(target=probe)
+        probe_thread.start()
+        probe_thread.join()
+        return top_k(partition, query_vec, k)
+
+    index.partition_type = type("CheckedPartition", (PARTITION_TYPES["float32"],), {"top_k": checked_top_k})
+    assert index.nearest("u", "blog", rows[3][1], k=1)[0].mongo_doc_id == "doc3"
+    assert lock_free == [True]
+
+
+def test_max_age_reloads_rows_written_elsewhere():
+    rows = make_rows(10)
+    index = InMemoryVectorIndex(lambda user_id, content_type: list(rows), max_age=0.05)
+    assert len(index.nearest("u", "blog", rows[0][1], k=20)) == 10
+    rows.append(("other-worker", rows[0][1]))
+    time.sleep(0.1)
+    index.nearest("u", "blog", rows[0][1])  # triggers the reload
+    assert len(index.nearest("u", "blog", rows[0][1], k=20)) == 11
+
+
+def recall_at(index, rows, queries, k):
+    hits = 0
+    for query in queries:
+        found = {r.mongo_doc_id for r in index.nearest("u", "blog", query, k=k)}
+        hits += len(found & set(brute_force(rows, query, k)))
+    return hits / (k * len(queries))
+
+
+def test_reduced_precision_partitions_shrink_and_keep_recall():
+    rows = make_rows(2000, dimension=64)
+    queries = np.random.default_rng(2).normal(size=(20, 64)).astype(np.float32)
+    sizes = {}
+    for precision, min_recall in (("float32", 1.0), ("float16", 0.99), ("int8", 0.9)):
+        index = InMemoryVectorIndex(lambda user_id, content_type: rows, precision=precision)
+        assert recall_at(index, rows, queries, 10) >= min_recall
+        sizes[precision] = index.memory_bytes()
+    assert sizes["float16"] <= sizes["float32"] / 2
+    assert sizes["int8"] <= sizes["float32"] * 0.3
+
+
+def test_rerank_rescores_int8_candidates_at_full_precision():
+    rows = make_rows(2000, dimension=64)
+    vectors = dict(rows)
+    requested = []
+
+    def rerank_fn(mongo_doc_ids):
+        requested.append(len(mongo_doc_ids))
+        return {doc_id: vectors[doc_id] for doc_id in mongo_doc_ids}
+
+    index = InMemoryVectorIndex(lambda user_id, content_type: rows, precision="int8", rerank_fn=rerank_fn, rerank_factor=4)
+    queries = np.random.default_rng(3).normal(size=(20, 64)).astype(np.float32)
+    assert recall_at(index, rows, queries, 10) == 1.0
+    assert requested == [40] * len(queries)
+
+    query = queries[0]
+    for result in index.nearest("u", "blog", query, k=5):
+        vector = vectors[result.mongo_doc_id]
+        exact = vector @ query / (np.linalg.norm(vector) * np.linalg.norm(query))
+        assert np.isclose(result.similarity, exact, atol=1e-5)
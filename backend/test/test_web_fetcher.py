@@ -0,0 +1,75 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from services.web_fetcher import ConcurrentFetcher
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves /fast, /slow, /large and /missing for the fetcher tests."""
+
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.path == "/slow":
+            time.sleep(1.0)
+        body = b"x" * 100000 if self.path == "/large" else f"<html><body>{self.path}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # Clients that stop reading at the size cap close the socket early
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = QuietServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_pages_are_yielded_as_they_finish(base_url):
+    fetcher = ConcurrentFetcher(max_workers=4, deadline=5)
+    urls = [f"{base_url}/slow", f"{base_url}/fast"]
+    fetched = [url for url, _ in fetcher.fetch_iter(urls)]
+    assert fetched == [f"{base_url}/fast", f"{base_url}/slow"]
+
+
+def test_fetches_run_concurrently(base_url):
+    fetcher = ConcurrentFetcher(max_workers=4, per_host_limit=4, deadline=5)
+    start = time.monotonic()
+    fetched = list(fetcher.fetch_iter([f"{base_url}/slow"] * 3))
+    assert len(fetched) == 3
+    assert time.monotonic() - start < 2.5
+
+
+def test_per_host_limit_serializes_requests(base_url):
+    fetcher = ConcurrentFetcher(max_workers=4, per_host_limit=1, deadline=5)
+    start = time.monotonic()
+    list(fetcher.fetch_iter([f"{base_url}/slow"] * 2))
+    assert time.monotonic() - start >= 2.0
+
+
+def test_deadline_drops_slow_pages(base_url):
+    fetcher = ConcurrentFetcher(max_workers=4, deadline=0.5)
+    fetched = [url for url, _ in fetcher.fetch_iter([f"{base_url}/fast", f"{base_url}/slow"])]
+    assert fetched == [f"{base_url}/fast"]
+
+
+def test_body_is_capped_and_failures_skipped(base_url):
+    fetcher = ConcurrentFetcher(max_workers=4, max_bytes=1000, deadline=5)
+    fetched = dict(fetcher.fetch_iter([f"{base_url}/large", f"{base_url}/missing"]))
+    assert list(fetched) == [f"{base_url}/large"]
+    assert len(fetched[f"{base_url}/large"]) == 1000
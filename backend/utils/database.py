@@ -1,15 +1,137 @@
+import logging
+import os
+import threading
+import time
 from flask_sqlalchemy import SQLAlchemy
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from dotenv import load_dotenv
+from utils.metrics import metrics
 
-db = SQLAlchemy()
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+# Each process holds at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# "halfvec" also writes a float16 copy of each embedding and searches it first (needs pgvector >= 0.7,
+# migration 002 and the backfill). The column is only mapped then, so older pgvector keeps working.
+EMBEDDING_STORAGE_PRECISION = os.getenv("EMBEDDING_STORAGE_PRECISION", "float32").lower()
+
+class SharedEngineSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy whose default bind is the shared engine from get_engine()."""
+
+    def _make_engine(self, bind_key, options, app):
+        if bind_key is None:
+            return get_engine()
+        return super()._make_engine(bind_key, options, app)
+
+
+db = SharedEngineSQLAlchemy()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a free connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.increment("db_pool.timeouts")
+            raise
+        finally:
+            metrics.observe("db_pool.wait_ms", (time.perf_counter() - start) * 1000)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+# Thread-local sessions on the shared engine; app.py removes them when each request ends
+Session = scoped_session(sessionmaker())
+
+
+def engine_options():
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def get_engine():
+    """
+    Returns the process-wide engine, creating it on first use.
+
+    Flask-SQLAlchemy's `db`, MemoryAgent and the command-line tools all draw
+    connections from its single pool.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(DATABASE_URL, **engine_options())
+                pool = engine.pool
+                metrics.register_gauge("db_pool.size", pool.size)
+                metrics.register_gauge("db_pool.checked_out", pool.checkedout)
+                metrics.register_gauge("db_pool.overflow", lambda: max(0, pool.overflow()))
+                Session.configure(bind=engine)
+                logger.info(
+                    f"Database pool: size={DB_POOL_SIZE}, max_overflow={DB_MAX_OVERFLOW}, "
+                    f"recycle={DB_POOL_RECYCLE}s, pre_ping={DB_POOL_PRE_PING}"
+                )
+                _engine = engine
+    return _engine
+
+
+def get_session():
+    """Returns this thread's session on the shared engine."""
+    get_engine()
+    return Session()
 
 class VectorEmbedding(db.Model):
     __tablename__ = 'vector_embeddings'
+    __table_args__ = (
+        # Approximate nearest-neighbour index used by MemoryAgent.nearest (cosine distance)
+        db.Index(
+            'ix_vector_embeddings_embedding_hnsw',
+            'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+        ),
+        db.Index('ix_vector_embeddings_space_user_content_type', 'embedding_space', 'user_id', 'content_type'),
+        # A document has one embedding per space, so a new model can be backfilled alongside the old one
+        db.Index('uq_vector_embeddings_mongo_doc_space', 'mongo_doc_id', 'embedding_space', unique=True),
+    ) + ((
+        # Half-precision copy used for candidate search when EMBEDDING_STORAGE_PRECISION=halfvec
+        db.Index(
+            'ix_vector_embeddings_embedding_half_hnsw',
+            'embedding_half',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding_half': 'halfvec_cosine_ops'},
+        ),
+    ) if EMBEDDING_STORAGE_PRECISION == "halfvec" else ())
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.String(255), nullable=False)  # User ID
-    mongo_doc_id = db.Column(db.String(255), nullable=False, unique=True)  # MongoDB document ID
+    mongo_doc_id = db.Column(db.String(255), nullable=False)  # MongoDB document ID
     embedding = db.Column(Vector(1024), nullable=False)  # Vector embedding
+    if EMBEDDING_STORAGE_PRECISION == "halfvec":
+        embedding_half = db.Column(HALFVEC(1024), nullable=True)  # float16 copy; filled on write and by utils.halfvec_backfill
+    # Model and pooling the embedding came from (EMBEDDING_SPACE); shorter vectors are zero-padded to 1024
+    embedding_space = db.Column(db.String(255), nullable=False, server_default='bert-large-uncased/mean')
     content_type = db.Column(db.String(50), nullable=False)  # Content type (e.g., blog, presentation)
     additional_info = db.Column(db.String(255), nullable=True)  # Additional contextual info
     created_at = db.Column(db.DateTime, default=datetime.now(), nullable=False)  # Timestamp
@@ -0,0 +1,62 @@
+import argparse
+import logging
+import time
+from sqlalchemy import text
+from utils.database import get_engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def ensure_halfvec_column(engine):
+    """Adds `embedding_half` and its HNSW index if migration 002 skipped them (pgvector was < 0.7)."""
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE vector_embeddings ADD COLUMN IF NOT EXISTS embedding_half halfvec(1024)"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_vector_embeddings_embedding_half_hnsw "
+            "ON vector_embeddings USING hnsw (embedding_half halfvec_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        ))
+
+
+def backfill_halfvec(engine, batch_size=5000):
+    """
+    Fills `embedding_half` from `embedding` for rows that do not have it yet.
+
+    Walks the table in primary-key ranges with one short transaction per
+    range, so it can run against a live database and be stopped and
+    restarted at any time.
+
+    Returns:
+        int: Number of rows updated.
+    """
+    with engine.connect() as conn:
+        low, high = conn.execute(text("SELECT min(id), max(id) FROM vector_embeddings")).one()
+    if low is None:
+        return 0
+
+    updated, start = 0, time.perf_counter()
+    for range_start in range(low, high + 1, batch_size):
+        with engine.begin() as conn:
+            updated += conn.execute(
+                text(
+                    "UPDATE vector_embeddings SET embedding_half = embedding::halfvec "
+                    "WHERE id >= :lo AND id < :hi AND embedding_half IS NULL"
+                ),
+                {"lo": range_start, "hi": range_start + batch_size},
+            ).rowcount
+        logger.info(
+            f"Backfilled ids < {range_start + batch_size} of {high}: {updated} rows "
+            f"({updated / (time.perf_counter() - start):.0f} rows/sec)"
+        )
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add and fill vector_embeddings.embedding_half (pgvector >= 0.7).")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    ensure_halfvec_column(get_engine())
+    logger.info(f"Backfilled {backfill_halfvec(get_engine(), args.batch_size)} rows")
+
+# Command to run this >>>  python -m utils.halfvec_backfill
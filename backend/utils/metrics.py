@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry.
+
+    Counters are monotonically increasing totals, observations keep a count,
+    sum, max and a window of recent samples for percentiles, and gauges are
+    callables evaluated when a snapshot is taken.
+    """
+
+    def __init__(self, window=1024):
+        self.window = window
+        self._counters = {}
+        self._observations = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            stats = self._observations.get(name)
+            if stats is None:
+                stats = self._observations[name] = {"count": 0, "sum": 0.0, "max": value,
+                                                    "samples": deque(maxlen=self.window)}
+            stats["count"] += 1
+            stats["sum"] += value
+            stats["max"] = max(stats["max"], value)
+            stats["samples"].append(value)
+
+    def register_gauge(self, name, fn):
+        with self._lock:
+            self._gauges[name] = fn
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def ratio(self, numerator, denominator):
+        """Returns counter(numerator) / counter(denominator), or 0.0 when nothing was counted."""
+        total = self.counter(denominator)
+        return self.counter(numerator) / total if total else 0.0
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def snapshot(self):
+        """Returns all metrics as a JSON-serializable dict."""
+        with self._lock:
+            counters = dict(self._counters)
+            observations = {}
+            for name, stats in self._observations.items():
+                ordered = sorted(stats["samples"])
+                observations[name] = {
+                    "count": stats["count"],
+                    "mean": stats["sum"] / stats["count"],
+                    "max": stats["max"],
+                    "p50": self._percentile(ordered, 0.5),
+                    "p99": self._percentile(ordered, 0.99),
+                }
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "observations": observations,
+            "gauges": {name: fn() for name, fn in gauges.items()},
+        }
+
+
+metrics = Metrics()
@@ -0,0 +1,67 @@
+import logging
+import os
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Key of the Postgres advisory lock serializing concurrent apply_migrations runs
+MIGRATIONS_LOCK_KEY = 720193
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def apply_migrations(engine, migrations_dir=MIGRATIONS_DIR):
+    """
+    Applies pending SQL migrations in filename order.
+
+    Applied files are recorded in `schema_migrations` so each one runs once.
+    On Postgres the run holds an advisory lock, so workers starting together
+    wait for each other instead of racing to apply the same file.
+
+    Args:
+        engine: SQLAlchemy engine connected to the application database.
+        migrations_dir (str): Directory holding `NNN_description.sql` files.
+
+    Returns:
+        list[str]: Names of the migrations applied in this run.
+    """
+    if engine.dialect.name != "postgresql":
+        return _apply_pending(engine, migrations_dir)
+    with engine.connect() as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+        try:
+            return _apply_pending(engine, migrations_dir)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+            lock_conn.commit()
+
+
+def _apply_pending(engine, migrations_dir):
+    applied = []
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "name VARCHAR(255) PRIMARY KEY, applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+        done = {row[0] for row in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+    for name in sorted(f for f in os.listdir(migrations_dir) if f.endswith(".sql")):
+        if name in done:
+            continue
+        with open(os.path.join(migrations_dir, name), "r") as sql_file:
+            sql = sql_file.read()
+        with engine.begin() as conn:
+            conn.exec_driver_sql(sql)
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
+        logger.info(f"Applied migration {name}")
+        applied.append(name)
+    return applied
+
+if __name__ == "__main__":
+    from sqlalchemy import create_engine
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    apply_migrations(create_engine(os.getenv("DATABASE_URL")))
+
+# Command to run this >>>  python -m utils.migrations
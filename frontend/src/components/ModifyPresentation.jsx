@@ -4,6 +4,7 @@ import React, { useEffect, useState, useRef } from 'react';
 import { useForm, useFieldArray } from 'react-hook-form';
 import SlideConfig from './SlideConfig';
 import axios from 'axios';
+import { waitForPresentation } from './waitForPresentation';
 import { useParams, useNavigate } from 'react-router-dom';
 import '../styles/ModifyPresentation.css';
 import * as yup from 'yup';
@@ -141,8 +142,8 @@ const ModifyPresentation = () => {
         payload
       );
 
-      // Assuming the backend updates the presentation and keeps the same ID
-      setPresentation(response.data);
+      // The backend regenerates the deck in the background and keeps the same ID
+      setPresentation(await waitForPresentation(response.data.id));
       setSubmitLoading(false);
       // Scroll to download button
       if (downloadRef.current) {
@@ -7,6 +7,7 @@ import { yupResolver } from '@hookform/resolvers/yup';
 import * as yup from 'yup';
 import SlideConfig from './SlideConfig';
 import axios from 'axios';
+import { waitForPresentation } from './waitForPresentation';
 import '../styles/SlideForm.css';
 import { Link } from 'react-router-dom';
 
@@ -117,8 +118,9 @@ const SlideForm = () => {
                 payload
             );
 
-            setPresentationId(response.data.id);
-            setDownloadUrl(`http://localhost:5000${response.data.download_url}`);
+            const presentation = await waitForPresentation(response.data.id);
+            setPresentationId(presentation.id);
+            setDownloadUrl(`http://localhost:5000${presentation.download_url}`);
         } catch (err) {
             console.error(err);
             setError(
@@ -0,0 +1,27 @@
+import axios from 'axios';
+
+const PENDING_STATUSES = ['queued', 'running'];
+
+// Presentations are built by a background job: poll until it has finished,
+// giving up after timeoutMs so a stuck job doesn't leave the form spinning forever.
+export async function waitForPresentation(id, intervalMs = 1500, timeoutMs = 5 * 60 * 1000) {
+  const deadline = Date.now() + timeoutMs;
+  for (;;) {
+    const response = await axios.get(`http://localhost:5000/api/v1/presentations/${id}`);
+    const { status } = response.data;
+    if (status === 'failed') {
+      const error = new Error(response.data.error || 'Presentation generation failed.');
+      error.response = response;
+      throw error;
+    }
+    if (!PENDING_STATUSES.includes(status)) {
+      return response.data;
+    }
+    if (Date.now() + intervalMs > deadline) {
+      const error = new Error('Timed out waiting for the presentation.');
+      error.response = { data: { error: 'The presentation is taking too long. Please try again later.' } };
+      throw error;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}